@@ -0,0 +1,99 @@
+from fractions import Fraction
+
+from video_timestamps import (
+    FrameRateSegment,
+    RoundingMethod,
+    VideoTimestamps,
+)
+
+
+def generate_pts(fps: Fraction, nbr_frames: int, time_scale: Fraction, first_timestamps: Fraction = Fraction(0)) -> list[int]:
+    return [RoundingMethod.ROUND((first_timestamps + frame / fps) * time_scale) for frame in range(nbr_frames + 1)]
+
+
+def test_analyze_cfr() -> None:
+    timestamps = VideoTimestamps(generate_pts(Fraction(24000, 1001), 500, Fraction(1000)), Fraction(1000))
+    analysis = timestamps.analyze()
+
+    assert analysis.is_cfr
+    assert analysis.segments == [FrameRateSegment(0, 499, Fraction(24000, 1001))]
+    assert analysis.min_frame_duration == Fraction(41, 1000)
+    assert analysis.max_frame_duration == Fraction(42, 1000)
+    assert analysis.mean_frame_duration == Fraction(20854, 500 * 1000)
+    assert analysis.frame_duration_histogram == {Fraction(41, 1000): 146, Fraction(42, 1000): 354}
+    assert analysis.dropped_frames == []
+    assert analysis.pulldown_frames == []
+
+    # The analysis is cached
+    assert timestamps.analyze() is analysis
+
+
+def test_analyze_vfr() -> None:
+    time_scale = Fraction(90000)
+    pts_list = generate_pts(Fraction(24000, 1001), 100, time_scale)
+    pts_list += generate_pts(Fraction(30000, 1001), 100, time_scale, Fraction(100 * 1001, 24000))[1:]
+    analysis = VideoTimestamps(pts_list, time_scale).analyze()
+
+    assert not analysis.is_cfr
+    assert analysis.segments == [
+        FrameRateSegment(0, 99, Fraction(24000, 1001)),
+        FrameRateSegment(100, 199, Fraction(30000, 1001)),
+    ]
+
+
+def test_analyze_dropped_frame() -> None:
+    pts_list = generate_pts(Fraction(25), 50, Fraction(1000))
+    del pts_list[20]
+    analysis = VideoTimestamps(pts_list, Fraction(1000)).analyze()
+
+    assert analysis.segments == [
+        FrameRateSegment(0, 18, Fraction(25)),
+        FrameRateSegment(19, 19, Fraction(25, 2)),
+        FrameRateSegment(20, 48, Fraction(25)),
+    ]
+    assert analysis.dropped_frames == [19]
+    assert analysis.pulldown_frames == []
+
+
+def test_analyze_pulldown() -> None:
+    # 3:2 pulldown of 24000/1001 fps content: frames alternately last 3 and 2 fields of 1001/60000 seconds
+    pts_list = generate_pts(Fraction(24000, 1001), 5, Fraction(1000))
+    fields = 0
+    for frame in range(10):
+        fields += 3 if frame % 2 == 0 else 2
+        pts_list.append(pts_list[5] + RoundingMethod.ROUND(Fraction(fields * 1001, 60000) * 1000))
+    analysis = VideoTimestamps(pts_list, Fraction(1000)).analyze()
+
+    assert not analysis.is_cfr
+    assert analysis.pulldown_frames == list(range(5, 15))
+    assert analysis.dropped_frames == []
+
+
+def test_analyze_cfr_few_ticks_per_frame() -> None:
+    # The time_base is 1/fps, so each frame lasts 1 tick
+    analysis = VideoTimestamps(list(range(11)), Fraction(24)).analyze()
+    assert analysis.segments == [FrameRateSegment(0, 9, Fraction(24))]
+    assert analysis.pulldown_frames == []
+    assert analysis.dropped_frames == []
+
+    analysis = VideoTimestamps(generate_pts(Fraction(250), 50, Fraction(1000)), Fraction(1000)).analyze()
+    assert analysis.is_cfr
+    assert analysis.pulldown_frames == []
+    assert analysis.dropped_frames == []
+
+    # Each frame lasts 1.5 tick, so the durations alternate between 1 and 2 ticks
+    analysis = VideoTimestamps(generate_pts(Fraction(2, 3), 50, Fraction(1)), Fraction(1)).analyze()
+    assert analysis.is_cfr
+    assert analysis.pulldown_frames == []
+    assert analysis.dropped_frames == []
+
+
+def test_analyze_pulldown_single_pair() -> None:
+    # Only 2 frames last 3 and 2 fields, so it isn't a 3:2 pulldown
+    pts_list = generate_pts(Fraction(24000, 1001), 5, Fraction(1000))
+    pts_list.append(pts_list[-1] + 50)
+    pts_list.append(pts_list[-1] + 33)
+    pts_list += [pts + pts_list[-1] for pts in generate_pts(Fraction(24000, 1001), 5, Fraction(1000))[1:]]
+    analysis = VideoTimestamps(pts_list, Fraction(1000)).analyze()
+
+    assert analysis.pulldown_frames == []
@@ -0,0 +1,12 @@
+from fractions import Fraction
+
+import pytest
+
+from video_timestamps import RoundingMethod
+
+
+@pytest.mark.parametrize("rounding_method", [RoundingMethod.FLOOR, RoundingMethod.ROUND])
+def test_divide(rounding_method: RoundingMethod) -> None:
+    for numerator in range(-50, 51):
+        for denominator in (1, 2, 3, 4, 10, 1001):
+            assert rounding_method.divide(numerator, denominator) == rounding_method(Fraction(numerator, denominator))
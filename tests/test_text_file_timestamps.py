@@ -1,3 +1,4 @@
+import gzip
 import os
 from fractions import Fraction
 from pathlib import Path
@@ -150,7 +151,7 @@ def test_frame_to_time_v1() -> None:
 
     timestamps = TextFileTimestamps(timestamps_str, time_scale, rounding_method)
 
-    assert timestamps._video_timestamps.pts_list == [0, 33, 67, 100, 133, 167, 233, 300, 367, 433, 500, 567]
+    assert [timestamps.frame_to_pts(frame, TimeType.EXACT) for frame in range(12)] == [0, 33, 67, 100, 133, 167, 233, 300, 367, 433, 500, 567]
     assert timestamps.fps == Fraction(30)
 
     # Frame 0 to 5 - 30 fps
@@ -258,7 +259,7 @@ def test_init_v1() -> None:
     assert timestamps.time_scale == Fraction(1000)
     assert timestamps.rounding_method == RoundingMethod.ROUND
     assert timestamps.fps == Fraction(30)
-    assert timestamps._video_timestamps.pts_list == [0, 33, 67, 100, 133, 167, 233, 300, 367, 433, 500, 567, 600, 633, 658, 683, 708, 733]
+    assert [timestamps.frame_to_pts(frame, TimeType.EXACT) for frame in range(18)] == [0, 33, 67, 100, 133, 167, 233, 300, 367, 433, 500, 567, 600, 633, 658, 683, 708, 733]
     # 7 * 1/30 + 6 * 1/15 + 4 * 1/40 = 11/15
     assert timestamps._fps_timestamps is not None
     assert timestamps._fps_timestamps.first_timestamps == Fraction(11, 15)
@@ -269,6 +270,42 @@ def test_init_v1() -> None:
     assert str(exc_info.value) == "V1 timestamps file doesn't specify a number of frames."
 
 
+
+def test_init_v1_long_range() -> None:
+    # 24 hours of video at 25 fps
+    timestamps_str = "# timecode format v1\n" "Assume 30\n" "0,2159999,25\n"
+    time_scale = Fraction(90000)
+    rounding_method = RoundingMethod.ROUND
+
+    timestamps = TextFileTimestamps(timestamps_str, time_scale, rounding_method)
+
+    assert timestamps.frame_to_time(2159999, TimeType.EXACT) == Fraction(2159999, 25)
+    assert timestamps.time_to_frame(Fraction(86399), TimeType.START) == 2159975
+    # After the range, the assumed fps is used
+    assert timestamps.frame_to_time(2160000, TimeType.EXACT) == Fraction(86400)
+    assert timestamps.frame_to_time(2160003, TimeType.EXACT) == Fraction(86400) + Fraction(3, 30)
+    assert timestamps.time_to_frame(Fraction(86400) + Fraction(3, 30), TimeType.EXACT) == 2160003
+
+
+def test_init_v1_without_range() -> None:
+    timestamps_str = "# timecode format v1\n" "Assume 30\n"
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    with pytest.raises(ValueError) as exc_info:
+        TextFileTimestamps(timestamps_str, time_scale, rounding_method)
+    assert str(exc_info.value) == "There must be at least 2 pts."
+
+
+def test_init_v1_duplicate_pts() -> None:
+    timestamps_str = "# timecode format v1\n" "Assume 30\n" "0,10,1200\n"
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    with pytest.raises(ValueError) as exc_info:
+        TextFileTimestamps(timestamps_str, time_scale, rounding_method)
+    assert str(exc_info.value) == "PTS must be in non-decreasing order."
+
 def test_init_v2() -> None:
     timestamps_str = (
         "# timecode format v2\n"
@@ -288,12 +325,25 @@ def test_init_v2() -> None:
     assert timestamps.time_scale == Fraction(1000)
     assert timestamps.rounding_method == RoundingMethod.ROUND
     assert timestamps.fps == Fraction(6, Fraction(2003, 1000))
+    assert timestamps._video_timestamps is not None
     assert timestamps._video_timestamps.pts_list == [0, 1000, 1500, 2000, 2001, 2002, 2003]
     assert timestamps.version == 2
 
     assert timestamps.nbr_frames == 6
 
 
+
+@pytest.mark.parametrize("rounding_method", [RoundingMethod.ROUND, RoundingMethod.FLOOR])
+def test_init_v2_pts_rounding(rounding_method: RoundingMethod) -> None:
+    timestamps_str = "# timecode format v2\n" "-50.5\n" "-10.25\n" "0\n" "41.708333\n" "83.416667\n" "1001/8\n"
+    time_scale = Fraction(1000000, 3)
+
+    timestamps = TextFileTimestamps(timestamps_str, time_scale, rounding_method, normalize=False)
+
+    expected_pts = [rounding_method(time / 1000 * time_scale) for time in map(Fraction, ["-50.5", "-10.25", "0", "41.708333", "83.416667", "1001/8"])]
+    assert timestamps._video_timestamps is not None
+    assert timestamps._video_timestamps.pts_list == expected_pts
+
 def test_empty_line_v2() -> None:
     timestamps_str = (
         "# timecode format v2\n"
@@ -307,6 +357,7 @@ def test_empty_line_v2() -> None:
 
     timestamps = TextFileTimestamps(timestamps_str, time_scale, rounding_method, normalize=False)
 
+    assert timestamps._video_timestamps is not None
     assert timestamps._video_timestamps.pts_list == [1000, 1500, 2000]
 
 
@@ -323,6 +374,7 @@ def test_single_carriage_return_v2() -> None:
 
     timestamps = TextFileTimestamps(timestamps_str, time_scale, rounding_method, normalize=False)
 
+    assert timestamps._video_timestamps is not None
     assert timestamps._video_timestamps.pts_list == [3, 4, 10, 20]
 
 def test_frame_to_time_over_video_duration_v2() -> None:
@@ -371,9 +423,175 @@ def test_init_from_file() -> None:
 
     assert timestamps.time_scale == Fraction(1000)
     assert timestamps.fps == Fraction(2, Fraction(100, 1000))
+    assert timestamps._video_timestamps is not None
     assert timestamps._video_timestamps.pts_list == [0, 50, 100]
 
 
+def test_init_from_binary_file() -> None:
+    timestamp_file_path = dir_path.joinpath("files", "timestamps.txt")
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    with open(timestamp_file_path, "rb") as f:
+        timestamps = TextFileTimestamps(f, time_scale, rounding_method)
+        assert not f.closed
+
+    assert timestamps == TextFileTimestamps(timestamp_file_path, time_scale, rounding_method)
+
+
+
+def test_refresh(tmp_path: Path) -> None:
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    timestamp_file_path.write_text("# timecode format v2\n10\n50.5\n100")
+    timestamps = TextFileTimestamps(timestamp_file_path, time_scale, rounding_method)
+    assert timestamps._video_timestamps is not None
+    assert timestamps._video_timestamps.pts_list == [0, 41, 90]
+    assert timestamps.refresh() == 0
+
+    # The last line was still being written, so it is parsed again
+    with open(timestamp_file_path, "a") as f:
+        f.write("0\n1500.8\n# comment\n2000.9\n")
+    assert timestamps.refresh() == 2
+    assert timestamps._video_timestamps.pts_list == [0, 41, 990, 1491, 1991]
+    assert timestamps.fps == Fraction(4, Fraction(1991, 1000))
+    assert timestamps.frame_to_time(4, TimeType.EXACT) == Fraction(1991, 1000)
+    assert timestamps == TextFileTimestamps(timestamp_file_path, time_scale, rounding_method)
+
+    with open(timestamp_file_path, "a") as f:
+        f.write("1500\n")
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.refresh()
+    assert str(exc_info.value) == "The timestamps file contain timestamps NOT in ascending order."
+    # The timestamps haven't changed
+    assert timestamps._video_timestamps.pts_list == [0, 41, 990, 1491, 1991]
+
+
+def test_refresh_partial_line(tmp_path: Path) -> None:
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    timestamp_file_path.write_text("# timecode format v2\n0\n1000\n2000\n")
+    timestamps = TextFileTimestamps(timestamp_file_path, time_scale, rounding_method)
+    assert timestamps._video_timestamps is not None
+    assert timestamps._video_timestamps.pts_list == [0, 1000, 2000]
+
+    # The last line is still being written, so it is ignored until it is complete
+    with open(timestamp_file_path, "a") as f:
+        f.write("3")
+    assert timestamps.refresh() == 0
+    assert timestamps._video_timestamps.pts_list == [0, 1000, 2000]
+
+    # A line is appended in two writes
+    with open(timestamp_file_path, "a") as f:
+        f.write("000\n4")
+    assert timestamps.refresh() == 1
+    assert timestamps._video_timestamps.pts_list == [0, 1000, 2000, 3000]
+
+    with open(timestamp_file_path, "a") as f:
+        f.write("0")
+    assert timestamps.refresh() == 0
+    assert timestamps._video_timestamps.pts_list == [0, 1000, 2000, 3000]
+
+    with open(timestamp_file_path, "a") as f:
+        f.write("00\n")
+    assert timestamps.refresh() == 1
+    assert timestamps._video_timestamps.pts_list == [0, 1000, 2000, 3000, 4000]
+    assert timestamps == TextFileTimestamps(timestamp_file_path, time_scale, rounding_method)
+
+
+def test_init_v2_invalid_last_line(tmp_path: Path) -> None:
+    timestamps_str = "# timecode format v2\n0\n1000\n2000\nabc"
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    timestamp_file_path.write_text(timestamps_str)
+
+    # Without a line terminator, the last line is only tolerated by refresh
+    with pytest.raises(ValueError) as exc_info:
+        TextFileTimestamps(timestamps_str, Fraction(1000), RoundingMethod.ROUND)
+    assert str(exc_info.value) == "The timestamps file contain a invalid line. Here is it: \"abc\""
+
+    with pytest.raises(ValueError) as exc_info:
+        TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND)
+    assert str(exc_info.value) == "The timestamps file contain a invalid line. Here is it: \"abc\""
+
+
+def test_refresh_unsupported() -> None:
+    timestamps = TextFileTimestamps("# timecode format v2\n0\n50\n", Fraction(1000), RoundingMethod.ROUND)
+
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.refresh()
+    assert str(exc_info.value) == "Only an uncompressed v2 timestamps file created from a Path can be refreshed."
+
+
+def test_compressed_file(tmp_path: Path) -> None:
+    path = tmp_path / "timestamps.txt.gz"
+    path.write_bytes(gzip.compress(b"# timecode format v2\n0\n50\n100\n"))
+    timestamps = TextFileTimestamps(path, Fraction(1000), RoundingMethod.ROUND)
+
+    assert timestamps == TextFileTimestamps("# timecode format v2\n0\n50\n100\n", Fraction(1000), RoundingMethod.ROUND)
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.refresh()
+    assert str(exc_info.value) == "Only an uncompressed v2 timestamps file created from a Path can be refreshed."
+
+def test_cache(tmp_path: Path) -> None:
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    cache_directory = tmp_path / "cache"
+    time_scale = Fraction(1000)
+    rounding_method = RoundingMethod.ROUND
+
+    timestamp_file_path.write_text("# timecode format v2\n10\n50.5\n100\n")
+    timestamps = TextFileTimestamps(timestamp_file_path, time_scale, rounding_method, cache_directory=cache_directory)
+    assert len(list(cache_directory.iterdir())) == 1
+
+    # The second object is created from the cache entry
+    cached_timestamps = TextFileTimestamps(timestamp_file_path, time_scale, rounding_method, cache_directory=cache_directory)
+    assert cached_timestamps == timestamps
+    assert cached_timestamps._video_timestamps is not None
+    assert isinstance(cached_timestamps._video_timestamps._VideoTimestamps__pts, memoryview) # type: ignore[attr-defined]
+    assert cached_timestamps.fps == timestamps.fps
+
+    # Each combination of time_scale, rounding_method and normalize has its own entry
+    TextFileTimestamps(timestamp_file_path, time_scale, rounding_method, False, cache_directory=cache_directory)
+    assert len(list(cache_directory.iterdir())) == 2
+
+    # The entry is replaced once the file has been modified
+    with open(timestamp_file_path, "a") as f:
+        f.write("150\n")
+    assert cached_timestamps.refresh() == 1
+    timestamps = TextFileTimestamps(timestamp_file_path, time_scale, rounding_method, cache_directory=cache_directory)
+    assert timestamps == cached_timestamps
+    assert timestamps == TextFileTimestamps(timestamp_file_path, time_scale, rounding_method, cache_directory=cache_directory)
+    assert len(list(cache_directory.iterdir())) == 2
+
+
+def test_cache_unwritable_directory(tmp_path: Path) -> None:
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    # The parent of the cache directory is a file, so the cache directory cannot be created
+    cache_directory = tmp_path / "file" / "cache"
+    cache_directory.parent.write_bytes(b"")
+
+    timestamp_file_path.write_text("# timecode format v2\n10\n50.5\n100\n")
+
+    timestamps = TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND, cache_directory=cache_directory)
+    assert timestamps == TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND)
+    assert not cache_directory.exists()
+
+
+def test_cache_corrupted_entry(tmp_path: Path) -> None:
+    timestamp_file_path = tmp_path / "timestamps.txt"
+    cache_directory = tmp_path / "cache"
+    timestamp_file_path.write_text("# timecode format v2\n0\n50\n100\n")
+    timestamps = TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND, cache_directory=cache_directory)
+
+    cache_path = next(cache_directory.iterdir())
+    cache_path.write_bytes(cache_path.read_bytes()[:-4])
+    assert TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND, cache_directory=cache_directory) == timestamps
+    assert TextFileTimestamps(timestamp_file_path, Fraction(1000), RoundingMethod.ROUND, cache_directory=cache_directory) == timestamps
+
+
 def test__eq__and__hash__() -> None:
     timestamps_str = (
         "# timecode format v2\n"
@@ -1,8 +1,18 @@
-from io import StringIO
+import bz2
+import gzip
+import lzma
+import os
+from collections.abc import Callable
+from fractions import Fraction
+from functools import partial
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import cast
 
 import pytest
 
-from video_timestamps.timestamps_file_parser import TimestampsFileParser
+from video_timestamps import timestamps_file_parser
+from video_timestamps.timestamps_file_parser import RangeV1, TimestampsFileParser
 
 
 def test_missing_timestamps_version() -> None:
@@ -21,3 +31,291 @@ def test_invalid_timestamps_version() -> None:
     with pytest.raises(NotImplementedError) as exc_info:
         TimestampsFileParser.parse_file(f)
     assert str(exc_info.value) == "The file uses version 3, but this format is currently not supported."
+
+
+def test_parse_binary_file() -> None:
+    f = BytesIO(b"# timecode format v2\r\n0\r\n\r\n41.708\n83.417\r1001/8\n")
+    timestamps, fps, version = TimestampsFileParser.parse_file(f)
+
+    assert timestamps == [(0, 1), (41708, 1000), (83417, 1000), (1001, 8)]
+    assert fps is None
+    assert version == 2
+    # The stream of the caller isn't closed
+    assert not f.closed
+
+
+def test_parse_v1_binary_file() -> None:
+    f = BytesIO(b"# timecode format v1\n# comment\nAssume 25\n0,1,50\n")
+    timestamps, fps, version = TimestampsFileParser.parse_file(f)
+
+    assert [(r.start_frame, r.end_frame, r.fps, r.start_time) for r in cast(list[RangeV1], timestamps)] == [(0, 1, Fraction(50), Fraction(0))]
+    assert fps == Fraction(25)
+    assert version == 1
+
+
+def test_parse_v1_file_ranges() -> None:
+    f = StringIO("# timecode format v1\nAssume 30\n5,10,15\n13,16,40\n")
+    timestamps, fps, version = TimestampsFileParser.parse_file(f)
+
+    # The gaps between the ranges use the assumed fps
+    assert [(r.start_frame, r.end_frame, r.fps, r.start_time) for r in cast(list[RangeV1], timestamps)] == [
+        (0, 4, Fraction(30), Fraction(0)),
+        (5, 10, Fraction(15), Fraction(500, 3)),
+        (11, 12, Fraction(30), Fraction(1700, 3)),
+        (13, 16, Fraction(40), Fraction(1900, 3)),
+    ]
+    assert fps == Fraction(30)
+    assert version == 1
+
+
+
+def test_parse_path(tmp_path: Path) -> None:
+    content = b"# timecode format v2\r\n0\r\n# comment\n\n  41.708 \t\n83.417\r1001/8\n\x0b126\n# \xe2\x80\xa8 167\n"
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(content)
+
+    timestamps, fps, version = TimestampsFileParser.parse_path(path)
+
+    assert timestamps == [(0, 1), (41708, 1000), (83417, 1000), (1001, 8), (126, 1), (167, 1)]
+    assert fps is None
+    assert version == 2
+    # Same result as the text parsing
+    assert (timestamps, fps, version) == TimestampsFileParser.parse_file(BytesIO(content))
+
+
+def test_parse_path_invalid_line(tmp_path: Path) -> None:
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(b"# timecode format v2\n0\n 1.2.3 \n")
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_path(path)
+    assert str(exc_info.value) == 'The timestamps file contain a invalid line. Here is it: "1.2.3"'
+
+
+def test_parse_path_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(b"")
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_path(path)
+    assert str(exc_info.value) == "The line 0 is invalid doesn't contain the version of the timestamps file."
+
+
+def test_parse_path_v1(tmp_path: Path) -> None:
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(b"# timecode format v1\r\nAssume 25\r\n0,1,50\r\n")
+
+    timestamps, fps, version = TimestampsFileParser.parse_path(path)
+
+    assert [(r.start_frame, r.end_frame, r.fps, r.start_time) for r in cast(list[RangeV1], timestamps)] == [(0, 1, Fraction(50), Fraction(0))]
+    assert fps == Fraction(25)
+    assert version == 1
+
+
+def test_parse_path_in_parallel(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(timestamps_file_parser, "PARALLEL_MIN_PART_SIZE", 8)
+    content = "# timecode format v2\n" + "".join(f"{frame * 1001 / 24:.6f}\n" for frame in range(100))
+    path = tmp_path / "timestamps.txt"
+    path.write_text(content)
+
+    assert TimestampsFileParser.parse_path(path, 4) == TimestampsFileParser.parse_path(path)
+
+    # A number that doesn't fit in int64
+    path.write_text(content + "123456789012345678901.5\n")
+    timestamps, _, _ = TimestampsFileParser.parse_path(path, 4)
+    assert timestamps[-1] == (1234567890123456789015, 10)
+
+    # The order is also checked between the parts
+    path.write_text("# timecode format v2\n" + "".join(f"{frame}\n" for frame in range(50)) + "".join(f"{frame}\n" for frame in range(50)))
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_path(path, 4)
+    assert str(exc_info.value) == "The timestamps file contain timestamps NOT in ascending order."
+
+    path.write_text("# timestamp format v4\n" + "".join(f"{frame}\n" for frame in reversed(range(100))))
+    timestamps, _, _ = TimestampsFileParser.parse_path(path, 4)
+    assert timestamps == [(frame, 1) for frame in range(100)]
+
+
+def test_parse_path_invalid_max_workers(tmp_path: Path) -> None:
+    path = tmp_path / "timestamps.txt"
+    path.write_text("# timecode format v2\n0\n")
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_path(path, 0)
+    assert str(exc_info.value) == "Parameter ``max_workers`` must be higher than 0."
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress, partial(lzma.compress, format=lzma.FORMAT_ALONE)])
+def test_parse_compressed_file(tmp_path: Path, compress: Callable[[bytes], bytes]) -> None:
+    content = b"# timecode format v2\n0\n41.708\n83.417\n"
+    path = tmp_path / "timestamps.txt"
+    path.write_bytes(compress(content))
+
+    expected = TimestampsFileParser.parse_file(BytesIO(content))
+    assert TimestampsFileParser.parse_path(path) == expected
+    assert TimestampsFileParser.parse_path(path, 4) == expected
+
+    # The stream is read from its current position
+    file_content = BytesIO(b"garbage" + compress(content))
+    file_content.seek(7)
+    assert TimestampsFileParser.parse_file(file_content) == expected
+
+
+def test_parse_compressed_pipe() -> None:
+    # A pipe isn't seekable, so the magic bytes are peeked
+    read_fd, write_fd = os.pipe()
+    with open(write_fd, "wb") as f:
+        f.write(gzip.compress(b"# timecode format v1\nassume 25\n"))
+
+    with open(read_fd, "rb") as f:
+        assert TimestampsFileParser.parse_file(f) == ([], Fraction(25), 1)
+
+
+FFPROBE_JSON_DUMP = """{
+    "packets": [
+        {
+            "codec_type": "audio",
+            "stream_index": 1,
+            "pts": 0,
+            "duration": 1024
+        },
+        {
+            "codec_type": "video",
+            "stream_index": 0,
+            "pts": 0,
+            "dts": -2002,
+            "duration": 1001,
+            "flags": "K__",
+            "side_data_list": [
+                {
+                    "side_data_type": "Matroska BlockAdditional"
+                }
+            ]
+        },
+        {
+            "codec_type": "video",
+            "stream_index": 0,
+            "pts": 3003,
+            "dts": -1001,
+            "duration": 1001,
+            "flags": "___"
+        },
+        {
+            "codec_type": "video",
+            "stream_index": 0,
+            "pts": 1001,
+            "dts": 0,
+            "duration": 1001,
+            "flags": "___"
+        },
+        {
+            "codec_type": "video",
+            "stream_index": 0,
+            "pts": 2002,
+            "dts": 1001,
+            "duration": 1001,
+            "flags": "___"
+        }
+    ],
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "video",
+            "time_base": "1/24000",
+            "tags": {
+                "title": "a [title], with {brackets}"
+            }
+        },
+        {
+            "index": 1,
+            "codec_type": "audio",
+            "time_base": "1/48000"
+        }
+    ]
+}
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_parse_ffprobe_json_dump(chunk_size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(timestamps_file_parser, "JSON_CHUNK_SIZE", chunk_size)
+
+    pts_list, time_scale = TimestampsFileParser.parse_ffprobe_dump(StringIO(FFPROBE_JSON_DUMP))
+    # The packets are sorted in presentation order
+    assert list(pts_list) == [0, 1001, 2002, 3003, 4004]
+    assert time_scale == Fraction(24000)
+
+    pts_list, time_scale = TimestampsFileParser.parse_ffprobe_dump(BytesIO(FFPROBE_JSON_DUMP.encode("utf-8")), 1)
+    assert list(pts_list) == [0, 1024]
+    assert time_scale == Fraction(48000)
+
+
+def test_parse_ffprobe_csv_dump() -> None:
+    dump = (
+        "frame,media_type=video,stream_index=0,key_frame=1,pts=10,pkt_duration=N/A,duration=2\n"
+        "frame,media_type=audio,stream_index=1,key_frame=1,pts=0,duration=1024\n"
+        "frame,media_type=video,stream_index=0,key_frame=0,pts=12,duration=2\n"
+        "frame,media_type=video,stream_index=0,key_frame=0,pts=15,duration=3\n"
+    )
+    pts_list, time_scale = TimestampsFileParser.parse_ffprobe_dump(StringIO(dump))
+    assert list(pts_list) == [10, 12, 15, 18]
+    # The dump doesn't contain the streams
+    assert time_scale is None
+
+    dump = (
+        "packet|codec_type=video|stream_index=0|pts=0|duration=1\n"
+        "packet|codec_type=video|stream_index=0|pts=1|duration=1\n"
+        "stream|index=0|codec_name=ffv1|codec_long_name=FFmpeg video codec #1|time_base=1/25\n"
+    )
+    pts_list, time_scale = TimestampsFileParser.parse_ffprobe_dump(StringIO(dump))
+    assert list(pts_list) == [0, 1, 2]
+    assert time_scale == Fraction(25)
+
+
+def test_parse_ffprobe_dump_invalid() -> None:
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_ffprobe_dump(StringIO("packet,video,0,0,0.000000,-2,-0.083417,1,0.041708,2962,1076,K__\n"))
+    assert str(exc_info.value) == 'The field "video" of the ffprobe dump doesn\'t have a key. Use the option "-of csv=nokey=0" of ffprobe.'
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_ffprobe_dump(StringIO(FFPROBE_JSON_DUMP), 2)
+    assert str(exc_info.value) == "The ffprobe dump doesn't contain any packet or frame of the stream 2."
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_ffprobe_dump(StringIO("packet,codec_type=video,stream_index=0,pts=N/A,duration=1\n"))
+    assert str(exc_info.value) == "A packet of the stream 0 doesn't have a pts."
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_ffprobe_dump(StringIO("packet,codec_type=video,stream_index=0,pts=0,duration=N/A\n"))
+    assert str(exc_info.value) == "The duration of the last frame is unknown."
+
+def test_parse_number() -> None:
+    for line in ["0", "1001", "41.708333", "-12.5", "-0.25", "5.", "123456789.123456789", "1/3", "+5", "1e3", ".5", "1_0", "\u0665"]:
+        numerator, denominator = TimestampsFileParser._parse_number(line)
+        assert Fraction(numerator, denominator) == Fraction(line)
+        assert denominator > 0
+
+    assert TimestampsFileParser._parse_number("41.708333") == (41708333, pow(10, 6))
+    assert TimestampsFileParser._parse_number("-12.5") == (-125, 10)
+    assert TimestampsFileParser._parse_number("1001") == (1001, 1)
+
+    for line in ["-", "1.2.3", "a", "1/0.5", "--5"]:
+        with pytest.raises(ValueError):
+            TimestampsFileParser._parse_number(line)
+
+
+def test_parse_v4_file() -> None:
+    f = StringIO("# timestamp format v4\n20.5\n0\n1/3\n10\n")
+    timestamps, fps, version = TimestampsFileParser.parse_file(f)
+
+    assert timestamps == [(0, 1), (1, 3), (10, 1), (205, 10)]
+    assert fps is None
+    assert version == 4
+
+
+def test_parse_v2_file_not_ascending() -> None:
+    f = StringIO("# timestamp format v2\n0\n10.5\n10.25\n")
+
+    with pytest.raises(ValueError) as exc_info:
+        TimestampsFileParser.parse_file(f)
+    assert str(exc_info.value) == "The timestamps file contain timestamps NOT in ascending order."
@@ -1,5 +1,9 @@
 import os
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from fractions import Fraction
+from io import StringIO
 from pathlib import Path
 
 import pytest
@@ -8,6 +12,9 @@ from video_timestamps import (
     ABCVideoProvider,
     BestSourceVideoProvider,
     FFMS2VideoProvider,
+    RoundingMethod,
+    TextFileTimestamps,
+    TimeType,
     VideoTimestamps,
 )
 
@@ -75,6 +82,79 @@ def test_from_video(video_provider: ABCVideoProvider) -> None:
     assert timestamps.fps == Fraction(24000, 1001)
 
 
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+def test_from_video_all_tracks(video_provider: ABCVideoProvider) -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+    timestamps = VideoTimestamps.from_video_file_all_tracks(video_file_path, video_provider=video_provider)
+    assert list(timestamps) == [0, 2]
+    assert timestamps[0] == VideoTimestamps.from_video_file(video_file_path, 0, video_provider=video_provider)
+    assert timestamps[2] == VideoTimestamps.from_video_file(video_file_path, 2, video_provider=video_provider)
+    assert timestamps[2].pts_list[:5] == [0, 25, 50, 75, 100]
+
+
+def test_from_video_get_pts_buffer(tmp_path: Path) -> None:
+    class BufferVideoProvider(ABCVideoProvider):
+        def __init__(self) -> None:
+            # The native constructor of ABCVideoProvider is abstract, so it isn't called
+            pass
+
+        def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+            raise AssertionError("get_pts_buffer must be used instead of get_pts")
+
+        def get_pts_buffer(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[memoryview, Fraction, Fraction]:
+            return memoryview(array("q", [10, 52, 93])), Fraction(1, 1000), Fraction(24)
+
+    video_file_path = tmp_path / "video.mkv"
+    video_file_path.write_bytes(b"")
+    timestamps = VideoTimestamps.from_video_file(video_file_path, video_provider=BufferVideoProvider())
+    assert timestamps == VideoTimestamps([0, 42, 83], Fraction(1000), fps=Fraction(24))
+
+
+def test_from_video_all_tracks_get_all_pts_buffer(tmp_path: Path) -> None:
+    class BufferVideoProvider(ABCVideoProvider):
+        def __init__(self) -> None:
+            # The native constructor of ABCVideoProvider is abstract, so it isn't called
+            pass
+
+        def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+            raise AssertionError("get_all_pts_buffer must be used instead of get_pts")
+
+        def get_all_pts_buffer(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[memoryview, Fraction, Fraction]]:
+            return {
+                0: (memoryview(array("q", [10, 52, 93])), Fraction(1, 1000), Fraction(24)),
+                2: (memoryview(array("q", [0, 40, 80])), Fraction(1, 1000), Fraction(25)),
+            }
+
+    video_file_path = tmp_path / "video.mkv"
+    video_file_path.write_bytes(b"")
+    timestamps = VideoTimestamps.from_video_file_all_tracks(video_file_path, video_provider=BufferVideoProvider())
+    assert timestamps == {
+        0: VideoTimestamps([0, 42, 83], Fraction(1000), fps=Fraction(24)),
+        2: VideoTimestamps([0, 40, 80], Fraction(1000), fps=Fraction(25)),
+    }
+    # The PTS stay in the buffers
+    assert timestamps[2]._VideoTimestamps__pts_list is None # type: ignore[attr-defined]
+
+
+def test_from_video_all_tracks_get_pts_only(tmp_path: Path) -> None:
+    class GetPtsVideoProvider(ABCVideoProvider):
+        def __init__(self) -> None:
+            # The native constructor of ABCVideoProvider is abstract, so it isn't called
+            pass
+
+        def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+            assert index is not None
+            return [0, 40 * (index + 1)], Fraction(1, 1000), Fraction(25, index + 1)
+
+    video_file_path = tmp_path / "video.mkv"
+    video_file_path.write_bytes(b"")
+    timestamps = VideoTimestamps.from_video_file_all_tracks(video_file_path, [0, 2], video_provider=GetPtsVideoProvider())
+    assert timestamps == {
+        0: VideoTimestamps([0, 40], Fraction(1000), fps=Fraction(25)),
+        2: VideoTimestamps([0, 120], Fraction(1000), fps=Fraction(25, 3)),
+    }
+
+
 def test_normalize() -> None:
     pts_list = [10, 20, 30]
     assert VideoTimestamps.normalize(pts_list) == [0, 10, 20]
@@ -121,3 +201,234 @@ def test__eq__and__hash__() -> None:
     )
     assert video_1 != video_5
     assert hash(video_1) != hash(video_5)
+
+
+def test_from_buffer() -> None:
+    time_scale = Fraction(1000)
+    fps = Fraction(24000, 1001)
+    expected = VideoTimestamps([0, 42, 83, 125], time_scale, fps=fps)
+
+    assert VideoTimestamps.from_buffer(array("q", [0, 42, 83, 125]), time_scale, fps=fps) == expected
+    assert VideoTimestamps.from_buffer(memoryview(array("q", [0, 42, 83, 125])), time_scale, fps=fps) == expected
+    assert VideoTimestamps.from_buffer(array("q", [0, 42, 83, 125]).tobytes(), time_scale, fps=fps) == expected
+    assert VideoTimestamps.from_buffer(bytearray(array("q", [0, 42, 83, 125]).tobytes()), time_scale, fps=fps) == expected
+    # Non-contiguous buffer
+    assert VideoTimestamps.from_buffer(memoryview(array("q", [0, -1, 42, -1, 83, -1, 125]))[::2], time_scale, fps=fps) == expected
+
+    timestamps = VideoTimestamps.from_buffer(array("q", [10, 52, 93, 135]), time_scale, fps=fps)
+    assert timestamps == expected
+    assert timestamps.pts_list == [0, 42, 83, 125]
+    assert timestamps.timestamps == [Fraction(0), Fraction(42, 1000), Fraction(83, 1000), Fraction(125, 1000)]
+    assert hash(timestamps) == hash(expected)
+
+    # PTS that already start from 0 aren't copied
+    timestamps = VideoTimestamps.from_buffer(array("q", [0, 42, 83, 125]), time_scale, fps=fps)
+    assert isinstance(timestamps._VideoTimestamps__pts, memoryview) # type: ignore[attr-defined]
+
+    timestamps = VideoTimestamps.from_buffer(array("q", [10, 52, 93, 135]), time_scale, False)
+    assert timestamps.pts_list == [10, 52, 93, 135]
+    assert timestamps.first_timestamps == Fraction(10, 1000)
+    assert timestamps.nbr_frames == 3
+    assert timestamps.frame_to_time(3, TimeType.EXACT) == Fraction(135, 1000)
+    assert timestamps.time_to_frame(Fraction(60, 1000), TimeType.START) == 2
+    assert timestamps.time_to_frame(Fraction(60, 1000), TimeType.EXACT) == 1
+
+
+def test__eq__from_buffer() -> None:
+    timestamps = VideoTimestamps.from_buffer(array("q", [0, 42, 83]), Fraction(1000), fps=Fraction(24))
+
+    # The PTS are compared in their int64 form, so no list is created
+    assert timestamps == VideoTimestamps.from_buffer(memoryview(array("q", [0, 42, 83])), Fraction(1000), fps=Fraction(24))
+    assert timestamps == VideoTimestamps([0, 42, 83], Fraction(1000), fps=Fraction(24))
+    assert VideoTimestamps([0, 42, 83], Fraction(1000), fps=Fraction(24)) == timestamps
+    assert timestamps._VideoTimestamps__pts_list is None # type: ignore[attr-defined]
+
+    assert timestamps != VideoTimestamps.from_buffer(array("q", [0, 42, 84]), Fraction(1000), fps=Fraction(24))
+    assert timestamps != VideoTimestamps.from_buffer(array("q", [0, 42, 83, 125]), Fraction(1000), fps=Fraction(24))
+    assert timestamps != VideoTimestamps([0, 42, 1 << 64], Fraction(1000), fps=Fraction(24))
+
+
+def test_from_buffer_validate() -> None:
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(array("q", [0]), Fraction(1000))
+    assert str(exc_info.value) == "There must be at least 2 pts."
+
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(array("q", [0, 42, 42]), Fraction(1000))
+    assert str(exc_info.value) == "PTS must be in non-decreasing order."
+
+    # The order is checked while the PTS are normalized
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(array("q", [10, 52, 93, 52]), Fraction(1000))
+    assert str(exc_info.value) == "PTS must be in non-decreasing order."
+
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(bytes(12), Fraction(1000))
+    assert str(exc_info.value) == "The buffer size (12 bytes) isn't a multiple of 8 bytes."
+
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(array("i", [0, 42, 83]), Fraction(1000))
+    assert str(exc_info.value) == 'The buffer must contain native signed 64-bit integers, but its format is "i".'
+
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_buffer(array("d", [0, 42, 83]), Fraction(1000))
+    assert str(exc_info.value) == 'The buffer must contain native signed 64-bit integers, but its format is "d".'
+
+
+def test_pickle() -> None:
+    timestamps = VideoTimestamps([10, 52, 93, 135], Fraction(1000), True, Fraction(24000, 1001))
+    unpickled_timestamps = pickle.loads(pickle.dumps(timestamps))
+    assert unpickled_timestamps == timestamps
+    assert unpickled_timestamps.pts_list == [0, 42, 83, 125]
+    assert unpickled_timestamps.fps == Fraction(24000, 1001)
+
+    timestamps = VideoTimestamps.from_buffer(array("q", [10, 52, 93, 135]), Fraction(1000), False)
+    assert pickle.loads(pickle.dumps(timestamps)) == timestamps
+
+    # PTS that don't fit in 64-bit
+    timestamps = VideoTimestamps([0, pow(2, 70)], Fraction(1000))
+    assert pickle.loads(pickle.dumps(timestamps)) == timestamps
+
+
+def test_shared_memory() -> None:
+    timestamps = VideoTimestamps([10, 52, 93, 135], Fraction(90000, 1001), False, Fraction(24000, 1001))
+    shared_memory = timestamps.to_shared_memory()
+
+    try:
+        shared_timestamps = VideoTimestamps.from_shared_memory(shared_memory.name)
+        assert shared_timestamps == timestamps
+        assert shared_timestamps.time_scale == Fraction(90000, 1001)
+        assert shared_timestamps.fps == Fraction(24000, 1001)
+        assert shared_timestamps.frame_to_time(1, TimeType.EXACT) == Fraction(52 * 1001, 90000)
+        del shared_timestamps
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def get_shared_memory_pts_list(name: str) -> list[int]:
+    return VideoTimestamps.from_shared_memory(name).pts_list
+
+
+def test_shared_memory_process_pool() -> None:
+    timestamps = VideoTimestamps([10, 52, 93, 135], Fraction(1000), False, Fraction(24))
+    shared_memory = timestamps.to_shared_memory()
+
+    try:
+        with ProcessPoolExecutor(4) as executor:
+            assert list(executor.map(get_shared_memory_pts_list, [shared_memory.name] * 4)) == [[10, 52, 93, 135]] * 4
+
+        # The workers haven't unlinked the block
+        assert VideoTimestamps.from_shared_memory(shared_memory.name) == timestamps
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def test_rescale() -> None:
+    timestamps = VideoTimestamps([0, 3754, 7508, 11261, 15015], Fraction(90000), fps=Fraction(24000, 1001))
+
+    rescaled_timestamps = timestamps.rescale(Fraction(1000), RoundingMethod.ROUND)
+    assert rescaled_timestamps.pts_list == [0, 42, 83, 125, 167]
+    assert rescaled_timestamps.time_scale == Fraction(1000)
+    assert rescaled_timestamps.fps == Fraction(24000, 1001)
+
+    rescaled_timestamps = timestamps.rescale(Fraction(1000), RoundingMethod.FLOOR)
+    assert rescaled_timestamps.pts_list == [0, 41, 83, 125, 166]
+
+    # The time_scale is always stored as a Fraction
+    rescaled_timestamps = timestamps.rescale(1000, RoundingMethod.ROUND) # type: ignore[arg-type]
+    assert type(rescaled_timestamps.time_scale) is Fraction
+    assert rescaled_timestamps == timestamps.rescale(Fraction(1000), RoundingMethod.ROUND)
+
+    timestamps = VideoTimestamps.from_buffer(array("q", [-3754, 0, 3754]), Fraction(90000), False)
+    assert timestamps.rescale(Fraction(1000), RoundingMethod.ROUND).pts_list == [-42, 0, 42]
+    assert timestamps.rescale(Fraction(1000), RoundingMethod.FLOOR).pts_list == [-42, 0, 41]
+
+
+def test_rescale_collision() -> None:
+    timestamps = VideoTimestamps([0, 10, 20, 90, 180], Fraction(90000))
+
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.rescale(Fraction(1000), RoundingMethod.ROUND)
+    assert str(exc_info.value) == "2 frame(s) have the same PTS as their previous frame once converted to the time_scale 1000. The first of them are [1, 2]."
+
+    # Only the first colliding frames are listed
+    timestamps = VideoTimestamps.from_buffer(array("q", range(0, 1000, 10)), Fraction(90000))
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.rescale(Fraction(1000), RoundingMethod.FLOOR)
+    assert str(exc_info.value) == "88 frame(s) have the same PTS as their previous frame once converted to the time_scale 1000. The first of them are [1, 2, 3, 4, 5]."
+
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.rescale(Fraction(0), RoundingMethod.ROUND)
+    assert str(exc_info.value) == "Parameter ``time_scale`` must be higher than 0."
+
+
+def test_export_timestamps_v1(tmp_path: Path) -> None:
+    timestamps_filename = tmp_path / "timestamps.txt"
+    time_scale = Fraction(90000)
+    rounding_method = RoundingMethod.ROUND
+    # 10 frames at 24000/1001 fps, then 6 frames at 60 fps, then 5 frames at 24000/1001 fps
+    times = [Fraction(frame * 1001, 24000) for frame in range(11)]
+    times.extend(times[10] + Fraction(frame, 60) for frame in range(1, 7))
+    times.extend(times[16] + Fraction(frame * 1001, 24000) for frame in range(1, 6))
+    pts_list = [rounding_method(time * time_scale) for time in times]
+    timestamps = VideoTimestamps(pts_list, time_scale)
+
+    timestamps.export_timestamps(timestamps_filename, version=1, rounding_method=rounding_method)
+
+    assert timestamps_filename.read_text() == (
+        "# timestamp format v1\n"
+        "assume 23.976\n"
+        "10,15,60\n"
+        "16,20,23.976\n"
+    )
+    text_file_timestamps = TextFileTimestamps(timestamps_filename, time_scale, rounding_method)
+    assert [text_file_timestamps.frame_to_pts(frame, TimeType.EXACT) for frame in range(len(pts_list))] == pts_list
+
+
+def test_export_timestamps_v1_invalid(tmp_path: Path) -> None:
+    timestamps_filename = tmp_path / "timestamps.txt"
+    timestamps = VideoTimestamps([10, 20, 30], Fraction(1000), False)
+
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.export_timestamps(timestamps_filename, version=1, rounding_method=RoundingMethod.ROUND)
+    assert str(exc_info.value) == "The first PTS needs to be 0 to export the timestamps to the version 1, since its first frame always starts at 0 ms."
+
+    with pytest.raises(ValueError) as exc_info:
+        timestamps.export_timestamps(timestamps_filename, version=1) # type: ignore[call-overload]
+    assert str(exc_info.value) == "The rounding_method needs to be specified with the version 1."
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz"])
+def test_export_timestamps_compressed(tmp_path: Path, suffix: str) -> None:
+    timestamps_filename = tmp_path / f"timestamps.txt{suffix}"
+    timestamps = VideoTimestamps([0, 42, 83, 125], Fraction(1000))
+
+    timestamps.export_timestamps(timestamps_filename, precision=3, precision_rounding=RoundingMethod.ROUND)
+
+    assert timestamps_filename.read_bytes()[:3] != b"# t"
+    text_file_timestamps = TextFileTimestamps(timestamps_filename, Fraction(1000), RoundingMethod.ROUND)
+    assert [text_file_timestamps.frame_to_pts(frame, TimeType.EXACT) for frame in range(4)] == [0, 42, 83, 125]
+
+
+def test_from_ffprobe_dump(tmp_path: Path) -> None:
+    dump_path = tmp_path / "dump.csv"
+    dump_path.write_text(
+        "packet,codec_type=video,stream_index=0,pts=1000,duration=40\n"
+        "packet,codec_type=video,stream_index=0,pts=1080,duration=40\n"
+        "packet,codec_type=video,stream_index=0,pts=1040,duration=40\n"
+        "stream,index=0,codec_type=video,time_base=1/1000\n"
+    )
+
+    timestamps = VideoTimestamps.from_ffprobe_dump(dump_path)
+    assert timestamps.pts_list == [0, 40, 80, 120]
+    assert timestamps.time_scale == Fraction(1000)
+
+    timestamps = VideoTimestamps.from_ffprobe_dump(dump_path, Fraction(90000), normalize=False)
+    assert timestamps.pts_list == [1000, 1040, 1080, 1120]
+    assert timestamps.time_scale == Fraction(90000)
+
+    with pytest.raises(ValueError) as exc_info:
+        VideoTimestamps.from_ffprobe_dump(StringIO("packet,codec_type=video,stream_index=0,pts=0,duration=1\n"))
+    assert str(exc_info.value) == "The ffprobe dump doesn't contain the time_base of the stream. Specify the time_scale or use the option -show_streams of ffprobe."
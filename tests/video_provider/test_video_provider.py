@@ -1,4 +1,7 @@
 import os
+import struct
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
 from pathlib import Path
 
@@ -8,12 +11,17 @@ from video_timestamps import (
     ABCVideoProvider,
     BestSourceVideoProvider,
     FFMS2VideoProvider,
+    LibavDemuxVideoProvider,
+    MatroskaVideoProvider,
+    MP4VideoProvider,
+    MPEGTSVideoProvider,
 )
+from video_timestamps.video_provider import mpeg_ts_video_provider
 
 dir_path = Path(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_mkv(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -25,7 +33,7 @@ def test_get_pts_mkv(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MP4VideoProvider()])
 def test_get_pts_mp4(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.mp4")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -37,7 +45,7 @@ def test_get_pts_mp4(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider()])
 def test_get_pts_avi(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.avi")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -49,7 +57,7 @@ def test_get_pts_avi(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider()])
 def test_get_pts_file_without_pts(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "video_without_pts_time.avi")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -60,7 +68,7 @@ def test_get_pts_file_without_pts(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [FFMS2VideoProvider(), LibavDemuxVideoProvider()])
 def test_get_pts_file_with_negative_pts(video_provider: ABCVideoProvider) -> None:
     # We don't test this with bestsource because the video is broken and bestsource return us unordered PTS. For more info, see: https://github.com/vapoursynth/bestsource/issues/105
     video_file_path = dir_path.joinpath("files", "video_with_negative_pts.mp4")
@@ -73,7 +81,7 @@ def test_get_pts_file_with_negative_pts(video_provider: ABCVideoProvider) -> Non
     assert fps == Fraction(100000, 4213)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_mkv_cs(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "mkv_timescale_cs.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -85,7 +93,7 @@ def test_get_pts_mkv_cs(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_mkv_us(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "mkv_timescale_us.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -97,7 +105,7 @@ def test_get_pts_mkv_us(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(24000, 1001)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_mkv_10_frames(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video_10_frames.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -107,7 +115,7 @@ def test_get_pts_mkv_10_frames(video_provider: ABCVideoProvider) -> None:
     assert fps == Fraction(20)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_multiple_video_track_absolute_index_0(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 0)
@@ -117,7 +125,7 @@ def test_get_pts_multiple_video_track_absolute_index_0(video_provider: ABCVideoP
     assert fps == Fraction(60)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_multiple_video_track_absolute_index_2(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), 2)
@@ -127,7 +135,7 @@ def test_get_pts_multiple_video_track_absolute_index_2(video_provider: ABCVideoP
     assert fps == Fraction(40)
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_multiple_video_track_relative_index_0(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), None, 0)
@@ -136,7 +144,7 @@ def test_get_pts_multiple_video_track_relative_index_0(video_provider: ABCVideoP
     assert time_base == Fraction(1, 1000)
     assert fps == Fraction(60)
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_multiple_video_track_relative_index_1(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
     pts_list, time_base, fps = video_provider.get_pts(str(video_file_path), None, 1)
@@ -145,7 +153,7 @@ def test_get_pts_multiple_video_track_relative_index_1(video_provider: ABCVideoP
     assert time_base == Fraction(1, 1000)
     assert fps == Fraction(40)
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_multiple_video_track_relative_index_invalid(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
 
@@ -154,7 +162,58 @@ def test_get_pts_multiple_video_track_relative_index_invalid(video_provider: ABC
     assert str(exc_info.value) == f"The video_stream_index 2 is not in the file {video_file_path}. It only contains 2 video stream(s)."
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
+def test_get_all_pts_multiple_video_track(video_provider: ABCVideoProvider) -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+
+    result = video_provider.get_all_pts(str(video_file_path))
+
+    assert list(result) == [0, 2]
+    assert result[0] == video_provider.get_pts(str(video_file_path), 0)
+    assert result[2] == video_provider.get_pts(str(video_file_path), 2)
+    assert video_provider.get_all_pts(str(video_file_path), [2, 0, 2]) == result
+    assert video_provider.get_all_pts(str(video_file_path), [2]) == {2: result[2]}
+
+
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
+def test_get_all_pts_non_video_index(video_provider: ABCVideoProvider) -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+
+    with pytest.raises(ValueError) as exc_info:
+        video_provider.get_all_pts(str(video_file_path), [0, 1])
+    assert str(exc_info.value) == "The index 1 is not a video stream. It is an \"audio\" stream."
+
+
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider()])
+def test_get_all_pts_buffer(video_provider: BestSourceVideoProvider | FFMS2VideoProvider | LibavDemuxVideoProvider) -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+
+    result = video_provider.get_all_pts_buffer(str(video_file_path))
+
+    assert {index: (memoryview(pts_buffer).tolist(), time_base, fps) for index, (pts_buffer, time_base, fps) in result.items()} == video_provider.get_all_pts(str(video_file_path))
+
+
+def test_get_all_pts_default() -> None:
+    class GetPtsVideoProvider(ABCVideoProvider):
+        def __init__(self) -> None:
+            # The native constructor of ABCVideoProvider is abstract, so it isn't called
+            pass
+
+        def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+            assert index is not None
+            return [0, index + 1], Fraction(1, 1000), Fraction(index + 1)
+
+    # A provider that only implements get_pts extracts each stream with it
+    result = GetPtsVideoProvider().get_all_pts("video.mkv", [2, 0, 2])
+    assert list(result) == [0, 2]
+    assert result == {0: ([0, 1], Fraction(1, 1000), Fraction(1)), 2: ([0, 3], Fraction(1, 1000), Fraction(3))}
+
+    with pytest.raises(ValueError) as exc_info:
+        GetPtsVideoProvider().get_all_pts("video.mkv")
+    assert str(exc_info.value) == "This video provider can't list the video streams of a file, so the indices must be specified."
+
+
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_non_video_index(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.mkv")
 
@@ -163,7 +222,7 @@ def test_get_pts_non_video_index(video_provider: ABCVideoProvider) -> None:
     assert str(exc_info.value) == "The index 1 is not a video stream. It is an \"audio\" stream."
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_invalid_index(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.mkv")
 
@@ -172,7 +231,7 @@ def test_get_pts_invalid_index(video_provider: ABCVideoProvider) -> None:
     assert str(exc_info.value) == f"The index 2 is not in the file {video_file_path}."
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider()])
 def test_get_pts_without_index(video_provider: ABCVideoProvider) -> None:
     video_file_path = dir_path.joinpath("files", "test_video.mkv")
 
@@ -181,6 +240,392 @@ def test_get_pts_without_index(video_provider: ABCVideoProvider) -> None:
     assert str(exc_info.value) == "You must specify exactly one of \"index\" or \"video_stream_index\"."
 
 
-@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider()])
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider(), MatroskaVideoProvider(), MP4VideoProvider()])
 def test_is_instance_ABCVideoProvider(video_provider: ABCVideoProvider) -> None:
     assert isinstance(video_provider, ABCVideoProvider)
+
+
+def test_get_pts_ffms2_index_cache(tmp_path: Path) -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mkv")
+    index_cache_directory = tmp_path / "index"
+    video_provider = FFMS2VideoProvider(str(index_cache_directory))
+
+    result = video_provider.get_pts(str(video_file_path), 0)
+    assert len(list(index_cache_directory.iterdir())) == 1
+
+    # The second call reads the index from the cache
+    assert video_provider.get_pts(str(video_file_path), 0) == result
+    assert FFMS2VideoProvider().get_pts(str(video_file_path), 0) == result
+
+    # A corrupted index is replaced
+    index_path = next(index_cache_directory.iterdir())
+    index_path.write_bytes(b"invalid index")
+    assert video_provider.get_pts(str(video_file_path), 0) == result
+    assert index_path.read_bytes() != b"invalid index"
+
+
+def test_get_pts_ffms2_index_cache_multiple_video_track(tmp_path: Path) -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+    index_cache_directory = tmp_path / "index"
+    video_provider = FFMS2VideoProvider(str(index_cache_directory))
+
+    # Only the requested track is indexed, so each track has its own index
+    pts_list_0, _, _ = video_provider.get_pts(str(video_file_path), 0)
+    pts_list_2, _, _ = video_provider.get_pts(str(video_file_path), 2)
+    assert len(list(index_cache_directory.iterdir())) == 2
+    assert pts_list_0[:11] == [0, 17, 33, 50, 67, 83, 100, 117, 133, 150, 167]
+    assert pts_list_2[:11] == [0, 25, 50, 75, 100, 125, 150, 175, 200, 225, 250]
+    assert video_provider.get_pts(str(video_file_path), 0)[0] == pts_list_0
+
+
+@pytest.mark.parametrize("filename", [
+    "test_video.mkv",
+    "test_video.mp4",
+    "test_video.avi",
+    "mkv_timescale_cs.mkv",
+    "mkv_timescale_us.mkv",
+    "test_video_10_frames.mkv",
+    "multiple_video_track.mkv",
+])
+def test_get_pts_ffms2_without_video_source(filename: str) -> None:
+    video_file_path = dir_path.joinpath("files", filename)
+    pts_list, time_base, fps = FFMS2VideoProvider(create_video_source=False).get_pts(str(video_file_path), 0)
+    expected_pts_list, expected_time_base, expected_fps = FFMS2VideoProvider().get_pts(str(video_file_path), 0)
+
+    # Only the duration of the last frame is guessed
+    assert len(pts_list) == len(expected_pts_list)
+    assert pts_list[:-1] == expected_pts_list[:-1]
+    assert pts_list[-1] == 2 * pts_list[-2] - pts_list[-3]
+    assert time_base == expected_time_base
+    assert fps == Fraction(len(pts_list) - 1) / ((pts_list[-1] - pts_list[0]) * time_base)
+    # The mean fps isn't rounded and snapped like the fps of the video source
+    assert abs(fps - expected_fps) < Fraction(1, 10)
+
+
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider()])
+def test_get_pts_in_threads(video_provider: ABCVideoProvider) -> None:
+    # The GIL is released while the video is indexed, so the calls run in parallel
+    filenames = [str(dir_path.joinpath("files", filename)) for filename in ("test_video.mkv", "test_video.mp4", "test_video.avi")]
+    with ThreadPoolExecutor(len(filenames)) as executor:
+        results = list(executor.map(lambda filename: video_provider.get_pts(filename, 0), filenames))
+
+    assert results == [video_provider.get_pts(filename, 0) for filename in filenames]
+
+
+@pytest.mark.parametrize("video_provider", [BestSourceVideoProvider(), FFMS2VideoProvider(), LibavDemuxVideoProvider()])
+def test_get_pts_buffer(video_provider: BestSourceVideoProvider | FFMS2VideoProvider | LibavDemuxVideoProvider) -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mp4")
+    pts_buffer, time_base, fps = video_provider.get_pts_buffer(str(video_file_path), 0)
+
+    view = memoryview(pts_buffer)
+    assert view.itemsize == 8
+    assert (view.tolist(), time_base, fps) == video_provider.get_pts(str(video_file_path), 0)
+
+
+@pytest.mark.parametrize("filename", [
+    "test_video.mkv",
+    "test_video.mp4",
+    "test_video.avi",
+    "video_without_pts_time.avi",
+    "video_with_negative_pts.mp4",
+    "mkv_timescale_cs.mkv",
+    "mkv_timescale_us.mkv",
+    "test_video_10_frames.mkv",
+    "multiple_video_track.mkv",
+])
+def test_get_pts_libav_demux_same_as_ffms2(filename: str) -> None:
+    video_file_path = dir_path.joinpath("files", filename)
+    assert LibavDemuxVideoProvider().get_pts(str(video_file_path), None, 0) == FFMS2VideoProvider().get_pts(str(video_file_path), None, 0)
+
+
+def test_get_pts_mp4_file_with_negative_pts() -> None:
+    # The edit list removes the frames before the start of the video
+    video_file_path = dir_path.joinpath("files", "video_with_negative_pts.mp4")
+    pts_list, time_base, fps = MP4VideoProvider().get_pts(str(video_file_path), 0)
+
+    assert len(pts_list) == 496
+    assert pts_list[:10] == [0, 3754, 7508, 11261, 15015, 18769, 22523, 26276, 30030, 33784]
+    assert pts_list[-10:] == [1824323, 1828076, 1831830, 1835584, 1839338, 1843091, 1846845, 1850599, 1854353, 1858107]
+    assert time_base == Fraction(1, 90000)
+    # Like FFMS2, the discarded frames are in the duration used to compute the fps
+    assert fps == Fraction(100000, 4213)
+
+
+@pytest.mark.parametrize("filename", ["test_video.mp4", "video_with_negative_pts.mp4"])
+def test_get_pts_mp4_same_as_ffms2(filename: str) -> None:
+    video_file_path = dir_path.joinpath("files", filename)
+    pts_list, time_base, fps = MP4VideoProvider().get_pts(str(video_file_path), None, 0)
+    expected_pts_list, expected_time_base, expected_fps = FFMS2VideoProvider().get_pts(str(video_file_path), None, 0)
+
+    assert pts_list == expected_pts_list
+    assert time_base == expected_time_base
+    assert fps == expected_fps
+
+
+def make_mp4_with_edit_list(edits: list[tuple[int, int]]) -> bytes:
+    # Replace the edit list of the video track of test_video.mp4. Its moov box is after its mdat box, so the chunk offsets don't change.
+    def replace_elst(data: bytes, path: list[bytes]) -> bytes:
+        boxes = b""
+        position = 0
+        while position < len(data):
+            size, box_type = struct.unpack_from(">I4s", data, position)
+            box = data[position:position + size]
+            if box_type == path[0]:
+                if len(path) == 1:
+                    box = struct.pack(">I4sII", 16 + 12 * len(edits), b"elst", 0, len(edits))
+                    box += b"".join(struct.pack(">Iihh", segment_duration, media_time, 1, 0) for segment_duration, media_time in edits)
+                else:
+                    content = replace_elst(box[8:], path[1:])
+                    box = struct.pack(">I4s", 8 + len(content), box_type) + content
+                # Only the first trak is the video track
+                path = [b""]
+            boxes += box
+            position += size
+        return boxes
+
+    data = dir_path.joinpath("files", "test_video.mp4").read_bytes()
+    return replace_elst(data, [b"moov", b"trak", b"edts", b"elst"])
+
+
+@pytest.mark.parametrize("edits", [
+    # Start in the middle of the first GOP
+    [(10000, 2002 + 1001 * 120)],
+    # Start after the second keyframe
+    [(8000, 2002 + 1001 * 260)],
+    # End before the second keyframe
+    [(10000, 2002)],
+    # Delay the video
+    [(500, -1), (500, -1), (20855, 2002)],
+    # The edit doesn't start at the pts of the first frame
+    [(20855, 0)],
+])
+def test_get_pts_mp4_edit_list_same_as_libav_demux(tmp_path: Path, edits: list[tuple[int, int]]) -> None:
+    video_file_path = tmp_path / "video.mp4"
+    video_file_path.write_bytes(make_mp4_with_edit_list(edits))
+
+    assert MP4VideoProvider().get_pts(str(video_file_path), 0) == LibavDemuxVideoProvider().get_pts(str(video_file_path), 0)
+
+
+@pytest.mark.parametrize("edits", [
+    [(5000, 2002), (5000, 2002 + 1001 * 300)],
+    [(20855, 2002), (1000, -1)],
+])
+def test_get_pts_mp4_several_edits(tmp_path: Path, edits: list[tuple[int, int]]) -> None:
+    video_file_path = tmp_path / "video.mp4"
+    video_file_path.write_bytes(make_mp4_with_edit_list(edits))
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), 0)
+    assert str(exc_info.value) == f"The edit list of the file {video_file_path} contains 2 edits. Only the empty edits followed by a single edit are supported."
+
+
+def test_get_pts_mp4_invalid_index() -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mp4")
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), 1)
+    assert str(exc_info.value) == "The index 1 is not a video stream. It is an \"audio\" stream."
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), 2)
+    assert str(exc_info.value) == f"The index 2 is not in the file {video_file_path}."
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), None, 1)
+    assert str(exc_info.value) == f"The video_stream_index 1 is not in the file {video_file_path}. It only contains 1 video stream(s)."
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), None)
+    assert str(exc_info.value) == "You must specify exactly one of \"index\" or \"video_stream_index\"."
+
+
+def test_get_pts_mp4_not_mp4_file() -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mkv")
+
+    with pytest.raises(ValueError) as exc_info:
+        MP4VideoProvider().get_pts(str(video_file_path), 0)
+    assert str(exc_info.value) == f"The file {video_file_path} isn't a MP4/MOV file, since it doesn't contain a moov box."
+
+
+def test_get_pts_matroska_not_matroska_file() -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mp4")
+
+    with pytest.raises(ValueError) as exc_info:
+        MatroskaVideoProvider().get_pts(str(video_file_path), 0)
+    assert str(exc_info.value) == f"The file {video_file_path} isn't a Matroska/WebM file, since it doesn't start with an EBML header."
+
+
+def test_get_pts_matroska_only_keeps_requested_blocks() -> None:
+    video_file_path = dir_path.joinpath("files", "multiple_video_track.mkv")
+    _, tracks, track_indices, blocks = MatroskaVideoProvider._parse_file(str(video_file_path), lambda tracks: [2])
+
+    assert track_indices == [2]
+    assert list(blocks) == [tracks[2].track_number]
+
+
+def test_get_all_pts_mp4() -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mp4")
+
+    assert MP4VideoProvider().get_all_pts(str(video_file_path)) == {0: MP4VideoProvider().get_pts(str(video_file_path), 0)}
+
+
+TS_VIDEO_PID = 0x100
+TS_AUDIO_PID = 0x101
+TS_PMT_PID = 0x1000
+
+
+def make_ts_packet(pid: int, payload: bytes, payload_unit_start: bool) -> bytes:
+    # The payload is padded with an adaptation field made of stuffing bytes
+    stuffing_size = 184 - len(payload)
+    if stuffing_size:
+        adaptation_field = bytes([stuffing_size - 1]) + (b"\x00" + b"\xff" * (stuffing_size - 2) if stuffing_size > 1 else b"")
+        return bytes([0x47, (0x40 if payload_unit_start else 0) | pid >> 8, pid & 0xFF, 0x30]) + adaptation_field + payload
+    return bytes([0x47, (0x40 if payload_unit_start else 0) | pid >> 8, pid & 0xFF, 0x10]) + payload
+
+
+def make_ts_section(table_id: int, table_id_extension: int, data: bytes) -> bytes:
+    # The CRC isn't checked, so it is left to 0
+    section_length = 5 + len(data) + 4
+    section = bytes([table_id, 0xB0 | section_length >> 8, section_length & 0xFF, table_id_extension >> 8, table_id_extension & 0xFF, 0xC1, 0, 0]) + data + b"\x00" * 4
+    return b"\x00" + section
+
+
+def make_pes_header(pts: int | None) -> bytes:
+    if pts is None:
+        return b"\x00\x00\x01\xe0\x00\x00\x80\x00\x00"
+    pts %= 1 << 33
+    return b"\x00\x00\x01\xe0\x00\x00\x80\x80\x05" + bytes([
+        0x21 | (pts >> 29) & 0x0E,
+        pts >> 22 & 0xFF,
+        (pts >> 14) & 0xFE | 1,
+        pts >> 7 & 0xFF,
+        (pts << 1) & 0xFE | 1,
+    ])
+
+
+def make_ts(pts_list: Sequence[int | None]) -> bytes:
+    pat = make_ts_section(0x00, 1, bytes([0, 1, 0xE0 | TS_PMT_PID >> 8, TS_PMT_PID & 0xFF]))
+    pmt = make_ts_section(0x02, 1, bytes([
+        0xE0 | TS_VIDEO_PID >> 8, TS_VIDEO_PID & 0xFF, 0xF0, 0,
+        0x1B, 0xE0 | TS_VIDEO_PID >> 8, TS_VIDEO_PID & 0xFF, 0xF0, 0,
+        0x0F, 0xE0 | TS_AUDIO_PID >> 8, TS_AUDIO_PID & 0xFF, 0xF0, 0,
+    ]))
+    packets = [make_ts_packet(0, pat, True), make_ts_packet(TS_PMT_PID, pmt, True)]
+    for pts in pts_list:
+        # Each frame is a PES packet split in 2 TS packets, followed by an audio packet
+        packets.append(make_ts_packet(TS_VIDEO_PID, make_pes_header(pts) + b"\x00" * 170, True))
+        packets.append(make_ts_packet(TS_VIDEO_PID, b"\x00" * 184, False))
+        packets.append(make_ts_packet(TS_AUDIO_PID, make_pes_header(pts).replace(b"\xe0", b"\xc0", 1) + b"\x00" * 170, True))
+    return b"".join(packets)
+
+
+def decoding_order(pts_list: list[int]) -> list[int]:
+    # Each P-frame is before the 2 B-frames that precede it in presentation order
+    reordered = pts_list[:1]
+    for i in range(1, len(pts_list) - 2, 3):
+        reordered += [pts_list[i + 2], pts_list[i], pts_list[i + 1]]
+    return reordered + pts_list[len(reordered):]
+
+
+def test_get_pts_mpeg_ts(tmp_path: Path) -> None:
+    video_file_path = tmp_path / "video.ts"
+    expected_pts_list = [126000 + frame * 3003 for frame in range(100)]
+    video_file_path.write_bytes(make_ts(decoding_order(expected_pts_list)))
+
+    pts_list, time_base, fps = MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+
+    assert pts_list == expected_pts_list + [expected_pts_list[-1] + 3003]
+    assert time_base == Fraction(1, 90000)
+    assert fps == Fraction(30000, 1001)
+    assert MPEGTSVideoProvider().get_pts(str(video_file_path), None, 0) == (pts_list, time_base, fps)
+
+
+def test_get_pts_mpeg_ts_wraparound(tmp_path: Path) -> None:
+    video_file_path = tmp_path / "video.ts"
+    expected_pts_list = [(1 << 33) - 50 * 3003 + frame * 3003 for frame in range(100)]
+    video_file_path.write_bytes(make_ts(decoding_order(expected_pts_list)))
+
+    pts_list, _, _ = MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+
+    assert pts_list == expected_pts_list + [expected_pts_list[-1] + 3003]
+
+
+def test_get_pts_mpeg_ts_in_parallel(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(mpeg_ts_video_provider, "PARALLEL_MIN_PART_SIZE", 188)
+    video_file_path = tmp_path / "video.ts"
+    # The PTS wrap around in the middle of the file, so some parts need to be shifted when they are joined
+    expected_pts_list = [(1 << 33) - 150 * 3003 + frame * 3003 for frame in range(300)]
+    video_file_path.write_bytes(make_ts(decoding_order(expected_pts_list)))
+
+    pts_list, _, _ = MPEGTSVideoProvider(4).get_pts(str(video_file_path), 0)
+
+    assert pts_list == expected_pts_list + [expected_pts_list[-1] + 3003]
+    assert MPEGTSVideoProvider(7).get_pts(str(video_file_path), 0) == MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+
+
+def test_get_pts_mpeg_ts_m2ts(tmp_path: Path) -> None:
+    video_file_path = tmp_path / "video.m2ts"
+    expected_pts_list = [frame * 3750 for frame in range(50)]
+    ts = make_ts(expected_pts_list)
+    # Each packet of a M2TS file starts with a 4 bytes timestamp
+    video_file_path.write_bytes(b"".join(b"\x00\x00\x00\x00" + ts[position:position + 188] for position in range(0, len(ts), 188)))
+
+    pts_list, _, fps = MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+
+    assert pts_list == expected_pts_list + [expected_pts_list[-1] + 3750]
+    assert fps == Fraction(24)
+
+
+def test_get_pts_mpeg_ts_non_video_index(tmp_path: Path) -> None:
+    video_file_path = tmp_path / "video.ts"
+    video_file_path.write_bytes(make_ts([0, 3003]))
+
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider().get_pts(str(video_file_path), 1)
+    assert str(exc_info.value) == "The index 1 is not a video stream. It is an \"audio\" stream."
+
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider().get_pts(str(video_file_path), None, 1)
+    assert str(exc_info.value) == f"The video_stream_index 1 is not in the file {video_file_path}. It only contains 1 video stream(s)."
+
+
+def test_get_all_pts_mpeg_ts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(mpeg_ts_video_provider, "PARALLEL_MIN_PART_SIZE", 188)
+    video_file_path = tmp_path / "video.ts"
+    expected_pts_list = [(1 << 33) - 50 * 3003 + frame * 3003 for frame in range(100)]
+    video_file_path.write_bytes(make_ts(decoding_order(expected_pts_list)))
+
+    for max_workers in (1, 4):
+        result = MPEGTSVideoProvider(max_workers).get_all_pts(str(video_file_path))
+        assert result == {0: MPEGTSVideoProvider().get_pts(str(video_file_path), 0)}
+
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider().get_all_pts(str(video_file_path), [1])
+    assert str(exc_info.value) == "The index 1 is not a video stream. It is an \"audio\" stream."
+
+
+def test_get_pts_mpeg_ts_pes_without_pts(tmp_path: Path) -> None:
+    video_file_path = tmp_path / "video.ts"
+    video_file_path.write_bytes(make_ts([0, 3003, None, 9009]))
+
+    # Each PES packet is a frame, so it can't be skipped
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+    assert str(exc_info.value) == (
+        f"The PES packet at the byte {8 * 188} of the file {video_file_path} doesn't have a PTS. "
+        "The PTS of its frame can only be known by decoding the video, so use another video provider."
+    )
+
+
+def test_get_pts_mpeg_ts_not_ts_file() -> None:
+    video_file_path = dir_path.joinpath("files", "test_video.mkv")
+
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider().get_pts(str(video_file_path), 0)
+    assert str(exc_info.value) == f"The file {video_file_path} isn't a MPEG-TS file, since its packets don't start with the sync byte."
+
+
+def test_mpeg_ts_invalid_max_workers() -> None:
+    with pytest.raises(ValueError) as exc_info:
+        MPEGTSVideoProvider(0)
+    assert str(exc_info.value) == "Parameter ``max_workers`` must be higher than 0."
@@ -4,6 +4,7 @@ from .video_provider import *
 # Files
 from .abc_timestamps import *
 from .fps_timestamps import *
+from .frame_rate_analysis import *
 from .rounding_method import *
 from .text_file_timestamps import *
 from .time_type import *
@@ -0,0 +1,92 @@
+import bz2
+import gzip
+import lzma
+import sys
+from io import BufferedIOBase, TextIOWrapper
+from pathlib import Path
+from typing import BinaryIO, Literal, cast
+
+__all__ = ["open_decompressed", "open_text_for_writing"]
+
+# The magic bytes at the start of each supported compressed format.
+# The legacy .lzma format doesn't have real magic bytes, but its header always starts with these bytes with the default settings of xz/lzma.
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "lzma",
+    b"\x5d\x00\x00": "lzma",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+MAGIC_BYTES_MAX_LENGTH = max(map(len, MAGIC_BYTES))
+
+# The compression used when a file is exported with one of these suffixes
+SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".zst": "zstd",
+}
+
+
+def _open(file: Path | BinaryIO, compression: str, mode: Literal["rb", "wb"]) -> BufferedIOBase:
+    if compression == "gzip":
+        return gzip.open(file, mode)
+    elif compression == "bz2":
+        return bz2.open(file, mode)
+    elif compression == "lzma":
+        return lzma.open(file, mode)
+    elif sys.version_info >= (3, 14):
+        from compression import zstd
+        return zstd.open(file, mode)
+    else:
+        raise ValueError("A zstd compressed file requires Python 3.14 or higher.")
+
+
+def _peek(file_content: BufferedIOBase, size: int) -> bytes:
+    if file_content.seekable():
+        position = file_content.tell()
+        data = file_content.read(size)
+        file_content.seek(position)
+        return data
+    elif hasattr(file_content, "peek"):
+        # Ex: a pipe. peek can return more or less bytes than requested
+        return cast(bytes, file_content.peek(size))[:size]
+    # The first bytes cannot be read without consuming them, so consider that the stream isn't compressed
+    return b""
+
+
+def open_decompressed(file_content: BufferedIOBase) -> BufferedIOBase | None:
+    """Detect if a binary stream is compressed with gzip, bz2, lzma/xz or zstd from its magic bytes.
+
+    The zstd format is only supported with Python 3.14 or higher (see the module `compression.zstd`).
+
+    Parameters:
+        file_content: The binary stream. It is read from its current position.
+
+    Returns:
+        A stream that decompresses `file_content` while it is read, or None if `file_content` isn't compressed.
+            Closing the returned stream doesn't close `file_content`.
+    """
+    magic_bytes = _peek(file_content, MAGIC_BYTES_MAX_LENGTH)
+    for magic, compression in MAGIC_BYTES.items():
+        if magic_bytes.startswith(magic):
+            return _open(cast(BinaryIO, file_content), compression, "rb")
+    return None
+
+
+def open_text_for_writing(path: Path) -> TextIOWrapper:
+    """Open a text file encoded in UTF-8 for writing.
+
+    If the suffix of `path` is ".gz", ".bz2", ".xz" or ".zst" (only with Python 3.14 or higher), the text is compressed while it is written.
+
+    Parameters:
+        path: The path of the file.
+
+    Returns:
+        The opened text file.
+    """
+    compression = SUFFIXES.get(Path(path).suffix.lower())
+    if compression is None:
+        return open(path, "w", encoding="utf-8")
+
+    return TextIOWrapper(cast(BinaryIO, _open(path, compression, "wb")), encoding="utf-8")
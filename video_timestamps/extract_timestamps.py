@@ -7,6 +7,10 @@ from .video_provider import (
     ABCVideoProvider,
     BestSourceVideoProvider,
     FFMS2VideoProvider,
+    LibavDemuxVideoProvider,
+    MatroskaVideoProvider,
+    MP4VideoProvider,
+    MPEGTSVideoProvider,
 )
 from .video_timestamps import VideoTimestamps
 
@@ -52,7 +56,7 @@ def main() -> None:
     parser.add_argument(
         "-vp",
         "--video-provider",
-        choices=["ffms2", "bestsource"],
+        choices=["ffms2", "bestsource", "libav", "mp4", "mkv", "ts"],
         default="ffms2",
         help="""
         Video provider to use for timestamps extraction (default: ffms2).
@@ -110,6 +114,14 @@ def main() -> None:
         video_provider = FFMS2VideoProvider()
     elif args.video_provider == "bestsource":
         video_provider = BestSourceVideoProvider()
+    elif args.video_provider == "libav":
+        video_provider = LibavDemuxVideoProvider()
+    elif args.video_provider == "mp4":
+        video_provider = MP4VideoProvider()
+    elif args.video_provider == "mkv":
+        video_provider = MatroskaVideoProvider()
+    elif args.video_provider == "ts":
+        video_provider = MPEGTSVideoProvider()
     else:
         raise ValueError(f"The provider \"{args.video_provider}\" is not supported.")
 
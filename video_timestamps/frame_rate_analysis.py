@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from fractions import Fraction
+from math import floor
+
+__all__ = ["FrameRateAnalysis", "FrameRateSegment"]
+
+# Minimum number of consecutive frames that must alternately last 3 and 2 fields to be a 3:2 pulldown
+PULLDOWN_MIN_FRAMES = 4
+
+
+class FrameRateSegment:
+    """Range of frames displayed at a constant frame rate.
+    """
+
+    def __init__(self, start_frame: int, end_frame: int, fps: Fraction):
+        """Initialize the FrameRateSegment object.
+
+        Parameters:
+            start_frame: The first frame of the segment.
+            end_frame: The last frame of the segment (inclusive).
+            fps: The frames per second of the segment.
+        """
+        self.__start_frame = start_frame
+        self.__end_frame = end_frame
+        self.__fps = fps
+
+    @property
+    def start_frame(self) -> int:
+        """
+        Returns:
+            The first frame of the segment.
+        """
+        return self.__start_frame
+
+    @property
+    def end_frame(self) -> int:
+        """
+        Returns:
+            The last frame of the segment (inclusive).
+        """
+        return self.__end_frame
+
+    @property
+    def fps(self) -> Fraction:
+        """
+        Returns:
+            The frames per second of the segment.
+                It is the simplest fraction that gives the PTS of the segment once they are rounded/floored.
+        """
+        return self.__fps
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrameRateSegment):
+            return False
+        return (self.start_frame, self.end_frame, self.fps) == (
+            other.start_frame, other.end_frame, other.fps
+        )
+
+    def __hash__(self) -> int:
+        return hash(
+            (
+                self.start_frame,
+                self.end_frame,
+                self.fps,
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"FrameRateSegment(start_frame={self.start_frame}, end_frame={self.end_frame}, fps={self.fps})"
+
+
+class FrameRateAnalysis:
+    """Report about the frame rate of a video.
+
+    Use [`VideoTimestamps.analyze`][video_timestamps.video_timestamps.VideoTimestamps.analyze] to get it.
+
+    Since the PTS are rounded/floored, a frame rate is considered constant as long as
+    every PTS is within 1 tick of the PTS that the frame rate would give.
+    """
+
+    def __init__(
+        self,
+        min_frame_duration: Fraction,
+        max_frame_duration: Fraction,
+        mean_frame_duration: Fraction,
+        frame_duration_histogram: dict[Fraction, int],
+        segments: list[FrameRateSegment],
+        dropped_frames: list[int],
+        pulldown_frames: list[int],
+    ):
+        self.__min_frame_duration = min_frame_duration
+        self.__max_frame_duration = max_frame_duration
+        self.__mean_frame_duration = mean_frame_duration
+        self.__frame_duration_histogram = frame_duration_histogram
+        self.__segments = segments
+        self.__dropped_frames = dropped_frames
+        self.__pulldown_frames = pulldown_frames
+
+    @classmethod
+    def _from_pts(cls, pts_list: Sequence[int], time_scale: Fraction) -> FrameRateAnalysis:
+        histogram: dict[int, int] = {}
+        segments: list[FrameRateSegment] = []
+        dropped_frames: list[int] = []
+        pulldown_frames: list[int] = []
+        # First frame of the current run of frames that alternately last 3 and 2 fields
+        pulldown_start: int | None = None
+
+        # The frame duration (in PTS) of the current segment is in the open interval ]low_num/low_den, high_num/high_den[
+        start_frame = 0
+        start_pts = pts_list[0]
+        low_num, low_den = pts_list[1] - start_pts - 1, 1
+        high_num, high_den = pts_list[1] - start_pts + 1, 1
+
+        previous_duration = 0
+        previous_previous_duration = 0
+        previous_pts = start_pts
+
+        # pts_list[frame] is the end of the frame "frame - 1"
+        for frame in range(1, len(pts_list)):
+            pts = pts_list[frame]
+            duration = pts - previous_pts
+            histogram[duration] = histogram.get(duration, 0) + 1
+
+            # Since a PTS can be off by less than 1 tick, the duration of the segment is: delta - 1 < nbr_frames * frame_duration < delta + 1
+            nbr_frames = frame - start_frame
+            delta = pts - start_pts
+            new_low_num, new_low_den = low_num, low_den
+            new_high_num, new_high_den = high_num, high_den
+            if (delta - 1) * low_den > low_num * nbr_frames:
+                new_low_num, new_low_den = delta - 1, nbr_frames
+            if (delta + 1) * high_den < high_num * nbr_frames:
+                new_high_num, new_high_den = delta + 1, nbr_frames
+
+            if new_low_num * new_high_den >= new_high_num * new_low_den:
+                # The interval is empty, so the frame rate changed at the frame "frame - 1"
+                segments.append(cls._create_segment(start_frame, frame - 2, Fraction(low_num, low_den), Fraction(high_num, high_den), time_scale))
+                start_frame = frame - 1
+                start_pts = previous_pts
+                low_num, low_den = duration - 1, 1
+                high_num, high_den = duration + 1, 1
+            else:
+                low_num, low_den = new_low_num, new_low_den
+                high_num, high_den = new_high_num, new_high_den
+
+            # The frame "frame - 2" is dropped if it last at least 1.75 times longer than the frames around it
+            if previous_duration and cls._is_dropped(previous_duration, duration) and (not previous_previous_duration or cls._is_dropped(previous_duration, previous_previous_duration)):
+                dropped_frames.append(frame - 2)
+
+            # The frames "frame - 2" and "frame - 1" are part of the current pulldown run
+            if previous_duration and cls._is_pulldown_pair(max(previous_duration, duration), min(previous_duration, duration)):
+                if pulldown_start is None:
+                    pulldown_start = frame - 2
+            elif pulldown_start is not None:
+                cls._add_pulldown_run(pulldown_frames, pulldown_start, frame - 2)
+                pulldown_start = None
+
+            previous_previous_duration = previous_duration
+            previous_duration = duration
+            previous_pts = pts
+
+        segments.append(cls._create_segment(start_frame, len(pts_list) - 2, Fraction(low_num, low_den), Fraction(high_num, high_den), time_scale))
+
+        if previous_previous_duration and cls._is_dropped(previous_duration, previous_previous_duration):
+            dropped_frames.append(len(pts_list) - 2)
+
+        if pulldown_start is not None:
+            cls._add_pulldown_run(pulldown_frames, pulldown_start, len(pts_list) - 2)
+
+        return cls(
+            Fraction(min(histogram), time_scale),
+            Fraction(max(histogram), time_scale),
+            Fraction(pts_list[-1] - pts_list[0], (len(pts_list) - 1) * time_scale),
+            {duration / time_scale: count for duration, count in sorted(histogram.items())},
+            segments,
+            dropped_frames,
+            pulldown_frames,
+        )
+
+    @staticmethod
+    def _is_dropped(duration: int, other_duration: int) -> bool:
+        # Each duration can be off by less than 1 tick, so the ratio must hold even if they are off by 1 tick in the opposite direction.
+        # Otherwise, a video with durations of a few ticks would report the rounding of the PTS as dropped frames.
+        return 4 * (duration - 1) >= 7 * (other_duration + 1)
+
+    @staticmethod
+    def _is_pulldown_pair(long_duration: int, short_duration: int) -> bool:
+        # A 3:2 pulldown alternates frames that last 3 fields with frames that last 2 fields, so their ratio is 3/2 within 10%.
+        # The durations of a constant frame rate can differ by less than 2 ticks because of the rounding of the PTS, so it isn't a pulldown.
+        return long_duration - short_duration >= 2 and 10 * abs(2 * long_duration - 3 * short_duration) < long_duration
+
+    @staticmethod
+    def _add_pulldown_run(pulldown_frames: list[int], start_frame: int, end_frame: int) -> None:
+        # A single pair of frames can be a coincidence, so the 3/2 alternation must repeat
+        if end_frame - start_frame + 1 >= PULLDOWN_MIN_FRAMES:
+            pulldown_frames.extend(range(start_frame, end_frame + 1))
+
+    @staticmethod
+    def _create_segment(start_frame: int, end_frame: int, low: Fraction, high: Fraction, time_scale: Fraction) -> FrameRateSegment:
+        frame_duration = FrameRateAnalysis._get_simplest_fraction_between(low, high)
+        return FrameRateSegment(start_frame, end_frame, time_scale / frame_duration)
+
+    @staticmethod
+    def _get_simplest_fraction_between(low: Fraction, high: Fraction) -> Fraction:
+        # Simplest fraction (smallest denominator) in the open interval ]low, high[ with 0 <= low < high.
+        # See: https://en.wikipedia.org/wiki/Continued_fraction#Best_rational_within_an_interval
+        integer_part = floor(low)
+        if integer_part + 1 < high:
+            return Fraction(integer_part + 1)
+
+        if low == integer_part:
+            # ]0, high - integer_part[ becomes ]1 / (high - integer_part), infinity[
+            return integer_part + 1 / Fraction(floor(1 / (high - integer_part)) + 1)
+
+        return integer_part + 1 / FrameRateAnalysis._get_simplest_fraction_between(1 / (high - integer_part), 1 / (low - integer_part))
+
+    @property
+    def min_frame_duration(self) -> Fraction:
+        """
+        Returns:
+            The duration (in seconds) of the shortest frame.
+        """
+        return self.__min_frame_duration
+
+    @property
+    def max_frame_duration(self) -> Fraction:
+        """
+        Returns:
+            The duration (in seconds) of the longest frame.
+        """
+        return self.__max_frame_duration
+
+    @property
+    def mean_frame_duration(self) -> Fraction:
+        """
+        Returns:
+            The mean duration (in seconds) of the frames.
+        """
+        return self.__mean_frame_duration
+
+    @property
+    def frame_duration_histogram(self) -> dict[Fraction, int]:
+        """
+        Returns:
+            The number of frames for each frame duration (in seconds), sorted by duration.
+        """
+        return self.__frame_duration_histogram
+
+    @property
+    def segments(self) -> list[FrameRateSegment]:
+        """
+        Returns:
+            The ranges of frames displayed at a constant frame rate, in order.
+        """
+        return self.__segments
+
+    @property
+    def is_cfr(self) -> bool:
+        """
+        Returns:
+            True if the whole video is displayed at a constant frame rate (CFR).
+        """
+        return len(self.segments) == 1
+
+    @property
+    def dropped_frames(self) -> list[int]:
+        """
+        Returns:
+            The frames that last at least 1.75 times longer than the frames around them, even with the rounding of the PTS.
+                It generally means that the next frame(s) have been dropped.
+        """
+        return self.__dropped_frames
+
+    @property
+    def pulldown_frames(self) -> list[int]:
+        """
+        Returns:
+            The frames that are part of a 3:2 pulldown (telecine) pattern,
+                where at least 4 consecutive frames alternately last 3 and 2 fields.
+        """
+        return self.__pulldown_frames
@@ -2,11 +2,13 @@ from collections.abc import Callable
 from enum import Enum, auto
 from fractions import Fraction
 from math import ceil, floor
+from operator import floordiv
 
 __all__ = ["RoundingMethod"]
 
 
 RoundingCallType = Callable[[Fraction], int]
+DivisionCallType = Callable[[int, int], int]
 
 def floor_method(number: Fraction) -> int:
     return floor(number)
@@ -17,6 +19,13 @@ def round_method(number: Fraction) -> int:
     else:
         return ceil(number - Fraction(1, 2))
 
+def round_division_method(numerator: int, denominator: int) -> int:
+    # Same as round_method(Fraction(numerator, denominator)) for a positive denominator
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    else:
+        return -((denominator - 2 * numerator) // (2 * denominator))
+
 class RoundingMethod(Enum):
     """Method used to adjust presentation timestamps (PTS).
     """
@@ -34,3 +43,25 @@ class RoundingMethod(Enum):
         else:
             raise NotImplementedError(f"Rounding method {self} is not implemented.")
         return method(number)
+
+    def divide(self, numerator: int, denominator: int) -> int:
+        """Apply the rounding method to `numerator / denominator` with integer arithmetic.
+
+        It gives the same result as `self(Fraction(numerator, denominator))`, but it doesn't create any Fraction.
+
+        Parameters:
+            numerator: The numerator.
+            denominator: The denominator (must be > 0).
+
+        Returns:
+            The rounded/floored result of the division.
+        """
+        return self._get_division_method()(numerator, denominator)
+
+    def _get_division_method(self) -> DivisionCallType:
+        if self.value == self.FLOOR.value:
+            return floordiv
+        elif self.value == self.ROUND.value:
+            return round_division_method
+        else:
+            raise NotImplementedError(f"Rounding method {self} is not implemented.")
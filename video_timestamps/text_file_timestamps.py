@@ -1,16 +1,27 @@
+from array import array
+from bisect import bisect_left, bisect_right
 from fractions import Fraction
-from io import StringIO
+from hashlib import sha256
+from io import BufferedIOBase, StringIO
+from itertools import islice
+from operator import lt
+from os import getpid, replace
 from pathlib import Path
+from struct import calcsize, pack_into, unpack_from
+from struct import error as StructError
+from typing import cast
 
 from .abc_timestamps import ABCTimestamps
 from .fps_timestamps import FPSTimestamps
 from .rounding_method import RoundingMethod
 from .time_type import TimeType
-from .timestamps_file_parser import TimestampsFileParser
+from .timestamps_file_parser import RangeV1, RationalType, TimestampsFileParser
 from .video_timestamps import VideoTimestamps
 
 __all__ = ["TextFileTimestamps"]
 
+CACHE_HASH_CHUNK_SIZE = 1 << 20
+
 class TextFileTimestamps(ABCTimestamps):
     """Create a Timestamps object from a mkv [timestamps file](https://mkvtoolnix.download/doc/mkvmerge.html#mkvmerge.external_timestamp_files).
     We only support the v1, v2 and v4 format.
@@ -18,10 +29,12 @@ class TextFileTimestamps(ABCTimestamps):
 
     def __init__(
         self,
-        path_to_timestamps_file_or_content: str | Path,
+        path_to_timestamps_file_or_content: str | Path | BufferedIOBase,
         time_scale: Fraction,
         rounding_method: RoundingMethod,
         normalize: bool = True,
+        max_workers: int = 1,
+        cache_directory: Path | None = None,
     ):
         """Initialize the TextFileTimestamps object.
 
@@ -52,33 +65,223 @@ class TextFileTimestamps(ABCTimestamps):
 
         Parameters:
             path_to_timestamps_file_or_content: If is it a Path, the path to the timestamps file.
+                The file is memory-mapped and its numbers are directly parsed from its bytes.
+                If the file is compressed with gzip, bz2, lzma/xz or zstd (only with Python 3.14 or higher),
+                it is detected from its first bytes and decompressed while it is parsed.
 
                 If it is a str, a timestamps file content.
+
+                If it is a binary stream (ex: a file opened with `open(path, "rb")`), the timestamps file content encoded in UTF-8.
+                The stream is read from its current position and it isn't closed. It can also be compressed.
             time_scale: Unit of time (in seconds) in terms of which frame timestamps are represented.
 
                 Important: Don't confuse time_scale with the time_base. As a reminder, time_base = 1 / time_scale.
             rounding_method: The rounding method used to round/floor the PTS (Presentation Time Stamp).
             normalize: If True, it will shift the PTS to make them start from 0. If false, the option does nothing.
+            max_workers: Only used if `path_to_timestamps_file_or_content` is a Path.
+                The maximum number of processes used to parse a large v2 or v4 timestamps file.
+            cache_directory: Only used if `path_to_timestamps_file_or_content` is a Path.
+                The directory where the PTS of a v2 or v4 timestamps file are cached, so the next objects created
+                from the same file, `time_scale`, `rounding_method` and `normalize` only need to read the cached PTS instead of parsing the file.
+                The cache entry is ignored (and replaced) if the size, the modification time or the content of the file has changed.
+                If the entry cannot be written (ex: read-only directory), the file is parsed on each creation.
         """
 
+        self.__rounding_method = rounding_method
+        self.__time_scale = time_scale
+
+        self._video_timestamps = None
+        self._fps_timestamps = None
+        self._ranges_timestamps: list[FPSTimestamps] = []
+        self._ranges_start_frame: list[int] = []
+
+        # Only an uncompressed file opened from a Path can be refreshed
+        self.__path: Path | None = None
+        self.__file_size = 0
+        cache_path: Path | None = None
+        file_key = ""
         if isinstance(path_to_timestamps_file_or_content, Path):
-            with open(path_to_timestamps_file_or_content, encoding="utf-8") as f:
-                timestamps, fps, version = TimestampsFileParser.parse_file(f)
-        else:
+            if cache_directory is not None:
+                cache_path = self.__get_cache_path(path_to_timestamps_file_or_content, cache_directory, normalize)
+                file_key = TextFileTimestamps.__get_file_key(path_to_timestamps_file_or_content)
+                if self.__load_cache(cache_path, file_key, path_to_timestamps_file_or_content):
+                    return
+
+            timestamps, fps, version, file_size = TimestampsFileParser._parse_path(path_to_timestamps_file_or_content, max_workers)
+            if file_size is not None:
+                self.__path = path_to_timestamps_file_or_content
+                self.__file_size = file_size
+        elif isinstance(path_to_timestamps_file_or_content, str):
             file = StringIO(path_to_timestamps_file_or_content)
             timestamps, fps, version = TimestampsFileParser.parse_file(file)
+        else:
+            timestamps, fps, version = TimestampsFileParser.parse_file(path_to_timestamps_file_or_content)
 
-        self.__rounding_method = rounding_method
         self.__version = version
+        if self.version == 1:
+            # The v1 format can describe hours of video with only a few lines, so we keep the ranges instead of computing the PTS of every frame
+            assert isinstance(fps, Fraction)
+            ranges = cast(list[RangeV1], timestamps)
+            if not ranges:
+                # Like for the other versions, the file must at least describe 1 frame
+                raise ValueError("There must be at least 2 pts.")
 
-        pts_list = [self.rounding_method(Fraction(time, pow(10, 3)) * time_scale) for time in timestamps]
+            end_time = Fraction(0)
+            for range_v1 in ranges:
+                range_timestamps = FPSTimestamps(self.rounding_method, time_scale, range_v1.fps, range_v1.start_time / pow(10, 3))
+                end_time = range_v1.start_time + (range_v1.end_frame - range_v1.start_frame + 1) * Fraction(pow(10, 3)) / range_v1.fps
 
-        self._video_timestamps = VideoTimestamps(pts_list, time_scale, normalize, fps)
+                # If a frame last less than 1 tick, 2 frames could have the same PTS
+                if time_scale < range_v1.fps:
+                    range_pts = [self.rounding_method((frame / range_v1.fps + range_timestamps.first_timestamps) * time_scale) for frame in range(range_v1.end_frame - range_v1.start_frame + 1)]
+                    range_pts.append(self.rounding_method(end_time / pow(10, 3) * time_scale))
+                    if not all(map(lt, range_pts, islice(range_pts, 1, None))):
+                        raise ValueError("PTS must be in non-decreasing order.")
+
+                self._ranges_timestamps.append(range_timestamps)
+                self._ranges_start_frame.append(range_v1.start_frame)
+
+            self._fps_timestamps = FPSTimestamps(self.rounding_method, time_scale, fps, end_time / pow(10, 3))
+            self.__nbr_v1_frames = ranges[-1].end_frame + 1
+        else:
+            timestamps = cast(list[RationalType], timestamps)
+            pts_list = self.__timestamps_to_pts(timestamps)
+            # Needed by refresh to shift the new PTS like the others
+            self.__pts_shift = pts_list[0] if normalize else 0
+            self.__last_timestamps = timestamps[-2:]
+            self._video_timestamps = VideoTimestamps(pts_list, time_scale, normalize, fps)
+
+            # Don't cache the file if it has changed while it was parsed
+            if cache_path is not None and isinstance(path_to_timestamps_file_or_content, Path) and file_key.startswith(TextFileTimestamps.__get_file_stat_key(path_to_timestamps_file_or_content)):
+                self.__save_cache(cache_path, file_key, fps)
+
+
+    # Layout of a cache entry: number of PTS, size of the metadata, the metadata, padding to 8 bytes, the PTS.
+    # It is the same layout as the shared memory block of VideoTimestamps.to_shared_memory.
+    _CACHE_HEADER = "qq"
+
+
+    def __get_cache_path(self, path: Path, cache_directory: Path, normalize: bool) -> Path:
+        key = f"{path.resolve()} {self.time_scale} {self.rounding_method.name} {normalize}"
+        return cache_directory / f"{sha256(key.encode()).hexdigest()}.pts"
+
+
+    @staticmethod
+    def __get_file_stat_key(path: Path) -> str:
+        stat = path.stat()
+        return f"{stat.st_size} {stat.st_mtime_ns} "
+
+
+    @staticmethod
+    def __get_file_key(path: Path) -> str:
+        # The size and the modification time can be the same after a modification (ex: a coarse mtime resolution), so also hash the content
+        file_hash = sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(CACHE_HASH_CHUNK_SIZE):
+                file_hash.update(chunk)
+        return TextFileTimestamps.__get_file_stat_key(path) + file_hash.hexdigest()
+
+
+    def __load_cache(self, cache_path: Path, file_key: str, path: Path) -> bool:
+        try:
+            data = cache_path.read_bytes()
+            nbr_pts, metadata_size = unpack_from(TextFileTimestamps._CACHE_HEADER, data)
+            header_size = calcsize(TextFileTimestamps._CACHE_HEADER)
+            metadata = data[header_size:header_size + metadata_size].decode().split(" ")
+            if len(metadata) != 9 or " ".join(metadata[:3]) != file_key:
+                return False
+
+            version, fps, file_size, pts_shift, *last_timestamps = metadata[3:]
+            pts_offset = (header_size + metadata_size + 7) // 8 * 8
+            pts = memoryview(data)[pts_offset:]
+            if len(pts) != nbr_pts * 8:
+                return False
+
+            video_timestamps = VideoTimestamps.from_buffer(pts, self.time_scale, False, None if fps == "None" else Fraction(fps))
+            self.__pts_shift = int(pts_shift)
+            self.__last_timestamps = [cast(RationalType, tuple(map(int, timestamps.split("/")))) for timestamps in last_timestamps]
+            self.__version = int(version)
+            if int(file_size) >= 0:
+                self.__path = path
+                self.__file_size = int(file_size)
+        except (OSError, ValueError, StructError):
+            # A missing or corrupted entry is replaced once the file has been parsed
+            return False
+
+        self._video_timestamps = video_timestamps
+        return True
+
+
+    def __save_cache(self, cache_path: Path, file_key: str, fps: Fraction | None) -> None:
+        assert self._video_timestamps is not None # Make mypy happy
+        try:
+            pts = array("q", self._video_timestamps.pts_list)
+        except OverflowError:
+            # The PTS don't fit in int64
+            return
+
+        # The size of a compressed file is -1, since it cannot be refreshed
+        file_size = self.__file_size if self.__path is not None else -1
+        last_timestamps = " ".join(f"{numerator}/{denominator}" for numerator, denominator in self.__last_timestamps)
+        metadata = f"{file_key} {self.version} {fps} {file_size} {self.__pts_shift} {last_timestamps}".encode()
+        header_size = calcsize(TextFileTimestamps._CACHE_HEADER)
+        pts_offset = (header_size + len(metadata) + 7) // 8 * 8
+
+        data = bytearray(pts_offset)
+        pack_into(TextFileTimestamps._CACHE_HEADER, data, 0, len(pts), len(metadata))
+        data[header_size:header_size + len(metadata)] = metadata
+        data += pts.tobytes()
+
+        # Write the entry in a temporary file, so other processes never read a partial entry
+        temporary_path = cache_path.with_name(f"{cache_path.name}.{getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_bytes(data)
+            replace(temporary_path, cache_path)
+        except OSError:
+            # The cache is only an optimization, so the parsed timestamps are still used if it cannot be written
+            try:
+                temporary_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+    def __timestamps_to_pts(self, timestamps: list[RationalType]) -> list[int]:
+        # pts = rounding_method(numerator / (denominator * 1000) * time_scale), but only with integers to avoid creating 2 Fraction per frame
+        division_method = self.rounding_method._get_division_method()
+        time_scale_numerator = self.time_scale.numerator
+        time_scale_denominator = self.time_scale.denominator * pow(10, 3)
+        return [division_method(numerator * time_scale_numerator, denominator * time_scale_denominator) for numerator, denominator in timestamps]
+
+
+    def refresh(self) -> int:
+        """Parse the lines added to the timestamps file since it has been parsed.
+
+        It allows to follow a v2 timestamps file that is still being written (ex: during a live recording)
+        without parsing the entire file again. The file must only be appended to and it cannot be compressed.
+        If the last line doesn't end with a line terminator and isn't a valid timestamp yet (ex: "3" of "3000"),
+        it is considered to be still written, so it is ignored until a later call.
+
+        Returns:
+            The number of frames added.
+        """
+        if self.__path is None or self.version != 2:
+            raise ValueError("Only an uncompressed v2 timestamps file created from a Path can be refreshed.")
+        assert self._video_timestamps is not None # Make mypy happy
+
+        # Work on a copy to keep the object unchanged if the new lines are invalid
+        timestamps = self.__last_timestamps.copy()
+        nbr_removed, file_size = TimestampsFileParser._parse_v2_path_from(self.__path, self.__file_size, timestamps)
+
+        new_timestamps = timestamps[len(self.__last_timestamps) - nbr_removed:]
+        pts_list = [pts - self.__pts_shift for pts in self.__timestamps_to_pts(new_timestamps)]
+        nbr_frames = self._video_timestamps.nbr_frames
+        self._video_timestamps._extend(pts_list, nbr_frames + 1 - nbr_removed)
+
+        self.__file_size = file_size
+        self.__last_timestamps = timestamps[-2:]
+        return self._video_timestamps.nbr_frames - nbr_frames
 
-        self._fps_timestamps = None
-        if self.version == 1:
-            assert isinstance(fps, Fraction)
-            self._fps_timestamps = FPSTimestamps(self.rounding_method, time_scale, fps, Fraction(timestamps[-1], pow(10, 3)))
 
     @property
     def rounding_method(self) -> RoundingMethod:
@@ -89,15 +292,19 @@ class TextFileTimestamps(ABCTimestamps):
         if self._fps_timestamps is not None:
             return self._fps_timestamps.fps
         else:
+            assert self._video_timestamps is not None # Make mypy happy
             return self._video_timestamps.fps
 
     @property
     def time_scale(self) -> Fraction:
-        return self._video_timestamps.time_scale
+        return self.__time_scale
 
     @property
     def first_timestamps(self) -> Fraction:
-        return self._video_timestamps.first_timestamps
+        if self._video_timestamps is not None:
+            return self._video_timestamps.first_timestamps
+        else:
+            return self._frame_to_time(0)
 
     @property
     def version(self) -> int:
@@ -113,7 +320,7 @@ class TextFileTimestamps(ABCTimestamps):
         Returns:
             The number of frames of the timestamps file. Note that you cannot use this property with v1 timestamps file.
         """
-        if self.version in (2, 4):
+        if self._video_timestamps is not None:
             return self._video_timestamps.nbr_frames
         else:
             raise ValueError("V1 timestamps file doesn't specify a number of frames.")
@@ -124,27 +331,50 @@ class TextFileTimestamps(ABCTimestamps):
         time: Fraction,
         time_type: TimeType,
     ) -> int:
-        if self._fps_timestamps is not None and time > self._video_timestamps.timestamps[-1]:
-            return self._video_timestamps.nbr_frames + self._fps_timestamps._time_to_frame(time, time_type)
-        else:
+        if self._video_timestamps is not None:
             return self._video_timestamps._time_to_frame(time, time_type)
 
+        assert self._fps_timestamps is not None # Make mypy happy
+        if time > self._frame_to_time(self.__nbr_v1_frames):
+            return self.__nbr_v1_frames + self._fps_timestamps._time_to_frame(time, time_type)
+
+        # Same search as VideoTimestamps._time_to_frame, but the PTS are computed on demand from the ranges
+        pts = time * self.time_scale
+        frames = range(self.__nbr_v1_frames + 1)
+        if time_type == TimeType.START:
+            return bisect_left(frames, pts, key=self.__get_v1_pts)
+        elif time_type == TimeType.END:
+            return bisect_left(frames, pts, key=self.__get_v1_pts) - 1
+        elif time_type == TimeType.EXACT:
+            return bisect_right(frames, pts, key=self.__get_v1_pts) - 1
+        else:
+            raise ValueError(f'The TimeType "{time_type}" isn\'t supported.')
+
 
     def _frame_to_time(
         self,
         frame: int,
     ) -> Fraction:
-        if self._fps_timestamps is not None and frame > self._video_timestamps.nbr_frames:
-            return self._fps_timestamps._frame_to_time(frame - self._video_timestamps.nbr_frames)
-        else:
+        if self._video_timestamps is not None:
             return self._video_timestamps._frame_to_time(frame)
 
+        assert self._fps_timestamps is not None # Make mypy happy
+        if frame >= self.__nbr_v1_frames:
+            return self._fps_timestamps._frame_to_time(frame - self.__nbr_v1_frames)
+
+        index = bisect_right(self._ranges_start_frame, frame) - 1
+        return self._ranges_timestamps[index]._frame_to_time(frame - self._ranges_start_frame[index])
+
+
+    def __get_v1_pts(self, frame: int) -> Fraction:
+        return self._frame_to_time(frame) * self.time_scale
+
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, TextFileTimestamps):
             return False
-        return (self.rounding_method, self.version, self._video_timestamps, self._fps_timestamps) == (
-            other.rounding_method, other.version, other._video_timestamps, other._fps_timestamps
+        return (self.rounding_method, self.version, self._video_timestamps, self._fps_timestamps, self._ranges_timestamps, self._ranges_start_frame) == (
+            other.rounding_method, other.version, other._video_timestamps, other._fps_timestamps, other._ranges_timestamps, other._ranges_start_frame
         )
 
 
@@ -155,5 +385,7 @@ class TextFileTimestamps(ABCTimestamps):
                 self.__version,
                 self._video_timestamps,
                 self._fps_timestamps,
+                tuple(self._ranges_timestamps),
+                tuple(self._ranges_start_frame),
             )
         )
@@ -1,40 +1,135 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from csv import reader as csv_reader
 from fractions import Fraction
-from io import TextIOBase
-from re import compile
+from io import BufferedIOBase, StringIO, TextIOBase, TextIOWrapper
+from itertools import chain
+from json import JSONDecodeError, JSONDecoder
+from math import lcm
+from mmap import ACCESS_READ, mmap
+from operator import itemgetter
+from os import fstat
+from pathlib import Path
+from re import Pattern, compile
+from typing import Any, BinaryIO, cast
+
+from .compressed_file import open_decompressed
+
+# Exact rational number stored as (numerator, denominator). The denominator is always > 0, but the fraction may not be reduced.
+RationalType = tuple[int, int]
+
+LINE_END_REGEX = compile(rb"\r\n|\r|\n")
+# Match a line of a timestamps v2 or v4 file. The groups are:
+#   1. The integer part of a decimal number.
+#   2. The decimal part of a decimal number.
+#   3. Any line that isn't a decimal number, a comment or empty.
+# The comments cannot contain a character that str.splitlines considers as a line boundary, nor any non-ASCII character
+# since they may encode one (ex: "\u2028"). Those lines are matched by the group 3.
+MAPPED_LINE_REGEX = compile(rb"[ \t]*(?:(-?[0-9]+)(?:\.([0-9]*))?[ \t]*|#[^\r\n\x0b\x0c\x1c-\x1e\x80-\xff]*|([^\r\n]*))(?:\r\n|\r|\n|\Z)")
+# Number of bytes parsed at a time from a memory-mapped file
+MAPPED_CHUNK_SIZE = 1 << 20
+# Minimum number of bytes parsed by each worker process. Below it, starting a process costs more than it saves.
+PARALLEL_MIN_PART_SIZE = 1 << 22
+# Number of characters read at a time from a JSON ffprobe dump
+JSON_CHUNK_SIZE = 1 << 16
+JSON_WHITESPACE_REGEX = compile(r"[ \t\r\n]*")
+# Whitespaces and the separator between the elements of an array or an object
+JSON_SEPARATOR_REGEX = compile(r"[ \t\r\n,]*")
 
 
 class RangeV1:
-    def __init__(self, start_frame: int, end_frame: int, fps: Fraction):
+    def __init__(self, start_frame: int, end_frame: int, fps: Fraction, start_time: Fraction = Fraction(0)):
         self.start_frame = start_frame
         self.end_frame = end_frame
         self.fps = fps
+        # Time (in milliseconds) of the start_frame
+        self.start_time = start_time
+
+
+class JSONStreamReader:
+    """Read the JSON values of a text stream one at a time, so the entire stream is never loaded in memory.
+    """
+
+    def __init__(self, file_content: TextIOBase):
+        self.file_content = file_content
+        self.decoder = JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+
+    def peek(self, skipped_characters: Pattern[str] = JSON_WHITESPACE_REGEX) -> str:
+        """Skip the characters matched by `skipped_characters` and return the next character without consuming it (or "" at the end of the stream).
+        """
+        while True:
+            match = skipped_characters.match(self.buffer, self.position)
+            assert match is not None # Make mypy happy
+            self.position = match.end()
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.__read_more():
+                return ""
+
+    def expect(self, character: str) -> None:
+        if self.peek() != character:
+            raise ValueError(f'The JSON is invalid. Expected "{character}" at the character {self.position} of the current chunk.')
+        self.position += 1
+
+    def decode(self) -> Any:
+        """Decode the next JSON value. The value must be a string, an object or an array.
+        """
+        self.peek()
+        while True:
+            try:
+                value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                return value
+            except JSONDecodeError:
+                # The value may not be entirely in the buffer
+                if not self.__read_more():
+                    raise
+
+    def __read_more(self) -> bool:
+        data = self.file_content.read(JSON_CHUNK_SIZE)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.position:] + data
+        self.position = 0
+        return True
 
 
 class TimestampsFileParser:
     @staticmethod
-    def parse_file(file_content: TextIOBase) -> tuple[list[Fraction], Fraction | None, int]:
+    def parse_file(file_content: TextIOBase | BufferedIOBase) -> tuple[list[RationalType] | list[RangeV1], Fraction | None, int]:
         """Parse timestamps from a [timestamps file](https://mkvtoolnix.download/doc/mkvmerge.html#mkvmerge.external_timestamp_files) and return them.
 
         Inspired by: https://gitlab.com/mbunkus/mkvtoolnix/-/blob/72dfe260effcbd0e7d7cf6998c12bb35308c004f/src/merge/timestamp_factory.cpp#L27-74
 
+        The file is parsed line by line, so it is never entirely loaded in memory.
+
         Parameters:
-            file_content: The timestamps content.
+            file_content: The timestamps content. If it is a binary stream, it is decoded as UTF-8.
+                If the binary stream is compressed with gzip, bz2, lzma/xz or zstd (only with Python 3.14 or higher),
+                it is decompressed while it is parsed.
 
         Returns:
             A tuple containing these 3 informations:
-                1. A list of each frame timestamps (in milliseconds).
+                1. For the v2 and v4 format, a list of each frame timestamps (in milliseconds) as (numerator, denominator).
+                    For the v1 format, the ranges of frames with their fps and start time (see `_parse_v1_file`).
                 2. The fps (if supported by the timestamps file format).
                 3. The version of the timestamps file (1, 2 or 4).
         """
 
-        regex_timestamps = compile("^# *time(?:code|stamp) *format v(\\d+).*")
-        line = file_content.readline()
-        match = regex_timestamps.search(line)
-        if match is None:
-            raise ValueError("The line 0 is invalid doesn't contain the version of the timestamps file.")
+        if isinstance(file_content, BufferedIOBase):
+            with TimestampsFileParser._decode(file_content) as text_file_content:
+                return TimestampsFileParser.parse_file(text_file_content)
 
-        version = int(match.group(1))
+        version = TimestampsFileParser._parse_version(file_content.readline())
 
+        timestamps: list[RationalType] | list[RangeV1]
         if version == 1:
             timestamps, fps = TimestampsFileParser._parse_v1_file(file_content)
         elif version == 2 or version == 4:
@@ -49,25 +144,225 @@ class TimestampsFileParser:
 
 
     @staticmethod
-    def _parse_v1_file(file_content: TextIOBase) -> tuple[list[Fraction], Fraction]:
+    @contextmanager
+    def _decode(file_content: BufferedIOBase) -> Iterator[TextIOWrapper]:
+        decompressed_file_content = open_decompressed(file_content)
+        text_file_content = TextIOWrapper(cast(BinaryIO, file_content if decompressed_file_content is None else decompressed_file_content), encoding="utf-8")
+        try:
+            yield text_file_content
+        finally:
+            # Don't let the wrapper close the stream of the caller
+            text_file_content.detach()
+            if decompressed_file_content is not None:
+                decompressed_file_content.close()
+
+
+    @staticmethod
+    def parse_path(path: Path, max_workers: int = 1) -> tuple[list[RationalType] | list[RangeV1], Fraction | None, int]:
+        """Same as `parse_file`, but the file is memory-mapped.
+
+        The numbers of the v2 and v4 format are directly parsed from the mapped bytes, so the file is never decoded
+        and the pages of the file are shared with the other processes that read it.
+
+        A compressed file cannot be mapped, so it is decompressed and parsed line by line like with `parse_file`.
+
+        Parameters:
+            path: The path to the timestamps file. It must be encoded in UTF-8.
+            max_workers: The maximum number of processes used to parse a v2 or v4 file.
+                If it is higher than 1, large files are split on line boundaries and the parts are parsed in a process pool.
+                It is ignored if the file is compressed.
+
+        Returns:
+            See `parse_file`.
+        """
+        timestamps, fps, version, _ = TimestampsFileParser._parse_path(path, max_workers)
+        return timestamps, fps, version
+
+
+    @staticmethod
+    def _parse_path(path: Path, max_workers: int) -> tuple[list[RationalType] | list[RangeV1], Fraction | None, int, int | None]:
+        """Same as `parse_path`, but it also returns the size of the file, or None if the file is compressed.
+        """
+        if max_workers < 1:
+            raise ValueError("Parameter ``max_workers`` must be higher than 0.")
+
+        with open(path, "rb") as f:
+            # An empty file cannot be mapped
+            if not fstat(f.fileno()).st_size:
+                return *TimestampsFileParser.parse_file(f), 0
+
+            decompressed_file = open_decompressed(f)
+            if decompressed_file is not None:
+                with decompressed_file, TextIOWrapper(cast(BinaryIO, decompressed_file), encoding="utf-8") as text_file:
+                    return *TimestampsFileParser.parse_file(text_file), None
+
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as mapped_file:
+                match = LINE_END_REGEX.search(mapped_file)
+                header_end = len(mapped_file) if match is None else match.end()
+                version = TimestampsFileParser._parse_version(mapped_file[:header_end].decode("utf-8"))
+
+                size = len(mapped_file)
+                timestamps: list[RationalType] | list[RangeV1]
+                if version == 1:
+                    # v1 files only contain a few lines, so they can be decoded
+                    timestamps, fps = TimestampsFileParser._parse_v1_file(StringIO(mapped_file[header_end:].decode("utf-8")))
+                elif version == 2 or version == 4:
+                    parts = TimestampsFileParser._split_mapped_file(mapped_file, header_end, size, max_workers)
+                    if len(parts) > 1:
+                        timestamps = TimestampsFileParser._parse_mapped_parts_in_parallel(path, parts, version)
+                    else:
+                        timestamps = []
+                        TimestampsFileParser._append_v2_and_v4_timestamps(
+                            timestamps,
+                            TimestampsFileParser._iter_mapped_v2_and_v4_numbers(mapped_file, header_end, size),
+                            version,
+                        )
+
+                    timestamps = TimestampsFileParser._finalize_v2_and_v4_timestamps(timestamps, version)
+                    fps = None
+                else:
+                    raise NotImplementedError(
+                        f"The file uses version {version}, but this format is currently not supported."
+                    )
+
+        return timestamps, fps, version, size
+
+
+    @staticmethod
+    def _parse_v2_path_from(path: Path, position: int, timestamps: list[RationalType]) -> tuple[int, int]:
+        """Append to `timestamps` the timestamps added to a v2 file since it has been parsed.
+
+        The file must only have been appended to. If its last parsed line didn't end with a line terminator,
+        its timestamp is removed from `timestamps` and the line is parsed again.
+        The file can still be written, so the new last line is handled by `_append_v2_last_line` and a line that is still being written is never an error.
+
+        Parameters:
+            path: The path to the timestamps file.
+            position: The position up to which the file has been parsed.
+            timestamps: The last timestamps (in milliseconds) of the file as (numerator, denominator).
+                There must be at least one timestamp before the last line.
+
+        Returns:
+            A tuple containing these 2 informations:
+                1. The number of timestamps removed from `timestamps`.
+                2. The position up to which the file has been parsed.
+        """
+        with open(path, "rb") as f:
+            size = fstat(f.fileno()).st_size
+            if size < position:
+                raise ValueError("The timestamps file is smaller than when it has been parsed. It must only be appended to.")
+            elif size == position:
+                return 0, size
+
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as mapped_file:
+                size = len(mapped_file)
+                line_start = max(mapped_file.rfind(b"\n", 0, position), mapped_file.rfind(b"\r", 0, position)) + 1
+                nbr_removed = sum(1 for _ in TimestampsFileParser._iter_mapped_v2_and_v4_numbers(mapped_file, line_start, position))
+                del timestamps[len(timestamps) - nbr_removed:]
+
+                end = TimestampsFileParser._get_complete_lines_end(mapped_file, line_start, size)
+                TimestampsFileParser._append_v2_and_v4_timestamps(
+                    timestamps,
+                    TimestampsFileParser._iter_mapped_v2_and_v4_numbers(mapped_file, line_start, end),
+                    2,
+                )
+                size = TimestampsFileParser._append_v2_last_line(timestamps, mapped_file, end, size)
+
+        return nbr_removed, size
+
+
+    @staticmethod
+    def _get_complete_lines_end(mapped_file: mmap, position: int, end: int) -> int:
+        # Position after the last line terminator between position and end, or position if there isn't any
+        return max(position - 1, mapped_file.rfind(b"\n", position, end), mapped_file.rfind(b"\r", position, end)) + 1
+
+
+    @staticmethod
+    def _append_v2_last_line(timestamps: list[RationalType], mapped_file: mmap, position: int, end: int) -> int:
+        """Append to `timestamps` the timestamp of the last line of a v2 file, which is between `position` and `end` and doesn't end with a line terminator.
+
+        It is only used while following a file that is still being written, so the line can be incomplete (ex: "3" of "3000").
+        It is kept if it is valid. If it is invalid or not in ascending order, it is ignored and it will be parsed again once it is complete.
+
+        Returns:
+            The position up to which the file has been parsed.
+        """
+        if position == end:
+            return end
+
+        try:
+            TimestampsFileParser._append_v2_and_v4_timestamps(
+                timestamps,
+                TimestampsFileParser._iter_mapped_v2_and_v4_numbers(mapped_file, position, end),
+                2,
+            )
+        except ValueError:
+            return position
+        return end
+
+
+    @staticmethod
+    def _parse_version(line: str) -> int:
+        """Parse the first line of a timestamps file and return the version of the file.
+        """
+        regex_timestamps = compile("^# *time(?:code|stamp) *format v(\\d+).*")
+        match = regex_timestamps.search(line)
+        if match is None:
+            raise ValueError("The line 0 is invalid doesn't contain the version of the timestamps file.")
+
+        return int(match.group(1))
+
+
+    @staticmethod
+    def _iter_lines(file_content: TextIOBase) -> Iterator[str]:
+        """Equivalent to `file_content.read().splitlines()`, but only one line is kept in memory at a time.
+        """
+        for line in file_content:
+            yield from line.splitlines()
+
+
+    @staticmethod
+    def _parse_number(line: str) -> RationalType:
+        """Parse a number as an exact (numerator, denominator).
+
+        Timestamps files almost only contain decimal numbers like "41.708333" or "1001", so they are parsed
+        with int arithmetic, which is a lot faster than `Fraction(line)`.
+        Every other form (ex: "1/3", "1e3", ".5") fallbacks to `Fraction(line)`.
+        """
+        integer_part, _, decimal_part = line.partition(".")
+        digits = integer_part.removeprefix("-")
+
+        # isdigit also accept non-ASCII digits, so also check isascii
+        if line.isascii() and digits.isdigit() and (not decimal_part or decimal_part.isdigit()):
+            return int(integer_part + decimal_part), pow(10, len(decimal_part))
+
+        number = Fraction(line)
+        return number.numerator, number.denominator
+
+
+    @staticmethod
+    def _parse_v1_file(file_content: TextIOBase) -> tuple[list[RangeV1], Fraction]:
         """Create timestamps based on the timestamps v1 file provided.
 
         Inspired by: https://gitlab.com/mbunkus/mkvtoolnix/-/blob/72dfe260effcbd0e7d7cf6998c12bb35308c004f/src/merge/timestamp_factory.cpp#L82-175
 
+        The frames aren't expanded one by one. Instead, the gaps between the ranges of the file are filled with ranges using the default fps,
+        so the memory only depends on the number of ranges.
+
         Parameters:
             file_content: The timestamps content
 
         Returns:
             A tuple containing these 2 informations:
-                1. A list of each frame timestamps (in milliseconds).
+                1. The sorted ranges covering every frame from 0 up to the end frame of the last range of the file.
+                    The start_time of each range is its time in milliseconds.
                 2. The fps.
         """
-        timestamps: list[Fraction] = []
+        ranges: list[RangeV1] = []
         ranges_v1: list[RangeV1] = []
         line: str = ""
 
-        file_lines = file_content.read().splitlines()
-        file_iterator = iter(file_lines)
+        file_iterator = TimestampsFileParser._iter_lines(file_content)
 
         for line in file_iterator:
             if not line:
@@ -136,24 +431,22 @@ class TimestampsFileParser:
             if frame > range_v1.start_frame:
                 raise ValueError("Override ranges must not overlap.")
 
-            while frame < range_v1.start_frame:
-                timestamps.append(time)
-                time += Fraction(1000) / default_fps
-                frame += 1
+            if frame < range_v1.start_frame:
+                ranges.append(RangeV1(frame, range_v1.start_frame - 1, default_fps, time))
+                time += (range_v1.start_frame - frame) * Fraction(1000) / default_fps
 
-            while frame <= range_v1.end_frame:
-                timestamps.append(time)
-                time += Fraction(1000) / range_v1.fps
-                frame += 1
+            range_v1.start_time = time
+            ranges.append(range_v1)
+            time += (range_v1.end_frame - range_v1.start_frame + 1) * Fraction(1000) / range_v1.fps
+            frame = range_v1.end_frame + 1
 
-        timestamps.append(time)
-        return timestamps, default_fps
+        return ranges, default_fps
 
 
     @staticmethod
     def _parse_v2_and_v4_file(
         file_content: TextIOBase, version: int
-    ) -> list[Fraction]:
+    ) -> list[RationalType]:
         """Create timestamps based on the timestamps v2 or v4 file provided.
 
         Inspired by: https://gitlab.com/mbunkus/mkvtoolnix/-/blob/72dfe260effcbd0e7d7cf6998c12bb35308c004f/src/merge/timestamp_factory.cpp#L201-267
@@ -163,40 +456,336 @@ class TimestampsFileParser:
             version: The version of the timestamps (only 2 or 4 is allowed)
 
         Returns:
-            A list of each frame timestamps (in milliseconds).
+            A list of each frame timestamps (in milliseconds) as (numerator, denominator).
         """
+        return TimestampsFileParser._collect_v2_and_v4_timestamps(
+            TimestampsFileParser._iter_v2_and_v4_numbers(TimestampsFileParser._iter_lines(file_content)),
+            version,
+        )
 
-        if version not in (2, 4):
-            raise ValueError("You can only specify version 2 or 4.")
 
-        timestamps: list[Fraction] = []
-        previous_timestamp: Fraction | None = None
+    @staticmethod
+    def _iter_v2_and_v4_numbers(lines: Iterable[str]) -> Iterator[RationalType]:
+        """Parse each line of a timestamps v2 or v4 file and skip the empty lines and the comments.
+        """
+        # Avoid the attribute lookups in the loop, since it runs for every frame
+        parse_number = TimestampsFileParser._parse_number
 
-        for line in file_content.read().splitlines():
+        for line in lines:
             line = line.strip(" \t")
 
-            if not line or line.startswith("#"):
+            if not line or line[0] == "#":
                 continue
 
             try:
-                timestamp = Fraction(line)
+                number = parse_number(line)
             except ValueError:
                 raise ValueError(
                     f'The timestamps file contain a invalid line. Here is it: "{line}"'
                 )
+            yield number
+
+
+    @staticmethod
+    def _iter_mapped_v2_and_v4_numbers(mapped_file: mmap, position: int, end: int) -> Iterator[RationalType]:
+        """Same as `_iter_v2_and_v4_numbers`, but the lines are read from the bytes of a memory-mapped file between `position` and `end`.
+
+        The file is scanned by chunks of complete lines without copying it. Only the lines that
+        aren't a decimal number, a comment or empty are decoded and parsed like in a text file.
+        """
+        parse_lines = TimestampsFileParser._iter_v2_and_v4_numbers
+        findall = MAPPED_LINE_REGEX.findall
+
+        while position < end:
+            chunk_end = mapped_file.find(b"\n", position + MAPPED_CHUNK_SIZE, end)
+            chunk_end = end if chunk_end == -1 else chunk_end + 1
+
+            for integer_part, decimal_part, other_line in findall(mapped_file, position, chunk_end):
+                if integer_part:
+                    yield int(integer_part + decimal_part), pow(10, len(decimal_part))
+                elif other_line:
+                    yield from parse_lines(other_line.decode("utf-8").splitlines())
+
+            position = chunk_end
+
+
+    @staticmethod
+    def _split_mapped_file(mapped_file: mmap, position: int, size: int, max_workers: int) -> list[tuple[int, int]]:
+        """Split the bytes of a memory-mapped file between `position` and `size` into at most `max_workers` parts of complete lines.
+
+        Returns:
+            The (start, end) of each part. The parts are never smaller than PARALLEL_MIN_PART_SIZE, except the last one.
+        """
+        nbr_parts = max(1, min(max_workers, (size - position) // PARALLEL_MIN_PART_SIZE))
+        part_size = (size - position) // nbr_parts
+
+        parts: list[tuple[int, int]] = []
+        while position < size:
+            part_end = mapped_file.find(b"\n", position + part_size, size) if len(parts) < nbr_parts - 1 else -1
+            part_end = size if part_end == -1 else part_end + 1
+            parts.append((position, part_end))
+            position = part_end
+
+        return parts
+
+
+    @staticmethod
+    def _parse_mapped_parts_in_parallel(path: Path, parts: list[tuple[int, int]], version: int) -> list[RationalType]:
+        """Parse each part of a v2 or v4 file in a process pool and merge them, in the order of the file.
+
+        Each worker checks the order of its own part, so only the boundaries between the parts are checked here.
+        The errors are raised in the order of the file, like if it was parsed sequentially.
+        """
+        timestamps: list[RationalType] = []
+
+        with ProcessPoolExecutor(len(parts)) as executor:
+            futures = [executor.submit(TimestampsFileParser._parse_mapped_part, path, start, end, version) for start, end in parts]
+
+            for future in futures:
+                numerators, denominators, error = future.result()
+
+                # numerators[0] / denominators[0] < previous_numerator / previous_denominator
+                if version == 2 and timestamps and numerators and numerators[0] * timestamps[-1][1] < timestamps[-1][0] * denominators[0]:
+                    raise ValueError(
+                        "The timestamps file contain timestamps NOT in ascending order."
+                    )
+
+                timestamps.extend(zip(numerators, denominators))
+
+                if error is not None:
+                    raise error
+
+        return timestamps
+
+
+    @staticmethod
+    def _parse_mapped_part(path: Path, start: int, end: int, version: int) -> tuple[Sequence[int], Sequence[int], ValueError | None]:
+        """Parse the lines of a v2 or v4 file between the bytes `start` and `end`. It is run in a worker process.
+
+        Returns:
+            A tuple containing these 3 informations:
+                1. The numerators of the timestamps parsed before an error, if any.
+                2. Their denominators.
+                    Both are int64 arrays, which are a lot faster to send to the main process than a list of tuples,
+                    or lists if a number doesn't fit in int64.
+                3. The error raised while parsing the part, if any.
+        """
+        timestamps: list[RationalType] = []
+        error: ValueError | None = None
+
+        with open(path, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mapped_file:
+            try:
+                TimestampsFileParser._append_v2_and_v4_timestamps(
+                    timestamps,
+                    TimestampsFileParser._iter_mapped_v2_and_v4_numbers(mapped_file, start, end),
+                    version,
+                )
+            except ValueError as e:
+                error = e
+
+        numerators: Sequence[int]
+        denominators: Sequence[int]
+        try:
+            numerators = array("q", map(itemgetter(0), timestamps))
+            denominators = array("q", map(itemgetter(1), timestamps))
+        except OverflowError:
+            numerators = list(map(itemgetter(0), timestamps))
+            denominators = list(map(itemgetter(1), timestamps))
+
+        return numerators, denominators, error
 
-            if version == 2 and previous_timestamp is not None and timestamp < previous_timestamp:
+
+    @staticmethod
+    def _collect_v2_and_v4_timestamps(numbers: Iterable[RationalType], version: int) -> list[RationalType]:
+        """Check the order of the timestamps of a v2 or v4 file and sort them.
+
+        Parameters:
+            numbers: The timestamps (in milliseconds) as (numerator, denominator), in the order of the file.
+            version: The version of the timestamps (only 2 or 4 is allowed)
+
+        Returns:
+            A list of each frame timestamps (in milliseconds) as (numerator, denominator).
+        """
+        timestamps: list[RationalType] = []
+        TimestampsFileParser._append_v2_and_v4_timestamps(timestamps, numbers, version)
+        return TimestampsFileParser._finalize_v2_and_v4_timestamps(timestamps, version)
+
+
+    @staticmethod
+    def _append_v2_and_v4_timestamps(timestamps: list[RationalType], numbers: Iterable[RationalType], version: int) -> None:
+        """Append the numbers to the timestamps of a v2 or v4 file.
+
+        For the v2 format, the numbers must be in ascending order, including with the last timestamp already in `timestamps`.
+        """
+
+        if version not in (2, 4):
+            raise ValueError("You can only specify version 2 or 4.")
+
+        previous_numerator, previous_denominator = timestamps[-1] if timestamps else (0, 0)
+        append = timestamps.append
+
+        for numerator, denominator in numbers:
+            # numerator / denominator < previous_numerator / previous_denominator
+            if version == 2 and previous_denominator and numerator * previous_denominator < previous_numerator * denominator:
                 raise ValueError(
                     "The timestamps file contain timestamps NOT in ascending order."
                 )
 
-            previous_timestamp = timestamp
-            timestamps.append(timestamp)
+            previous_numerator, previous_denominator = numerator, denominator
+            append((numerator, denominator))
+
 
+    @staticmethod
+    def _finalize_v2_and_v4_timestamps(timestamps: list[RationalType], version: int) -> list[RationalType]:
         if not len(timestamps):
             raise ValueError("The timestamps file is empty.")
 
         if version == 4:
-            timestamps.sort()
+            # Sort them on a common denominator to avoid creating a Fraction for each timestamp
+            common_denominator = lcm(*{denominator for _, denominator in timestamps})
+            timestamps.sort(key=lambda timestamp: timestamp[0] * (common_denominator // timestamp[1]))
 
         return timestamps
+
+
+    @staticmethod
+    def parse_ffprobe_dump(file_content: TextIOBase | BufferedIOBase, stream_index: int | None = None) -> tuple[array[int], Fraction | None]:
+        """Parse the PTS of a stream from the packets or the frames dumped by ffprobe.
+
+        The dump can be in JSON (ex: `ffprobe -show_streams -show_packets -of json video.mkv`)
+        or in CSV with the keys of the fields (ex: `ffprobe -show_streams -show_frames -of csv=nokey=0 video.mkv`).
+        The packets/frames are parsed one at a time and only their pts and duration are kept.
+
+        Parameters:
+            file_content: The ffprobe dump. If it is a binary stream, it is decoded as UTF-8.
+                If the binary stream is compressed, it is decompressed while it is parsed (see `parse_file`).
+            stream_index: The index of the stream. If None, the first video stream is used.
+
+        Returns:
+            A tuple containing these 2 informations:
+                1. The PTS of each frame in presentation order, followed by the PTS of the end of the last frame (its pts + its duration).
+                2. The time_scale of the stream (1 / time_base), if the dump contains the streams (with `-show_streams`).
+        """
+        if isinstance(file_content, BufferedIOBase):
+            with TimestampsFileParser._decode(file_content) as text_file_content:
+                return TimestampsFileParser.parse_ffprobe_dump(text_file_content, stream_index)
+
+        first_character = file_content.read(1)
+        while first_character.isspace():
+            first_character = file_content.read(1)
+
+        entries: Iterator[tuple[str, dict[str, Any]]]
+        if first_character == "{":
+            entries = TimestampsFileParser._iter_ffprobe_json_entries(file_content)
+        else:
+            first_line = first_character + file_content.readline()
+            # The csv format uses "," and the compact format uses "|"
+            delimiter = "|" if "|" in first_line.split(",", 1)[0] else ","
+            entries = TimestampsFileParser._iter_ffprobe_csv_entries(chain((first_line,), file_content), delimiter)
+
+        pts_list = array("q")
+        append = pts_list.append
+        time_bases: dict[int, str] = {}
+        # The last frame in presentation order and its duration
+        last_pts: int | None = None
+        last_duration = 0
+        # The frames are in presentation order, but the packets of a video with B-frames aren't
+        is_sorted = True
+
+        for section, entry in entries:
+            if section == "stream":
+                time_bases[int(entry["index"])] = entry.get("time_base", "")
+                continue
+            elif section not in ("packet", "frame"):
+                continue
+
+            entry_stream_index = int(entry["stream_index"])
+            if stream_index is None:
+                # Packets have a codec_type and frames have a media_type
+                if entry.get("codec_type", entry.get("media_type")) != "video":
+                    continue
+                stream_index = entry_stream_index
+            elif entry_stream_index != stream_index:
+                continue
+
+            pts = entry.get("pts", "N/A")
+            if pts == "N/A":
+                raise ValueError(f"A {section} of the stream {stream_index} doesn't have a pts.")
+            pts = int(pts)
+            append(pts)
+
+            if last_pts is not None and pts < last_pts:
+                is_sorted = False
+            elif last_pts is None or pts > last_pts:
+                # ffmpeg < 7.0 named the duration of a frame pkt_duration
+                duration = entry.get("duration", entry.get("pkt_duration", "N/A"))
+                last_pts = pts
+                last_duration = 0 if duration == "N/A" else int(duration)
+
+        if last_pts is None:
+            if stream_index is None:
+                raise ValueError("The ffprobe dump doesn't contain any packet or frame of a video stream.")
+            raise ValueError(f"The ffprobe dump doesn't contain any packet or frame of the stream {stream_index}.")
+
+        if last_duration <= 0:
+            raise ValueError("The duration of the last frame is unknown.")
+
+        # The packets are in decoding order, so sort them in presentation order (only needed if the video contains B-frames)
+        if not is_sorted:
+            pts_list = array("q", sorted(pts_list))
+        pts_list.append(last_pts + last_duration)
+
+        time_scale = None
+        assert stream_index is not None # Make mypy happy
+        if time_bases.get(stream_index, "") not in ("", "N/A", "0/0"):
+            time_scale = 1 / Fraction(time_bases[stream_index])
+
+        return pts_list, time_scale
+
+
+    @staticmethod
+    def _iter_ffprobe_json_entries(file_content: TextIOBase) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Iterate over the sections of a ffprobe JSON dump (ex: packet, frame or stream) and their fields.
+
+        The first "{" of the dump must already be read.
+        """
+        reader = JSONStreamReader(file_content)
+
+        while reader.peek(JSON_SEPARATOR_REGEX) not in ("}", ""):
+            key = reader.decode()
+            reader.expect(":")
+
+            if key in ("packets", "frames", "packets_and_frames") and reader.peek() == "[":
+                # These arrays can be huge, so their elements are decoded one at a time
+                reader.expect("[")
+                default_section = "packet" if key == "packets" else "frame"
+                while reader.peek(JSON_SEPARATOR_REGEX) not in ("]", ""):
+                    entry = reader.decode()
+                    yield entry.get("type", default_section), entry
+                reader.expect("]")
+            elif key == "streams":
+                for entry in reader.decode():
+                    yield "stream", entry
+            else:
+                reader.decode()
+
+
+    @staticmethod
+    def _iter_ffprobe_csv_entries(lines: Iterable[str], delimiter: str) -> Iterator[tuple[str, dict[str, str]]]:
+        """Iterate over the sections of a ffprobe CSV or compact dump (ex: packet, frame or stream) and their fields.
+
+        Each line is a section: its name, followed by the fields as key=value (ex: "packet,codec_type=video,stream_index=0,pts=0").
+        """
+        for row in csv_reader(lines, delimiter=delimiter):
+            if not row:
+                continue
+
+            section, *fields = row
+            entry: dict[str, str] = {}
+            for field in fields:
+                key, separator, value = field.partition("=")
+                if not separator:
+                    raise ValueError(f'The field "{field}" of the ffprobe dump doesn\'t have a key. Use the option "-of csv=nokey=0" of ffprobe.')
+                entry[key] = value
+
+            yield section, entry
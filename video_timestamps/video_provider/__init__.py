@@ -1,5 +1,9 @@
-__all__ = ["ABCVideoProvider", "BestSourceVideoProvider", "FFMS2VideoProvider"]
+__all__ = ["ABCVideoProvider", "BestSourceVideoProvider", "FFMS2VideoProvider", "LibavDemuxVideoProvider", "MatroskaVideoProvider", "MP4VideoProvider", "MPEGTSVideoProvider"]
 
 from .abc_video_provider import ABCVideoProvider
 from .best_source_video_provider import BestSourceVideoProvider
 from .ffms2_video_provider import FFMS2VideoProvider
+from .libav_demux_video_provider import LibavDemuxVideoProvider
+from .matroska_video_provider import MatroskaVideoProvider
+from .mp4_video_provider import MP4VideoProvider
+from .mpeg_ts_video_provider import MPEGTSVideoProvider
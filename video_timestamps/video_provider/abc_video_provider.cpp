@@ -1,7 +1,25 @@
 #include <nanobind/nanobind.h>
+#include <algorithm>
 #include "abc_video_provider.hpp"
 
+// Default get_all_pts of the providers that can't extract several streams at once, like the providers written in Python that only have get_pts.
+// It only uses the Python methods of self, so it also works when the native constructor of ABCVideoProvider hasn't been called.
+static nanobind::dict get_all_pts(nanobind::handle self, const std::string &filename, std::optional<std::vector<int>> indices) {
+    if (!indices.has_value())
+        throw std::invalid_argument("This video provider can't list the video streams of a file, so the indices must be specified.");
+
+    std::vector<int> tracks = indices.value();
+    std::sort(tracks.begin(), tracks.end());
+    tracks.erase(std::unique(tracks.begin(), tracks.end()), tracks.end());
+
+    nanobind::dict result;
+    for (int track : tracks)
+        result[nanobind::int_(track)] = self.attr("get_pts")(filename, track);
+    return result;
+}
+
 NB_MODULE(abc_video_provider, m) {
     nanobind::class_<ABCVideoProvider>(m, "ABCVideoProvider")
-        .def("get_pts", &ABCVideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none());
+        .def("get_pts", &ABCVideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_all_pts", &get_all_pts, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none());
 }
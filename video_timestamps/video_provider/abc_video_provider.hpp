@@ -1,6 +1,21 @@
 #include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
 #include <nanobind/stl/optional.h>
 #include <nanobind/stl/string.h>
+#include <nanobind/stl/vector.h>
+#include <vector>
+
+// Returned as a memoryview, so the PTS can be used without numpy
+using PtsArray = nanobind::ndarray<nanobind::memview, int64_t, nanobind::shape<-1>, nanobind::c_contig>;
+
+// Give the ownership of the PTS to a 1D array that supports the buffer protocol, so they are never copied
+inline PtsArray to_ndarray(std::vector<int64_t> &&pts_list) {
+    auto *pts = new std::vector<int64_t>(std::move(pts_list));
+    nanobind::capsule owner(pts, [](void *p) noexcept {
+        delete static_cast<std::vector<int64_t> *>(p);
+    });
+    return PtsArray(pts->data(), {pts->size()}, owner);
+}
 
 class ABCVideoProvider
 {
@@ -28,3 +28,19 @@ class ABCVideoProvider:
                 2. The time_base.
                 3. The fps.
         """
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        """Same as `get_pts`, but for several video streams, which are extracted while the file is read or indexed once.
+
+        Parameters:
+            filename: A video path.
+            indices: Absolute indices of the streams in the file (see the parameter `index` of `get_pts`).
+                Each stream must be a video stream.
+
+                If None, every video stream of the file is extracted.
+
+        Returns:
+            For each absolute index, in ascending order, the same tuple as `get_pts`.
+
+        The default implementation calls `get_pts` for each index, so a provider that only implements `get_pts` also works,
+        but the indices must be specified and the file is read once per stream.
+        """
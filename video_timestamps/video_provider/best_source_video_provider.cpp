@@ -1,4 +1,5 @@
 #include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
 #include <nanobind/stl/optional.h>
 #include <nanobind/stl/string.h>
 #include <nanobind/stl/vector.h>
@@ -12,13 +13,69 @@ extern "C" {
 #include "abc_video_provider.hpp"
 
 class BestSourceVideoProvider: public ABCVideoProvider {
-public:
-    nanobind::tuple get_pts(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
-        if (index.has_value() == video_stream_index.has_value())
-            throw std::invalid_argument("You must specify exactly one of \"index\" or \"video_stream_index\".");
+private:
+    struct VideoStreamInfo {
+        std::vector<int64_t> pts_list;
+        BSRational time_base;
+        BSRational fps;
+    };
 
-        SetFFmpegLogLevel(AV_LOG_ERROR);
+    // Check that the track at this absolute index is a video track
+    static void check_video_index(BestTrackList &tracklist, const std::string &filename, int index) {
+        if (index < 0 || index >= tracklist.GetNumTracks()) {
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not in the file " + filename + ".");
+        }
+
+        BestTrackList::TrackInfo info = tracklist.GetTrackInfo(index);
+        if (info.MediaType != AVMEDIA_TYPE_VIDEO) {
+            std::string steam_media_type = "";
+            switch (info.MediaType) {
+                case AVMEDIA_TYPE_AUDIO:
+                    steam_media_type = "audio";
+                    break;
+                case AVMEDIA_TYPE_DATA:
+                    steam_media_type = "data";
+                    break;
+                case AVMEDIA_TYPE_SUBTITLE:
+                    steam_media_type = "subtitle";
+                    break;
+                case AVMEDIA_TYPE_ATTACHMENT:
+                    steam_media_type = "attachment";
+                    break;
+                case AVMEDIA_TYPE_NB:
+                    steam_media_type = "nb";
+                    break;
+                default:
+                    steam_media_type = "unknown";
+                    break;
+            }
+
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not a video stream. It is an \"" + steam_media_type + "\" stream.");
+        }
+    }
+
+    static VideoStreamInfo get_track_info(const std::string &filename, int resolved_index) {
+        std::map<std::string, std::string> bsopts;
+        std::unique_ptr<BestVideoSource> bs = std::make_unique<BestVideoSource>(filename, "", 0, resolved_index, 0, 0, 3, filename, &bsopts);
+        BSVideoProperties properties = bs->GetVideoProperties();
+
+        std::vector<int64_t> pts_list;
+        for (int64_t n = 0; n < properties.NumFrames; n++) {
+            const BestVideoSource::FrameInfo &info = bs->GetFrameInfo(n);
+            if (info.PTS == AV_NOPTS_VALUE) {
+                continue;
+            }
+            pts_list.push_back(info.PTS);
+        }
 
+        if (pts_list.size() > 0)
+            pts_list.push_back(pts_list.front() + properties.Duration);
+
+        return VideoStreamInfo{std::move(pts_list), properties.TimeBase, properties.FPS};
+    }
+
+    // It doesn't touch any Python object, so it can run without holding the GIL
+    VideoStreamInfo get_video_stream_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
         std::map<std::string, std::string> opts;
         BestTrackList tracklist(filename, &opts);
         int num_tracks = tracklist.GetNumTracks();
@@ -26,36 +83,7 @@ public:
 
         if (index.has_value()) {
             resolved_index = index.value();
-            if (resolved_index < 0 || resolved_index >= num_tracks) {
-                throw std::invalid_argument("The index " + std::to_string(resolved_index) + " is not in the file " + filename + ".");
-            }
-
-            BestTrackList::TrackInfo info = tracklist.GetTrackInfo(resolved_index);
-            if (info.MediaType != AVMEDIA_TYPE_VIDEO) {
-                std::string steam_media_type = "";
-                switch (info.MediaType) {
-                    case AVMEDIA_TYPE_AUDIO:
-                        steam_media_type = "audio";
-                        break;
-                    case AVMEDIA_TYPE_DATA:
-                        steam_media_type = "data";
-                        break;
-                    case AVMEDIA_TYPE_SUBTITLE:
-                        steam_media_type = "subtitle";
-                        break;
-                    case AVMEDIA_TYPE_ATTACHMENT:
-                        steam_media_type = "attachment";
-                        break;
-                    case AVMEDIA_TYPE_NB:
-                        steam_media_type = "nb";
-                        break;
-                    default:
-                        steam_media_type = "unknown";
-                        break;
-                }
-
-                throw std::invalid_argument("The index " + std::to_string(resolved_index) + " is not a video stream. It is an \"" + steam_media_type + "\" stream.");
-            }
+            check_video_index(tracklist, filename, resolved_index);
         } else {
             int target_video_stream_index = video_stream_index.value();
             if (target_video_stream_index < 0) {
@@ -79,27 +107,91 @@ public:
             }
         }
 
-        std::map<std::string, std::string> bsopts;
-        std::unique_ptr<BestVideoSource> bs = std::make_unique<BestVideoSource>(filename, "", 0, resolved_index, 0, 0, 3, filename, &bsopts);
-        BSVideoProperties properties = bs->GetVideoProperties();
+        return get_track_info(filename, resolved_index);
+    }
 
-        std::vector<int64_t> pts_list;
-        for (int64_t n = 0; n < properties.NumFrames; n++) {
-            const BestVideoSource::FrameInfo &info = bs->GetFrameInfo(n);
-            if (info.PTS == AV_NOPTS_VALUE) {
-                continue;
+    // Same as get_video_stream_info, but for several tracks.
+    // BestSource indexes each track in its own pass, so only the track list is shared.
+    std::vector<std::pair<int, VideoStreamInfo>> get_all_video_stream_info(const std::string &filename, std::optional<std::vector<int>> indices) {
+        std::map<std::string, std::string> opts;
+        BestTrackList tracklist(filename, &opts);
+        std::vector<int> tracks;
+        if (indices.has_value()) {
+            for (int index : indices.value()) {
+                check_video_index(tracklist, filename, index);
+                if (std::find(tracks.begin(), tracks.end(), index) == tracks.end())
+                    tracks.push_back(index);
+            }
+        } else {
+            int num_tracks = tracklist.GetNumTracks();
+            for (int i = 0; i < num_tracks; i++) {
+                if (tracklist.GetTrackInfo(i).MediaType == AVMEDIA_TYPE_VIDEO)
+                    tracks.push_back(i);
             }
-            pts_list.push_back(info.PTS);
         }
 
-        if (pts_list.size() > 0)
-            pts_list.push_back(pts_list.front() + properties.Duration);
+        std::sort(tracks.begin(), tracks.end());
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        for (int track : tracks)
+            infos.emplace_back(track, get_track_info(filename, track));
+        return infos;
+    }
 
+    static nanobind::tuple to_python(VideoStreamInfo &&info, bool as_buffer) {
         nanobind::object fraction_class = nanobind::module_::import_("fractions").attr("Fraction");
-        nanobind::object time_base = fraction_class(properties.TimeBase.Num, properties.TimeBase.Den);
-        nanobind::object fps = fraction_class(properties.FPS.Num, properties.FPS.Den);
+        nanobind::object time_base = fraction_class(info.time_base.Num, info.time_base.Den);
+        nanobind::object fps = fraction_class(info.fps.Num, info.fps.Den);
+
+        if (as_buffer)
+            return nanobind::make_tuple(to_ndarray(std::move(info.pts_list)), time_base, fps);
+        return nanobind::make_tuple(info.pts_list, time_base, fps);
+    }
+
+    nanobind::tuple get_pts_and_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index, bool as_buffer) {
+        if (index.has_value() == video_stream_index.has_value())
+            throw std::invalid_argument("You must specify exactly one of \"index\" or \"video_stream_index\".");
+
+        SetFFmpegLogLevel(AV_LOG_ERROR);
+
+        // Indexing can take minutes, so let the other Python threads run meanwhile
+        VideoStreamInfo info;
+        {
+            nanobind::gil_scoped_release release;
+            info = get_video_stream_info(filename, index, video_stream_index);
+        }
+        return to_python(std::move(info), as_buffer);
+    }
+
+    nanobind::dict get_all_pts_and_info(const std::string &filename, std::optional<std::vector<int>> indices, bool as_buffer) {
+        SetFFmpegLogLevel(AV_LOG_ERROR);
+
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        {
+            nanobind::gil_scoped_release release;
+            infos = get_all_video_stream_info(filename, indices);
+        }
+
+        nanobind::dict result;
+        for (auto &[index, info] : infos)
+            result[nanobind::int_(index)] = to_python(std::move(info), as_buffer);
+        return result;
+    }
+
+public:
+    nanobind::tuple get_pts(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, false);
+    }
+
+    nanobind::tuple get_pts_buffer(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, true);
+    }
+
+    nanobind::dict get_all_pts(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, false);
+    }
 
-        return nanobind::make_tuple(pts_list, time_base, fps);
+    nanobind::dict get_all_pts_buffer(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, true);
     }
 };
 
@@ -108,5 +200,8 @@ NB_MODULE(best_source_video_provider, m) {
 
     nanobind::class_<BestSourceVideoProvider, ABCVideoProvider>(m, "BestSourceVideoProvider")
         .def(nanobind::init<>())
-        .def("get_pts", &BestSourceVideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none());
+        .def("get_pts", &BestSourceVideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_pts_buffer", &BestSourceVideoProvider::get_pts_buffer, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_all_pts", &BestSourceVideoProvider::get_all_pts, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none())
+        .def("get_all_pts_buffer", &BestSourceVideoProvider::get_all_pts_buffer, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none());
 }
@@ -1,5 +1,7 @@
 from fractions import Fraction
 
+from typing_extensions import Buffer
+
 from .abc_video_provider import ABCVideoProvider
 
 __all__ = ['BestSourceVideoProvider']
@@ -12,3 +14,17 @@ class BestSourceVideoProvider(ABCVideoProvider):
         ...
     def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
         ...
+    def get_pts_buffer(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[Buffer, Fraction, Fraction]:
+        """Same as `get_pts`, but the PTS are returned in a `memoryview` of signed 64-bit integers.
+
+        The memoryview owns the PTS extracted from the video, so no int object is created for each frame.
+        Use it with [`VideoTimestamps.from_buffer`][video_timestamps.video_timestamps.VideoTimestamps.from_buffer].
+        """
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        """Same as [`ABCVideoProvider.get_all_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_all_pts].
+
+        BestSource indexes each track in its own pass, so only the list of the tracks is read once.
+        """
+    def get_all_pts_buffer(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[Buffer, Fraction, Fraction]]:
+        """Same as `get_all_pts`, but the PTS of each stream are returned in an array like with `get_pts_buffer`.
+        """
@@ -1,17 +1,178 @@
 #include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
 #include <nanobind/stl/optional.h>
 #include <nanobind/stl/shared_ptr.h>
 #include <nanobind/stl/string.h>
 #include <nanobind/stl/vector.h>
 #include <ffms.h>
+#include <algorithm>
+#include <cstdio>
+#include <filesystem>
 #include "abc_video_provider.hpp"
 
 class FFMS2VideoProvider: public ABCVideoProvider {
-public:
-    nanobind::tuple get_pts(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
-        if (index.has_value() == video_stream_index.has_value())
-            throw std::invalid_argument("You must specify exactly one of \"index\" or \"video_stream_index\".");
+private:
+    std::optional<std::string> index_cache_directory;
+    bool create_video_source;
+
+    std::string get_index_cache_path(const std::string &filename, const std::vector<int> &tracks) {
+        // 64-bit FNV-1a hash of the absolute path. Unlike std::hash, it is the same on every platform and every run.
+        std::string absolute_filename = std::filesystem::absolute(filename).string();
+        uint64_t hash = 14695981039346656037ULL;
+        for (unsigned char c : absolute_filename) {
+            hash ^= c;
+            hash *= 1099511628211ULL;
+        }
+
+        char hash_hex[17];
+        std::snprintf(hash_hex, sizeof(hash_hex), "%016llx", static_cast<unsigned long long>(hash));
+        // Only the requested tracks are indexed, so each set of tracks has its own index
+        std::string name = hash_hex;
+        for (int track : tracks)
+            name += "_" + std::to_string(track);
+        return (std::filesystem::path(index_cache_directory.value()) / (name + ".ffindex")).string();
+    }
+
+    struct VideoStreamInfo {
+        std::vector<int64_t> pts_list;
+        int64_t time_base_num;
+        int64_t time_base_den;
+        // Only known if a video source has been created
+        std::optional<std::pair<int, int>> fps;
+    };
+
+    // Check that the track at this absolute index is a video track. If not, the indexing is cancelled.
+    static void check_video_index(FFMS_Indexer *indexer, const std::string &filename, int index) {
+        if (index < 0 || index >= FFMS_GetNumTracksI(indexer)) {
+            FFMS_CancelIndexing(indexer);
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not in the file " + filename + ".");
+        }
+
+        int track_type = FFMS_GetTrackTypeI(indexer, index);
+        if (track_type != FFMS_TYPE_VIDEO) {
+            std::string steam_media_type = "";
+            switch (track_type) {
+                case FFMS_TYPE_AUDIO:
+                    steam_media_type = "audio";
+                    break;
+                case FFMS_TYPE_DATA:
+                    steam_media_type = "data";
+                    break;
+                case FFMS_TYPE_SUBTITLE:
+                    steam_media_type = "subtitle";
+                    break;
+                case FFMS_TYPE_ATTACHMENT:
+                    steam_media_type = "attachment";
+                    break;
+                default:
+                    steam_media_type = "unknown";
+                    break;
+            }
+
+            FFMS_CancelIndexing(indexer);
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not a video stream. It is an \"" + steam_media_type + "\" stream.");
+        }
+    }
+
+    static FFMS_Indexer *create_indexer(const std::string &filename, FFMS_ErrorInfo *errinfo) {
+        FFMS_Indexer *indexer = FFMS_CreateIndexer(filename.c_str(), errinfo);
+        if (!indexer)
+            throw std::runtime_error("ffms2 reported an error while calling FFMS_CreateIndexer: " + std::string(errinfo->Buffer) + ".");
+        return indexer;
+    }
+
+    // Index the tracks in a single pass over the file, or read their index from the cache. It consumes the indexer.
+    std::unique_ptr<FFMS_Index, void(*)(FFMS_Index*)> get_index(FFMS_Indexer *indexer, const std::string &filename, const std::vector<int> &tracks, FFMS_ErrorInfo *errinfo) {
+        auto ffms2_index = std::unique_ptr<FFMS_Index, void(*)(FFMS_Index*)>(nullptr, FFMS_DestroyIndex);
+        std::string index_cache_path;
+        if (index_cache_directory.has_value()) {
+            index_cache_path = get_index_cache_path(filename, tracks);
+
+            // An index that cannot be read or that belongs to another version of the file is ignored and replaced
+            if (std::filesystem::exists(index_cache_path)) {
+                ffms2_index.reset(FFMS_ReadIndex(index_cache_path.c_str(), errinfo));
+                if (ffms2_index && FFMS_IndexBelongsToFile(ffms2_index.get(), filename.c_str(), errinfo))
+                    ffms2_index.reset();
+            }
+        }
+
+        if (ffms2_index) {
+            FFMS_CancelIndexing(indexer);
+        } else {
+            // Only index the requested tracks. By default, every video track would be indexed (and the audio tracks would be decoded if they were enabled).
+            int num_tracks = FFMS_GetNumTracksI(indexer);
+            for (int i = 0; i < num_tracks; i++)
+                FFMS_TrackIndexSettings(indexer, i, std::find(tracks.begin(), tracks.end(), i) != tracks.end(), 0);
+
+            ffms2_index.reset(FFMS_DoIndexing2(indexer, FFMS_IEH_ABORT, errinfo));
+            if (!ffms2_index)
+                throw std::runtime_error("ffms2 reported an error while calling FFMS_DoIndexing2: " + std::string(errinfo->Buffer) + ".");
+
+            if (index_cache_directory.has_value()) {
+                std::filesystem::create_directories(index_cache_directory.value());
+                if (FFMS_WriteIndex(index_cache_path.c_str(), ffms2_index.get(), errinfo))
+                    throw std::runtime_error("ffms2 reported an error while calling FFMS_WriteIndex: " + std::string(errinfo->Buffer) + ".");
+            }
+        }
+        return ffms2_index;
+    }
+
+    VideoStreamInfo get_track_info(const std::string &filename, FFMS_Index *ffms2_index, int resolved_index, FFMS_ErrorInfo *errinfo) {
+        auto video_source = std::unique_ptr<FFMS_VideoSource, void(*)(FFMS_VideoSource*)>(nullptr, FFMS_DestroyVideoSource);
+        FFMS_Track *track;
+        int num_frames;
+        if (create_video_source) {
+            int threads = 1;
+            int seek_mode = FFMS_SEEK_NORMAL;
+            video_source.reset(FFMS_CreateVideoSource(filename.c_str(), resolved_index, ffms2_index, threads, seek_mode, errinfo));
+            if (!video_source)
+                throw std::runtime_error("ffms2 reported an error while calling FFMS_CreateVideoSource: " + std::string(errinfo->Buffer) + ".");
+
+            track = FFMS_GetTrackFromVideo(video_source.get());
+            if (!track)
+                throw std::runtime_error("ffms2 reported an error while calling FFMS_GetTrackFromVideo");
+            num_frames = FFMS_GetVideoProperties(video_source.get())->NumFrames;
+        } else {
+            // The frames of the track are already in presentation order in the index, so no decoder is needed
+            track = FFMS_GetTrackFromIndex(ffms2_index, resolved_index);
+            if (!track)
+                throw std::runtime_error("ffms2 reported an error while calling FFMS_GetTrackFromIndex");
+            num_frames = FFMS_GetNumFrames(track);
+        }
 
+        std::vector<int64_t> pts_list;
+        for (int n = 0; n < num_frames; n++) {
+            const FFMS_FrameInfo *frame_info = FFMS_GetFrameInfo(track, n);
+            if (!frame_info)
+                throw std::runtime_error("ffms2 reported an error while calling FFMS_GetFrameInfo with frame " + std::to_string(n) + ".");
+
+            pts_list.push_back(frame_info->PTS);
+        }
+
+        if (video_source) {
+            if (pts_list.size() > 0)
+                pts_list.push_back(FFMS_GetVideoProperties(video_source.get())->LastEndPTS);
+        } else if (pts_list.size() > 1) {
+            // The duration of the last frame is only known by the video source, so use the duration of the previous frame
+            pts_list.push_back(2 * pts_list.back() - pts_list[pts_list.size() - 2]);
+        } else if (pts_list.size() == 1) {
+            throw std::runtime_error("The duration of the only frame of the video stream is unknown. Use create_video_source=True.");
+        }
+
+        const FFMS_TrackTimeBase *ffms2_time_base = FFMS_GetTimeBase(track);
+        if (!ffms2_time_base)
+            throw std::runtime_error("ffms2 reported an error while calling FFMS_GetTimeBase");
+
+        VideoStreamInfo info{std::move(pts_list), ffms2_time_base->Num, ffms2_time_base->Den, std::nullopt};
+        if (video_source) {
+            const FFMS_VideoProperties *videoprops = FFMS_GetVideoProperties(video_source.get());
+            info.fps = std::make_pair(videoprops->FPSNumerator, videoprops->FPSDenominator);
+        }
+        return info;
+    }
+
+    // It doesn't touch any Python object, so it can run without holding the GIL
+    VideoStreamInfo get_video_stream_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
         char errmsg[1024];
         FFMS_ErrorInfo errinfo;
         errinfo.Buffer      = errmsg;
@@ -19,46 +180,13 @@ public:
         errinfo.ErrorType   = FFMS_ERROR_SUCCESS;
         errinfo.SubType     = FFMS_ERROR_SUCCESS;
 
-        FFMS_Init(0, 0);
-
-        FFMS_Indexer *indexer = FFMS_CreateIndexer(filename.c_str(), &errinfo);
-        if (!indexer)
-            throw std::runtime_error("ffms2 reported an error while calling FFMS_CreateIndexer: " + std::string(errinfo.Buffer) + ".");
-
+        FFMS_Indexer *indexer = create_indexer(filename, &errinfo);
         int num_tracks = FFMS_GetNumTracksI(indexer);
         int resolved_index;
 
         if (index.has_value()) {
             resolved_index = index.value();
-            if (resolved_index < 0 || resolved_index >= num_tracks) {
-                FFMS_CancelIndexing(indexer);
-                throw std::invalid_argument("The index " + std::to_string(resolved_index) + " is not in the file " + filename + ".");
-            }
-
-            int track_type = FFMS_GetTrackTypeI(indexer, resolved_index);
-            if (track_type != FFMS_TYPE_VIDEO) {
-                std::string steam_media_type = "";
-                switch (track_type) {
-                    case FFMS_TYPE_AUDIO:
-                        steam_media_type = "audio";
-                        break;
-                    case FFMS_TYPE_DATA:
-                        steam_media_type = "data";
-                        break;
-                    case FFMS_TYPE_SUBTITLE:
-                        steam_media_type = "subtitle";
-                        break;
-                    case FFMS_TYPE_ATTACHMENT:
-                        steam_media_type = "attachment";
-                        break;
-                    default:
-                        steam_media_type = "unknown";
-                        break;
-                }
-
-                FFMS_CancelIndexing(indexer);
-                throw std::invalid_argument("The index " + std::to_string(resolved_index) + " is not a video stream. It is an \"" + steam_media_type + "\" stream.");
-            }
+            check_video_index(indexer, filename, resolved_index);
         } else {
             int target_video_stream_index = video_stream_index.value();
             if (target_video_stream_index < 0) {
@@ -84,49 +212,113 @@ public:
             }
         }
 
-        auto ffms2_index = std::unique_ptr<FFMS_Index, void(*)(FFMS_Index*)>(
-            FFMS_DoIndexing2(indexer, FFMS_IEH_ABORT, &errinfo),
-            FFMS_DestroyIndex
-        );
-        if (!ffms2_index)
-            throw std::runtime_error("ffms2 reported an error while calling FFMS_DoIndexing2: " + std::string(errinfo.Buffer) + ".");
+        auto ffms2_index = get_index(indexer, filename, {resolved_index}, &errinfo);
+        return get_track_info(filename, ffms2_index.get(), resolved_index, &errinfo);
+    }
 
-        int threads = 1;
-        int seek_mode = FFMS_SEEK_NORMAL;
-        auto video_source = std::unique_ptr<FFMS_VideoSource, void(*)(FFMS_VideoSource*)>(
-            FFMS_CreateVideoSource(filename.c_str(), resolved_index, ffms2_index.get(), threads, seek_mode, &errinfo),
-            FFMS_DestroyVideoSource
-        );
-        if (!video_source)
-            throw std::runtime_error("ffms2 reported an error while calling FFMS_CreateVideoSource: " + std::string(errinfo.Buffer) + ".");
+    // Same as get_video_stream_info, but for several tracks that are indexed at the same time
+    std::vector<std::pair<int, VideoStreamInfo>> get_all_video_stream_info(const std::string &filename, std::optional<std::vector<int>> indices) {
+        char errmsg[1024];
+        FFMS_ErrorInfo errinfo;
+        errinfo.Buffer      = errmsg;
+        errinfo.BufferSize  = sizeof(errmsg);
+        errinfo.ErrorType   = FFMS_ERROR_SUCCESS;
+        errinfo.SubType     = FFMS_ERROR_SUCCESS;
 
-        FFMS_Track *track = FFMS_GetTrackFromVideo(video_source.get());
-        if (!track)
-            throw std::runtime_error("ffms2 reported an error while calling FFMS_GetTrackFromVideo");
+        FFMS_Indexer *indexer = create_indexer(filename, &errinfo);
+        std::vector<int> tracks;
+        if (indices.has_value()) {
+            for (int index : indices.value()) {
+                check_video_index(indexer, filename, index);
+                if (std::find(tracks.begin(), tracks.end(), index) == tracks.end())
+                    tracks.push_back(index);
+            }
+        } else {
+            int num_tracks = FFMS_GetNumTracksI(indexer);
+            for (int i = 0; i < num_tracks; i++) {
+                if (FFMS_GetTrackTypeI(indexer, i) == FFMS_TYPE_VIDEO)
+                    tracks.push_back(i);
+            }
+        }
 
-        const FFMS_VideoProperties *videoprops = FFMS_GetVideoProperties(video_source.get());
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        if (tracks.empty()) {
+            FFMS_CancelIndexing(indexer);
+            return infos;
+        }
 
-        std::vector<int64_t> pts_list;
-        for (int n = 0; n < videoprops->NumFrames; n++) {
-            const FFMS_FrameInfo *frame_info = FFMS_GetFrameInfo(track, n);
-            if (!frame_info)
-                throw std::runtime_error("ffms2 reported an error while calling FFMS_GetFrameInfo with frame " + std::to_string(n) + ".");
+        std::sort(tracks.begin(), tracks.end());
+        auto ffms2_index = get_index(indexer, filename, tracks, &errinfo);
+        for (int track : tracks)
+            infos.emplace_back(track, get_track_info(filename, ffms2_index.get(), track, &errinfo));
+        return infos;
+    }
 
-            pts_list.push_back(frame_info->PTS);
+    nanobind::tuple to_python(VideoStreamInfo &&info, bool as_buffer) {
+        nanobind::object fraction_class = nanobind::module_::import_("fractions").attr("Fraction");
+        nanobind::object time_base = fraction_class(info.time_base_num, info.time_base_den) / fraction_class(1000, 1);
+        nanobind::object fps;
+        if (info.fps.has_value()) {
+            fps = fraction_class(info.fps->first, info.fps->second);
+        } else if (info.pts_list.size() > 1) {
+            // Mean frame rate of the stream
+            fps = fraction_class(info.pts_list.size() - 1, 1) / (fraction_class(info.pts_list.back() - info.pts_list.front(), 1) * time_base);
+        } else {
+            fps = fraction_class(0, 1);
         }
 
-        if (pts_list.size() > 0)
-            pts_list.push_back(videoprops->LastEndPTS);
+        if (as_buffer)
+            return nanobind::make_tuple(to_ndarray(std::move(info.pts_list)), time_base, fps);
+        return nanobind::make_tuple(info.pts_list, time_base, fps);
+    }
 
-        const FFMS_TrackTimeBase *ffms2_time_base = FFMS_GetTimeBase(track);
-        if (!ffms2_time_base)
-            throw std::runtime_error("ffms2 reported an error while calling FFMS_GetTimeBase");
+    nanobind::tuple get_pts_and_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index, bool as_buffer) {
+        if (index.has_value() == video_stream_index.has_value())
+            throw std::invalid_argument("You must specify exactly one of \"index\" or \"video_stream_index\".");
 
-        nanobind::object fraction_class = nanobind::module_::import_("fractions").attr("Fraction");
-        nanobind::object time_base = fraction_class(ffms2_time_base->Num, ffms2_time_base->Den) / fraction_class(1000, 1);
-        nanobind::object fps = fraction_class(videoprops->FPSNumerator, videoprops->FPSDenominator);
+        FFMS_Init(0, 0);
+
+        // Indexing can take minutes, so let the other Python threads run meanwhile
+        VideoStreamInfo info;
+        {
+            nanobind::gil_scoped_release release;
+            info = get_video_stream_info(filename, index, video_stream_index);
+        }
+        return to_python(std::move(info), as_buffer);
+    }
+
+    nanobind::dict get_all_pts_and_info(const std::string &filename, std::optional<std::vector<int>> indices, bool as_buffer) {
+        FFMS_Init(0, 0);
+
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        {
+            nanobind::gil_scoped_release release;
+            infos = get_all_video_stream_info(filename, indices);
+        }
+
+        nanobind::dict result;
+        for (auto &[index, info] : infos)
+            result[nanobind::int_(index)] = to_python(std::move(info), as_buffer);
+        return result;
+    }
+
+public:
+    FFMS2VideoProvider(std::optional<std::string> index_cache_directory, bool create_video_source) : index_cache_directory(index_cache_directory), create_video_source(create_video_source) {}
+
+    nanobind::tuple get_pts(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, false);
+    }
+
+    nanobind::tuple get_pts_buffer(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, true);
+    }
+
+    nanobind::dict get_all_pts(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, false);
+    }
 
-        return nanobind::make_tuple(pts_list, time_base, fps);
+    nanobind::dict get_all_pts_buffer(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, true);
     }
 };
 
@@ -134,6 +326,9 @@ NB_MODULE(ffms2_video_provider, m) {
     nanobind::module_::import_("video_timestamps.video_provider.abc_video_provider");
 
     nanobind::class_<FFMS2VideoProvider, ABCVideoProvider>(m, "FFMS2VideoProvider")
-        .def(nanobind::init<>())
-        .def("get_pts", &FFMS2VideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none());
+        .def(nanobind::init<std::optional<std::string>, bool>(), nanobind::arg("index_cache_directory") = nanobind::none(), nanobind::arg("create_video_source") = true)
+        .def("get_pts", &FFMS2VideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_pts_buffer", &FFMS2VideoProvider::get_pts_buffer, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_all_pts", &FFMS2VideoProvider::get_all_pts, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none())
+        .def("get_all_pts_buffer", &FFMS2VideoProvider::get_all_pts_buffer, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none());
 }
@@ -1,5 +1,7 @@
 from fractions import Fraction
 
+from typing_extensions import Buffer
+
 from .abc_video_provider import ABCVideoProvider
 
 __all__ = ['FFMS2VideoProvider']
@@ -8,7 +10,41 @@ class FFMS2VideoProvider(ABCVideoProvider):
     """
     Video provider that is based on [FFMS2](https://github.com/FFMS/ffms2).
     """
-    def __init__(self) -> None:
-        ...
+    def __init__(self, index_cache_directory: str | None = None, create_video_source: bool = True) -> None:
+        """
+        Parameters:
+            index_cache_directory: The directory where the FFMS2 index of each video is saved.
+                Indexing is the slowest part of `get_pts`, so if the same video is used again, its index is read from this directory instead.
+                An index is ignored (and replaced) if the video has changed since it has been indexed.
+
+                If None, the video is indexed on each call.
+            create_video_source: If True, a FFMS2 video source is created to get the properties of the video stream,
+                which opens a decoder and decodes its first frame.
+
+                If False, everything is read from the index, so no decoder is ever opened.
+                It is faster (especially for 4K HEVC/AV1 videos), but the result can differ from the one with a video source:
+
+                - The duration of the last frame is assumed to be the same as the duration of the previous frame.
+                    A video stream with a single frame raises an exception.
+                - The fps is the exact mean frame rate of the PTS, i.e. `(len(pts_list) - 1) / ((pts_list[-1] - pts_list[0]) * time_base)`.
+                    The video source rounds it to the microsecond and snaps it to the common frame rates (ex: 24000/1001).
+                - The frames are the ones of the index. The video source can hide some more frames when it opens the decoder
+                    (ex: the invisible frames of VP9), so they are kept here.
+        """
     def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
         ...
+    def get_pts_buffer(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[Buffer, Fraction, Fraction]:
+        """Same as `get_pts`, but the PTS are returned in a `memoryview` of signed 64-bit integers.
+
+        The memoryview owns the PTS extracted from the video, so no int object is created for each frame.
+        Use it with [`VideoTimestamps.from_buffer`][video_timestamps.video_timestamps.VideoTimestamps.from_buffer].
+        """
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        """Same as [`ABCVideoProvider.get_all_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_all_pts].
+
+        Every requested track is indexed in the same pass over the file.
+        With `index_cache_directory`, the index of these tracks is cached separately from the index of each single track.
+        """
+    def get_all_pts_buffer(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[Buffer, Fraction, Fraction]]:
+        """Same as `get_all_pts`, but the PTS of each stream are returned in an array like with `get_pts_buffer`.
+        """
@@ -0,0 +1,312 @@
+#include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
+#include <nanobind/stl/optional.h>
+#include <nanobind/stl/string.h>
+#include <nanobind/stl/vector.h>
+extern "C" {
+#include <libavformat/avformat.h>
+#include <libavutil/avutil.h>
+#include <libavutil/log.h>
+}
+#include <algorithm>
+#include <climits>
+#include <cmath>
+#include <memory>
+#include "abc_video_provider.hpp"
+
+class LibavDemuxVideoProvider: public ABCVideoProvider {
+private:
+    struct VideoStreamInfo {
+        std::vector<int64_t> pts_list;
+        AVRational time_base;
+        AVRational fps;
+    };
+
+    using FormatContextPtr = std::unique_ptr<AVFormatContext, void(*)(AVFormatContext*)>;
+
+    static FormatContextPtr open_input(const std::string &filename) {
+        AVFormatContext *raw_format_context = nullptr;
+        int error = avformat_open_input(&raw_format_context, filename.c_str(), nullptr, nullptr);
+        if (error < 0) {
+            char errbuf[AV_ERROR_MAX_STRING_SIZE];
+            av_strerror(error, errbuf, sizeof(errbuf));
+            throw std::runtime_error("libavformat reported an error while calling avformat_open_input: " + std::string(errbuf) + ".");
+        }
+        // avformat_find_stream_info isn't called, since it can decode frames to probe the streams.
+        // The type of the streams and their time_base are known from the header of the containers.
+        return FormatContextPtr(
+            raw_format_context,
+            [](AVFormatContext *context) { avformat_close_input(&context); }
+        );
+    }
+
+    // Check that the stream at this absolute index is a video stream
+    static void check_video_index(AVFormatContext *format_context, const std::string &filename, int index) {
+        if (index < 0 || index >= static_cast<int>(format_context->nb_streams)) {
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not in the file " + filename + ".");
+        }
+
+        AVMediaType media_type = format_context->streams[index]->codecpar->codec_type;
+        if (media_type != AVMEDIA_TYPE_VIDEO) {
+            std::string steam_media_type = "";
+            switch (media_type) {
+                case AVMEDIA_TYPE_AUDIO:
+                    steam_media_type = "audio";
+                    break;
+                case AVMEDIA_TYPE_DATA:
+                    steam_media_type = "data";
+                    break;
+                case AVMEDIA_TYPE_SUBTITLE:
+                    steam_media_type = "subtitle";
+                    break;
+                case AVMEDIA_TYPE_ATTACHMENT:
+                    steam_media_type = "attachment";
+                    break;
+                default:
+                    steam_media_type = "unknown";
+                    break;
+            }
+
+            throw std::invalid_argument("The index " + std::to_string(index) + " is not a video stream. It is an \"" + steam_media_type + "\" stream.");
+        }
+    }
+
+    // Read the PTS of several streams in a single pass over the file
+    static std::vector<VideoStreamInfo> read_video_streams(AVFormatContext *format_context, const std::vector<int> &tracks) {
+        int num_tracks = static_cast<int>(format_context->nb_streams);
+        // For each stream, its position in tracks, or -1 if it isn't requested
+        std::vector<int> positions(num_tracks, -1);
+        for (size_t i = 0; i < tracks.size(); i++)
+            positions[tracks[i]] = static_cast<int>(i);
+
+        // The demuxer can skip the packets of the other streams
+        for (int i = 0; i < num_tracks; i++) {
+            if (positions[i] == -1)
+                format_context->streams[i]->discard = AVDISCARD_ALL;
+        }
+
+        auto packet = std::unique_ptr<AVPacket, void(*)(AVPacket*)>(
+            av_packet_alloc(),
+            [](AVPacket *p) { av_packet_free(&p); }
+        );
+        if (!packet)
+            throw std::runtime_error("libavformat reported an error while calling av_packet_alloc.");
+
+        std::vector<std::vector<int64_t>> pts_lists(tracks.size());
+        // The end of the last frame in presentation order
+        std::vector<int64_t> end_pts_list(tracks.size(), AV_NOPTS_VALUE);
+        // The first and last pts of each stream, including the discarded packets, since FFMS2 computes the fps from them
+        std::vector<int64_t> first_pts_list(tracks.size(), AV_NOPTS_VALUE);
+        std::vector<int64_t> last_pts_list(tracks.size(), AV_NOPTS_VALUE);
+        int error;
+        while ((error = av_read_frame(format_context, packet.get())) >= 0) {
+            int position = packet->stream_index < num_tracks ? positions[packet->stream_index] : -1;
+            if (position != -1) {
+                // Without B-frames, some containers (ex: avi) only store the dts, which is then the same as the pts
+                int64_t pts = packet->pts != AV_NOPTS_VALUE ? packet->pts : packet->dts;
+                if (pts != AV_NOPTS_VALUE) {
+                    int64_t &first_pts = first_pts_list[position];
+                    int64_t &last_pts = last_pts_list[position];
+                    if (first_pts == AV_NOPTS_VALUE || pts < first_pts)
+                        first_pts = pts;
+                    if (last_pts == AV_NOPTS_VALUE || pts > last_pts)
+                        last_pts = pts;
+
+                    // The packets before the start of an edit list are flagged as discarded. They are never displayed.
+                    if (!(packet->flags & AV_PKT_FLAG_DISCARD)) {
+                        pts_lists[position].push_back(pts);
+                        int64_t &end_pts = end_pts_list[position];
+                        if (end_pts == AV_NOPTS_VALUE || pts + packet->duration > end_pts)
+                            end_pts = pts + packet->duration;
+                    }
+                }
+            }
+            av_packet_unref(packet.get());
+        }
+        if (error != AVERROR_EOF) {
+            char errbuf[AV_ERROR_MAX_STRING_SIZE];
+            av_strerror(error, errbuf, sizeof(errbuf));
+            throw std::runtime_error("libavformat reported an error while calling av_read_frame: " + std::string(errbuf) + ".");
+        }
+
+        std::vector<VideoStreamInfo> infos;
+        for (size_t i = 0; i < tracks.size(); i++) {
+            std::vector<int64_t> &pts_list = pts_lists[i];
+            int64_t end_pts = end_pts_list[i];
+            size_t frame_count = pts_list.size();
+
+            // The packets are in decoding order
+            std::sort(pts_list.begin(), pts_list.end());
+            if (pts_list.size() > 0) {
+                // If the duration of the last frame is unknown, use the duration of the previous frame
+                if (end_pts <= pts_list.back())
+                    end_pts = pts_list.size() > 1 ? 2 * pts_list.back() - pts_list[pts_list.size() - 2] : pts_list.back() + 1;
+                pts_list.push_back(end_pts);
+            }
+
+            AVRational time_base = format_context->streams[tracks[i]]->time_base;
+            AVRational fps = get_fps(last_pts_list[i] - first_pts_list[i], frame_count, time_base);
+            infos.push_back(VideoStreamInfo{std::move(pts_list), time_base, fps});
+        }
+        return infos;
+    }
+
+    // Compute the fps like FFMS_VideoSource does, so both providers report the same fps.
+    // It is the mean fps of the stream, rounded to the microsecond and snapped to the common frame rates.
+    static AVRational get_fps(int64_t pts_span, size_t frame_count, AVRational time_base) {
+        int num = time_base.den;
+        int den = time_base.num;
+        if (frame_count >= 2) {
+            double ms_span = static_cast<double>(pts_span) * (static_cast<double>(time_base.num) * 1000.0) / static_cast<double>(time_base.den);
+            num = 1000000;
+            den = static_cast<int>(static_cast<unsigned int>(ms_span * 1000.0 / static_cast<double>(frame_count - 1)));
+        }
+        if (!num || !den)
+            return AVRational{0, 1};
+
+        av_reduce(&num, &den, num, den, INT_MAX);
+
+        const double fps = static_cast<double>(num) / den;
+        const int fps_list[] = {24, 25, 30, 48, 50, 60, 100, 120};
+        for (int common_fps : fps_list) {
+            const double delta = (common_fps - common_fps / 1.001) / 2.0;
+            if (std::fabs(fps - common_fps) < delta)
+                return AVRational{common_fps, 1};
+            if ((common_fps % 25) && std::fabs(fps - common_fps / 1.001) < delta)
+                return AVRational{common_fps * 1000, 1001};
+        }
+        return AVRational{num, den};
+    }
+
+    // It doesn't touch any Python object, so it can run without holding the GIL
+    VideoStreamInfo get_video_stream_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        FormatContextPtr format_context = open_input(filename);
+        int num_tracks = static_cast<int>(format_context->nb_streams);
+        int resolved_index;
+
+        if (index.has_value()) {
+            resolved_index = index.value();
+            check_video_index(format_context.get(), filename, resolved_index);
+        } else {
+            int target_video_stream_index = video_stream_index.value();
+            if (target_video_stream_index < 0) {
+                throw std::invalid_argument("The video_stream_index " + std::to_string(target_video_stream_index) + " must be a positive integer.");
+            }
+
+            int video_track_count = 0;
+            resolved_index = -1;
+            for (int i = 0; i < num_tracks; i++) {
+                if (format_context->streams[i]->codecpar->codec_type == AVMEDIA_TYPE_VIDEO) {
+                    if (video_track_count == target_video_stream_index) {
+                        resolved_index = i;
+                        break;
+                    }
+                    video_track_count++;
+                }
+            }
+
+            if (resolved_index == -1) {
+                throw std::invalid_argument("The video_stream_index " + std::to_string(target_video_stream_index) + " is not in the file " + filename + ". It only contains " + std::to_string(video_track_count) + " video stream(s).");
+            }
+        }
+
+        return std::move(read_video_streams(format_context.get(), {resolved_index}).front());
+    }
+
+    // Same as get_video_stream_info, but for several streams that are read at the same time
+    std::vector<std::pair<int, VideoStreamInfo>> get_all_video_stream_info(const std::string &filename, std::optional<std::vector<int>> indices) {
+        FormatContextPtr format_context = open_input(filename);
+        std::vector<int> tracks;
+        if (indices.has_value()) {
+            for (int index : indices.value()) {
+                check_video_index(format_context.get(), filename, index);
+                if (std::find(tracks.begin(), tracks.end(), index) == tracks.end())
+                    tracks.push_back(index);
+            }
+        } else {
+            int num_tracks = static_cast<int>(format_context->nb_streams);
+            for (int i = 0; i < num_tracks; i++) {
+                if (format_context->streams[i]->codecpar->codec_type == AVMEDIA_TYPE_VIDEO)
+                    tracks.push_back(i);
+            }
+        }
+
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        if (tracks.empty())
+            return infos;
+
+        std::sort(tracks.begin(), tracks.end());
+        std::vector<VideoStreamInfo> streams_info = read_video_streams(format_context.get(), tracks);
+        for (size_t i = 0; i < tracks.size(); i++)
+            infos.emplace_back(tracks[i], std::move(streams_info[i]));
+        return infos;
+    }
+
+    static nanobind::tuple to_python(VideoStreamInfo &&info, bool as_buffer) {
+        nanobind::object fraction_class = nanobind::module_::import_("fractions").attr("Fraction");
+        nanobind::object time_base = fraction_class(info.time_base.num, info.time_base.den);
+        nanobind::object fps = fraction_class(info.fps.num, info.fps.den);
+
+        if (as_buffer)
+            return nanobind::make_tuple(to_ndarray(std::move(info.pts_list)), time_base, fps);
+        return nanobind::make_tuple(info.pts_list, time_base, fps);
+    }
+
+    nanobind::tuple get_pts_and_info(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index, bool as_buffer) {
+        if (index.has_value() == video_stream_index.has_value())
+            throw std::invalid_argument("You must specify exactly one of \"index\" or \"video_stream_index\".");
+
+        av_log_set_level(AV_LOG_ERROR);
+
+        // Let the other Python threads run while the file is read
+        VideoStreamInfo info;
+        {
+            nanobind::gil_scoped_release release;
+            info = get_video_stream_info(filename, index, video_stream_index);
+        }
+        return to_python(std::move(info), as_buffer);
+    }
+
+    nanobind::dict get_all_pts_and_info(const std::string &filename, std::optional<std::vector<int>> indices, bool as_buffer) {
+        av_log_set_level(AV_LOG_ERROR);
+
+        std::vector<std::pair<int, VideoStreamInfo>> infos;
+        {
+            nanobind::gil_scoped_release release;
+            infos = get_all_video_stream_info(filename, indices);
+        }
+
+        nanobind::dict result;
+        for (auto &[index, info] : infos)
+            result[nanobind::int_(index)] = to_python(std::move(info), as_buffer);
+        return result;
+    }
+
+public:
+    nanobind::tuple get_pts(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, false);
+    }
+
+    nanobind::tuple get_pts_buffer(const std::string &filename, std::optional<int> index, std::optional<int> video_stream_index) {
+        return get_pts_and_info(filename, index, video_stream_index, true);
+    }
+
+    nanobind::dict get_all_pts(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, false);
+    }
+
+    nanobind::dict get_all_pts_buffer(const std::string &filename, std::optional<std::vector<int>> indices) {
+        return get_all_pts_and_info(filename, indices, true);
+    }
+};
+
+NB_MODULE(libav_demux_video_provider, m) {
+    nanobind::module_::import_("video_timestamps.video_provider.abc_video_provider");
+
+    nanobind::class_<LibavDemuxVideoProvider, ABCVideoProvider>(m, "LibavDemuxVideoProvider")
+        .def(nanobind::init<>())
+        .def("get_pts", &LibavDemuxVideoProvider::get_pts, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_pts_buffer", &LibavDemuxVideoProvider::get_pts_buffer, nanobind::arg("filename"), nanobind::arg("index"), nanobind::arg("video_stream_index") = nanobind::none())
+        .def("get_all_pts", &LibavDemuxVideoProvider::get_all_pts, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none())
+        .def("get_all_pts_buffer", &LibavDemuxVideoProvider::get_all_pts_buffer, nanobind::arg("filename"), nanobind::arg("indices") = nanobind::none());
+}
@@ -0,0 +1,36 @@
+from fractions import Fraction
+
+from typing_extensions import Buffer
+
+from .abc_video_provider import ABCVideoProvider
+
+__all__ = ['LibavDemuxVideoProvider']
+
+class LibavDemuxVideoProvider(ABCVideoProvider):
+    """
+    Video provider that only demuxes the video with [libavformat](https://ffmpeg.org/libavformat.html).
+
+    The PTS of the packets of the video stream are read and sorted in presentation order, so nothing is indexed or decoded.
+    It is a lot faster than the other providers, but the duration of the last frame comes from the container.
+    If the container doesn't store it, the duration of the previous frame is used.
+    The packets that an edit list discards are skipped and the fps is computed like FFMS2 does,
+    so the result is the same as with [`FFMS2VideoProvider`][video_timestamps.video_provider.ffms2_video_provider.FFMS2VideoProvider].
+    """
+    def __init__(self) -> None:
+        ...
+    def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+        ...
+    def get_pts_buffer(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[Buffer, Fraction, Fraction]:
+        """Same as `get_pts`, but the PTS are returned in a `memoryview` of signed 64-bit integers.
+
+        The memoryview owns the PTS extracted from the video, so no int object is created for each frame.
+        Use it with [`VideoTimestamps.from_buffer`][video_timestamps.video_timestamps.VideoTimestamps.from_buffer].
+        """
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        """Same as [`ABCVideoProvider.get_all_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_all_pts].
+
+        The packets of every requested stream are read in the same pass over the file.
+        """
+    def get_all_pts_buffer(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[Buffer, Fraction, Fraction]]:
+        """Same as `get_all_pts`, but the PTS of each stream are returned in an array like with `get_pts_buffer`.
+        """
@@ -0,0 +1,356 @@
+from collections.abc import Callable, Iterator
+from fractions import Fraction
+from os import fstat
+from typing import BinaryIO
+
+from .abc_video_provider import ABCVideoProvider
+from .track_index import resolve_track_index, resolve_track_indices
+
+__all__ = ["MatroskaVideoProvider"]
+
+# EBML IDs of the Matroska elements that are needed
+EBML_HEADER_ID = 0x1A45DFA3
+SEGMENT_ID = 0x18538067
+INFO_ID = 0x1549A966
+TIMESTAMP_SCALE_ID = 0x2AD7B1
+TRACKS_ID = 0x1654AE6B
+TRACK_ENTRY_ID = 0xAE
+TRACK_NUMBER_ID = 0xD7
+TRACK_TYPE_ID = 0x83
+DEFAULT_DURATION_ID = 0x23E383
+CODEC_DELAY_ID = 0x56AA
+CLUSTER_ID = 0x1F43B675
+CLUSTER_TIMESTAMP_ID = 0xE7
+SIMPLE_BLOCK_ID = 0xA3
+BLOCK_GROUP_ID = 0xA0
+BLOCK_ID = 0xA1
+BLOCK_DURATION_ID = 0x9B
+# The elements that can follow a Cluster in a Segment. They end a Cluster of unknown size.
+SEGMENT_CHILD_IDS = {
+    0x114D9B74, # SeekHead
+    INFO_ID,
+    TRACKS_ID,
+    CLUSTER_ID,
+    0x1C53BB6B, # Cues
+    0x1941A469, # Attachments
+    0x1043A770, # Chapters
+    0x1254C367, # Tags
+}
+# Media type of the TrackType values. Like FFmpeg, the tracks of the other types don't create a stream.
+TRACK_TYPE_MEDIA_TYPES = {
+    0x1: "video",
+    0x2: "audio",
+    0x11: "subtitle",
+    0x21: "data",
+}
+# The default value of TimestampScale, in nanoseconds
+DEFAULT_TIMESTAMP_SCALE = 1000000
+# An element header is at most a 4 bytes ID and a 8 bytes size
+ELEMENT_HEADER_MAX_SIZE = 12
+# A block header is at most a 8 bytes track number, a 2 bytes timestamp, 1 byte of flags and 1 byte for the number of frames in the lace
+BLOCK_HEADER_MAX_SIZE = 12
+
+
+class MatroskaTrack:
+    def __init__(self) -> None:
+        self.track_number = 0
+        self.media_type = "unknown"
+        # In nanoseconds
+        self.default_duration = 0
+        self.codec_delay = 0
+
+
+class MatroskaVideoProvider(ABCVideoProvider):
+    """Video provider for Matroska/WebM files that only reads the headers of their blocks.
+
+    The timestamp of each frame is the timestamp of its Cluster plus the relative timestamp of its SimpleBlock or Block,
+    so the frames are skipped without being read, demuxed or decoded.
+    The duration of the last frame comes from its BlockDuration or from the DefaultDuration of the track.
+    The time_base is the TimestampScale of the Segment, like FFmpeg.
+    """
+
+    def __init__(self) -> None:
+        # The native constructor of ABCVideoProvider is abstract, so it isn't called
+        pass
+
+    def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+        if (index is None) == (video_stream_index is None):
+            raise ValueError('You must specify exactly one of "index" or "video_stream_index".')
+
+        timestamp_scale, tracks, track_indices, blocks = MatroskaVideoProvider._parse_file(
+            filename,
+            lambda tracks: [resolve_track_index(filename, index, video_stream_index, [track.media_type for track in tracks])],
+        )
+        track = tracks[track_indices[0]]
+        return MatroskaVideoProvider._get_track_pts(filename, track, timestamp_scale, blocks.get(track.track_number, []))
+
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        # The blocks of every requested track are collected while the clusters are walked, so the file is read once
+        timestamp_scale, tracks, track_indices, blocks = MatroskaVideoProvider._parse_file(
+            filename,
+            lambda tracks: resolve_track_indices(filename, indices, [track.media_type for track in tracks]),
+        )
+        return {
+            index: MatroskaVideoProvider._get_track_pts(filename, tracks[index], timestamp_scale, blocks.get(tracks[index].track_number, []))
+            for index in track_indices
+        }
+
+    @staticmethod
+    def _parse_file(
+        filename: str,
+        resolve_tracks: Callable[[list[MatroskaTrack]], list[int]],
+    ) -> tuple[int, list[MatroskaTrack], list[int], dict[int, list[tuple[int, int, int]]]]:
+        # Return the TimestampScale, the tracks, the indices of the requested tracks returned by resolve_tracks
+        # and for each requested track number, its blocks as (timestamp, duration, frame count), where duration is 0 if unknown
+        with open(filename, "rb") as f:
+            file_size = fstat(f.fileno()).st_size
+            header = f.read(ELEMENT_HEADER_MAX_SIZE)
+            if len(header) < 4 or int.from_bytes(header[:4], "big") != EBML_HEADER_ID:
+                raise ValueError(f"The file {filename} isn't a Matroska/WebM file, since it doesn't start with an EBML header.")
+
+            segment_start, segment_end = MatroskaVideoProvider._find_segment(f, file_size)
+            if segment_start is None:
+                raise ValueError(f"The file {filename} isn't a Matroska/WebM file, since it doesn't contain a Segment.")
+
+            # The Info and Tracks elements are before the first Cluster in practice, but the specification allows them to be after it.
+            # So the blocks of every track are collected until the Tracks are known, then only the ones of the requested tracks.
+            timestamp_scale = DEFAULT_TIMESTAMP_SCALE
+            tracks: list[MatroskaTrack] = []
+            track_indices: list[int] | None = None
+            track_numbers: set[int] | None = None
+            blocks: dict[int, list[tuple[int, int, int]]] = {}
+            for element_id, data_start, data_end in MatroskaVideoProvider._iter_elements(f, segment_start, segment_end, SEGMENT_CHILD_IDS):
+                if element_id == INFO_ID:
+                    timestamp_scale = MatroskaVideoProvider._parse_info(MatroskaVideoProvider._read(f, data_start, data_end))
+                elif element_id == TRACKS_ID:
+                    tracks = MatroskaVideoProvider._parse_tracks(MatroskaVideoProvider._read(f, data_start, data_end))
+                    track_indices = resolve_tracks(tracks)
+                    track_numbers = {tracks[index].track_number for index in track_indices}
+                elif element_id == CLUSTER_ID:
+                    MatroskaVideoProvider._parse_cluster(f, data_start, data_end, track_numbers, blocks)
+
+        if track_indices is None:
+            track_indices = resolve_tracks(tracks)
+        return timestamp_scale, tracks, track_indices, blocks
+
+    @staticmethod
+    def _get_track_pts(filename: str, track: MatroskaTrack, timestamp_scale: int, blocks: list[tuple[int, int, int]]) -> tuple[list[int], Fraction, Fraction]:
+        # DefaultDuration and CodecDelay are in nanoseconds, so they need to be converted to the timebase of the track
+        default_duration = track.default_duration // timestamp_scale
+        codec_delay = (track.codec_delay + timestamp_scale // 2) // timestamp_scale
+
+        frames = MatroskaVideoProvider._get_frames(blocks, default_duration)
+        if not frames:
+            raise ValueError(f"The video stream of the file {filename} doesn't contain any frame.")
+
+        pts_list = sorted(timestamp - codec_delay for timestamp, _ in frames)
+        end_pts = max(timestamp - codec_delay + duration for timestamp, duration in frames)
+        if end_pts <= pts_list[-1]:
+            # The duration of the last frame is unknown, so use the duration of the previous frame
+            end_pts = 2 * pts_list[-1] - pts_list[-2] if len(pts_list) > 1 else pts_list[-1] + 1
+        pts_list.append(end_pts)
+
+        time_base = Fraction(timestamp_scale, 10**9)
+        if track.default_duration:
+            # Like FFmpeg, the frame rate is the inverse of DefaultDuration
+            fps = MatroskaVideoProvider._reduce(10**9, track.default_duration, 30000)
+        else:
+            # Mean frame rate of the stream
+            fps = Fraction(len(frames)) / ((pts_list[-1] - pts_list[0]) * time_base)
+        return pts_list, time_base, fps
+
+    @staticmethod
+    def _reduce(num: int, den: int, max_value: int) -> Fraction:
+        # Best approximation of num/den whose numerator and denominator are at most max_value, like av_reduce of FFmpeg.
+        # It differs from Fraction.limit_denominator, since the numerator is also limited.
+        previous_num, previous_den, current_num, current_den = 0, 1, 1, 0
+        while den:
+            x, remainder = divmod(num, den)
+            next_num = x * current_num + previous_num
+            next_den = x * current_den + previous_den
+            if next_num > max_value or next_den > max_value:
+                if current_num:
+                    x = (max_value - previous_num) // current_num
+                if current_den:
+                    x = min(x, (max_value - previous_den) // current_den)
+                if den * (2 * x * current_den + previous_den) > num * current_den:
+                    current_num, current_den = x * current_num + previous_num, x * current_den + previous_den
+                break
+
+            previous_num, previous_den, current_num, current_den = current_num, current_den, next_num, next_den
+            num, den = den, remainder
+        return Fraction(current_num, current_den)
+
+    @staticmethod
+    def _read_vint(data: bytes, position: int, keep_marker: bool) -> tuple[int | None, int]:
+        # Return the value of the variable size integer and its length. The value is None if all its bits are set (unknown size).
+        if position >= len(data) or data[position] == 0:
+            raise ValueError(f"The EBML variable size integer at the position {position} is invalid.")
+
+        length = 9 - data[position].bit_length()
+        if position + length > len(data):
+            raise ValueError(f"The EBML variable size integer at the position {position} is truncated.")
+
+        value = int.from_bytes(data[position:position + length], "big")
+        if keep_marker:
+            return value, length
+
+        value &= (1 << (7 * length)) - 1
+        if value == (1 << (7 * length)) - 1:
+            return None, length
+        return value, length
+
+    @staticmethod
+    def _parse_header(data: bytes, position: int) -> tuple[int, int | None, int]:
+        # Return the ID, the size and the length of the header of the element at this position
+        element_id, id_length = MatroskaVideoProvider._read_vint(data, position, True)
+        assert element_id is not None # Make mypy happy
+        size, size_length = MatroskaVideoProvider._read_vint(data, position + id_length, False)
+        return element_id, size, id_length + size_length
+
+    @staticmethod
+    def _read(f: BinaryIO, start: int, end: int) -> bytes:
+        f.seek(start)
+        return f.read(end - start)
+
+    @staticmethod
+    def _find_segment(f: BinaryIO, file_size: int) -> tuple[int | None, int]:
+        position = 0
+        while position < file_size:
+            header = MatroskaVideoProvider._read(f, position, position + ELEMENT_HEADER_MAX_SIZE)
+            element_id, size, header_size = MatroskaVideoProvider._parse_header(header, 0)
+            data_start = position + header_size
+            data_end = file_size if size is None else min(data_start + size, file_size)
+            if element_id == SEGMENT_ID:
+                return data_start, data_end
+            position = data_end
+        return None, file_size
+
+    @staticmethod
+    def _iter_elements(f: BinaryIO, start: int, end: int, sibling_ids: set[int]) -> Iterator[tuple[int, int, int]]:
+        # Only the headers of the elements are read. An element of unknown size ends at the next element that is one of its siblings.
+        position = start
+        while position + 2 <= end:
+            header = MatroskaVideoProvider._read(f, position, min(position + ELEMENT_HEADER_MAX_SIZE, end))
+            element_id, size, header_size = MatroskaVideoProvider._parse_header(header, 0)
+            data_start = position + header_size
+            if size is None:
+                data_end = MatroskaVideoProvider._find_unknown_size_end(f, data_start, end, sibling_ids)
+            else:
+                data_end = min(data_start + size, end)
+
+            yield element_id, data_start, data_end
+            position = data_end
+
+    @staticmethod
+    def _find_unknown_size_end(f: BinaryIO, start: int, end: int, sibling_ids: set[int]) -> int:
+        # Only a Cluster can have an unknown size in practice and its children always have a known size
+        position = start
+        while position + 2 <= end:
+            header = MatroskaVideoProvider._read(f, position, min(position + ELEMENT_HEADER_MAX_SIZE, end))
+            element_id, size, header_size = MatroskaVideoProvider._parse_header(header, 0)
+            if element_id in sibling_ids or size is None:
+                return position
+            position += header_size + size
+        return end
+
+    @staticmethod
+    def _iter_children(data: bytes, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+        position = start
+        while position < end:
+            element_id, size, header_size = MatroskaVideoProvider._parse_header(data, position)
+            data_start = position + header_size
+            data_end = end if size is None else data_start + size
+            if data_end > end:
+                raise ValueError(f"The EBML element {element_id:#x} at the position {position} is truncated.")
+            yield element_id, data_start, data_end
+            position = data_end
+
+    @staticmethod
+    def _parse_info(data: bytes) -> int:
+        for element_id, start, end in MatroskaVideoProvider._iter_children(data, 0, len(data)):
+            if element_id == TIMESTAMP_SCALE_ID:
+                return int.from_bytes(data[start:end], "big")
+        return DEFAULT_TIMESTAMP_SCALE
+
+    @staticmethod
+    def _parse_tracks(data: bytes) -> list[MatroskaTrack]:
+        tracks: list[MatroskaTrack] = []
+        for element_id, start, end in MatroskaVideoProvider._iter_children(data, 0, len(data)):
+            if element_id != TRACK_ENTRY_ID:
+                continue
+
+            track = MatroskaTrack()
+            track_type = 0
+            for child_id, child_start, child_end in MatroskaVideoProvider._iter_children(data, start, end):
+                value = int.from_bytes(data[child_start:child_end], "big")
+                if child_id == TRACK_NUMBER_ID:
+                    track.track_number = value
+                elif child_id == TRACK_TYPE_ID:
+                    track_type = value
+                elif child_id == DEFAULT_DURATION_ID:
+                    track.default_duration = value
+                elif child_id == CODEC_DELAY_ID:
+                    track.codec_delay = value
+
+            if track_type in TRACK_TYPE_MEDIA_TYPES:
+                track.media_type = TRACK_TYPE_MEDIA_TYPES[track_type]
+                tracks.append(track)
+        return tracks
+
+    @staticmethod
+    def _parse_block_header(header: bytes, cluster_timestamp: int) -> tuple[int, int, int]:
+        # Return the track number, the timestamp and the number of frames of the block
+        track_number, track_number_length = MatroskaVideoProvider._read_vint(header, 0, False)
+        if track_number is None or track_number_length + 3 > len(header):
+            raise ValueError("A block of the file has an invalid header.")
+
+        timestamp = cluster_timestamp + int.from_bytes(header[track_number_length:track_number_length + 2], "big", signed=True)
+        flags = header[track_number_length + 2]
+        # The bits 0x06 are the lacing. With lacing, the block contains several frames.
+        frame_count = header[track_number_length + 3] + 1 if flags & 0x06 and track_number_length + 4 <= len(header) else 1
+        return track_number, timestamp, frame_count
+
+    @staticmethod
+    def _get_frames(blocks: list[tuple[int, int, int]], default_duration: int) -> list[tuple[int, int]]:
+        # Return the frames as (timestamp, duration), where duration is 0 if unknown
+        frames: list[tuple[int, int]] = []
+        for timestamp, duration, frame_count in blocks:
+            if frame_count == 1:
+                frames.append((timestamp, duration or default_duration))
+                continue
+
+            # Like FFmpeg, the duration of a laced block is split between its frames.
+            # Without any duration, the frames after the first one don't have a timestamp, so they are ignored.
+            lace_duration = (duration or default_duration * frame_count) // frame_count
+            if lace_duration:
+                frames.extend((timestamp + i * lace_duration, lace_duration) for i in range(frame_count))
+            else:
+                frames.append((timestamp, 0))
+        return frames
+
+    @staticmethod
+    def _parse_cluster(f: BinaryIO, start: int, end: int, track_numbers: set[int] | None, blocks: dict[int, list[tuple[int, int, int]]]) -> None:
+        # Only the blocks of the track_numbers are kept. If None, the blocks of every track are kept.
+        cluster_timestamp = 0
+        for element_id, data_start, data_end in MatroskaVideoProvider._iter_elements(f, start, end, SEGMENT_CHILD_IDS):
+            if element_id == CLUSTER_TIMESTAMP_ID:
+                cluster_timestamp = int.from_bytes(MatroskaVideoProvider._read(f, data_start, data_end), "big")
+            elif element_id == SIMPLE_BLOCK_ID:
+                header = MatroskaVideoProvider._read(f, data_start, min(data_start + BLOCK_HEADER_MAX_SIZE, data_end))
+                track_number, timestamp, frame_count = MatroskaVideoProvider._parse_block_header(header, cluster_timestamp)
+                if track_numbers is None or track_number in track_numbers:
+                    blocks.setdefault(track_number, []).append((timestamp, 0, frame_count))
+            elif element_id == BLOCK_GROUP_ID:
+                block: tuple[int, int, int] | None = None
+                duration = 0
+                for child_id, child_start, child_end in MatroskaVideoProvider._iter_elements(f, data_start, data_end, set()):
+                    if child_id == BLOCK_ID:
+                        header = MatroskaVideoProvider._read(f, child_start, min(child_start + BLOCK_HEADER_MAX_SIZE, child_end))
+                        block = MatroskaVideoProvider._parse_block_header(header, cluster_timestamp)
+                    elif child_id == BLOCK_DURATION_ID:
+                        duration = int.from_bytes(MatroskaVideoProvider._read(f, child_start, child_end), "big")
+
+                if block is not None and (track_numbers is None or block[0] in track_numbers):
+                    track_number, timestamp, frame_count = block
+                    blocks.setdefault(track_number, []).append((timestamp, duration, frame_count))
@@ -0,0 +1,353 @@
+from collections.abc import Iterator
+from fractions import Fraction
+from itertools import accumulate, chain, repeat
+from os import fstat
+from struct import Struct, unpack_from
+from typing import BinaryIO
+
+from .abc_video_provider import ABCVideoProvider
+from .track_index import resolve_track_index, resolve_track_indices
+
+__all__ = ["MP4VideoProvider"]
+
+BOX_HEADER = Struct(">I4s")
+LARGE_BOX_SIZE = Struct(">Q")
+# Media type of the tracks, from the handler_type of their hdlr box
+HANDLER_MEDIA_TYPES = {
+    b"vide": "video",
+    b"soun": "audio",
+    b"subt": "subtitle",
+    b"sbtl": "subtitle",
+    b"text": "subtitle",
+    b"meta": "data",
+}
+# Flags of the tfhd box
+TFHD_BASE_DATA_OFFSET_PRESENT = 0x1
+TFHD_SAMPLE_DESCRIPTION_INDEX_PRESENT = 0x2
+TFHD_DEFAULT_SAMPLE_DURATION_PRESENT = 0x8
+# Flags of the trun box
+TRUN_DATA_OFFSET_PRESENT = 0x1
+TRUN_FIRST_SAMPLE_FLAGS_PRESENT = 0x4
+TRUN_SAMPLE_DURATION_PRESENT = 0x100
+TRUN_SAMPLE_SIZE_PRESENT = 0x200
+TRUN_SAMPLE_FLAGS_PRESENT = 0x400
+TRUN_SAMPLE_COMPOSITION_TIME_OFFSET_PRESENT = 0x800
+
+
+class MP4Track:
+    def __init__(self) -> None:
+        self.track_id = 0
+        self.media_type = "unknown"
+        # Unit of time of the samples, in ticks per second
+        self.timescale = 0
+        # Edit list as (segment_duration in the movie timescale, media_time in the track timescale)
+        self.edits: list[tuple[int, int]] = []
+        self.default_sample_duration = 0
+        # Samples in decoding order
+        self.decode_times: list[int] = []
+        self.durations: list[int] = []
+        self.composition_offsets: list[int] = []
+        # FFmpeg only waits for the B-frames after the end of an edit if there is a ctts box
+        self.has_composition_offsets = False
+        # Indices of the keyframes in decoding order, from the stss box. If None, every sample is a keyframe.
+        self.sync_samples: set[int] | None = None
+        self.next_decode_time = 0
+
+    def add_samples(self, durations: list[int], composition_offsets: list[int], base_decode_time: int | None = None) -> None:
+        if composition_offsets:
+            self.has_composition_offsets = True
+        # Some files don't have a ctts box or have a shorter one
+        composition_offsets.extend(repeat(0, len(durations) - len(composition_offsets)))
+
+        decode_times = list(accumulate(durations, initial=self.next_decode_time if base_decode_time is None else base_decode_time))
+        self.next_decode_time = decode_times.pop()
+        self.decode_times.extend(decode_times)
+        self.durations.extend(durations)
+        self.composition_offsets.extend(composition_offsets[:len(durations)])
+
+
+class MP4VideoProvider(ABCVideoProvider):
+    """Video provider for MP4/MOV files that only reads their sample tables.
+
+    The decoding time of each frame is in the `stts` box (or the `trun` boxes of a fragmented file) and
+    its composition offset is in the `ctts` box, so the file is never demuxed or decoded.
+    Only the `moov` and `moof` boxes are read, which are a few KB even for a file of many GB.
+    The edit list (`elst` box) is applied like FFmpeg, so the frames before the start of the edit are removed.
+    Only the edit lists made of empty edits followed by a single edit are supported.
+
+    The fps is computed like FFMS2 does, so it is the same as with
+    [`FFMS2VideoProvider`][video_timestamps.video_provider.ffms2_video_provider.FFMS2VideoProvider].
+    """
+
+    def __init__(self) -> None:
+        # The native constructor of ABCVideoProvider is abstract, so it isn't called
+        pass
+
+    def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+        if (index is None) == (video_stream_index is None):
+            raise ValueError('You must specify exactly one of "index" or "video_stream_index".')
+
+        tracks, movie_timescale = MP4VideoProvider._parse_file(filename)
+        track = tracks[resolve_track_index(filename, index, video_stream_index, [track.media_type for track in tracks])]
+        return MP4VideoProvider._get_track_pts(filename, track, movie_timescale)
+
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        # The sample tables of every track are in the moov box, so the file is read once
+        tracks, movie_timescale = MP4VideoProvider._parse_file(filename)
+        return {
+            index: MP4VideoProvider._get_track_pts(filename, tracks[index], movie_timescale)
+            for index in resolve_track_indices(filename, indices, [track.media_type for track in tracks])
+        }
+
+    @staticmethod
+    def _parse_file(filename: str) -> tuple[list[MP4Track], int]:
+        # Return the tracks and the movie timescale
+        tracks: list[MP4Track] = []
+        trex_durations: dict[int, int] = {}
+        movie_timescale = 0
+        with open(filename, "rb") as f:
+            for box_type, start, end in MP4VideoProvider._iter_file_boxes(f):
+                if box_type == b"moov":
+                    f.seek(start)
+                    movie_timescale = MP4VideoProvider._parse_moov(f.read(end - start), tracks, trex_durations)
+                elif box_type == b"moof":
+                    f.seek(start)
+                    MP4VideoProvider._parse_moof(f.read(end - start), tracks, trex_durations)
+
+        if not movie_timescale:
+            raise ValueError(f"The file {filename} isn't a MP4/MOV file, since it doesn't contain a moov box.")
+        return tracks, movie_timescale
+
+    @staticmethod
+    def _get_track_pts(filename: str, track: MP4Track, movie_timescale: int) -> tuple[list[int], Fraction, Fraction]:
+        if not track.durations:
+            raise ValueError(f"The video stream of the file {filename} doesn't contain any frame.")
+
+        # The empty edits delay the track and the last edit tells which part of the track is presented.
+        # FFmpeg concatenates the parts of the track of each other edit, which isn't supported.
+        delay = 0
+        media_time = 0
+        presentation_duration: int | None = None
+        for i, (segment_duration, edit_media_time) in enumerate(track.edits):
+            if edit_media_time == -1:
+                delay += segment_duration * track.timescale // movie_timescale
+            elif i != len(track.edits) - 1:
+                raise ValueError(f"The edit list of the file {filename} contains {len(track.edits)} edits. Only the empty edits followed by a single edit are supported.")
+            else:
+                media_time = edit_media_time
+                if segment_duration:
+                    presentation_duration = segment_duration * track.timescale // movie_timescale
+
+        composition_times = [decode_time + composition_offset for decode_time, composition_offset in zip(track.decode_times, track.composition_offsets)]
+        end_time = None if presentation_duration is None else media_time + presentation_duration
+
+        # Like FFmpeg, the samples from the last keyframe before the start of the edit are demuxed,
+        # since the presented frames may depend on them
+        first_sample = 0
+        for i in range(len(composition_times) - 1, -1, -1):
+            if track.decode_times[i] <= media_time and composition_times[i] <= media_time and (track.sync_samples is None or i in track.sync_samples):
+                first_sample = i
+                break
+
+        frames: list[tuple[int, int]] = []
+        demuxed_times: list[int] = []
+        found_keyframe_after_edit = False
+        for i in range(first_sample, len(composition_times)):
+            composition_time = composition_times[i]
+            demuxed_times.append(composition_time)
+            if composition_time >= media_time and (end_time is None or composition_time < end_time):
+                frames.append((composition_time, track.durations[i]))
+
+            # Like FFmpeg, stop at the first keyframe after the end of the edit.
+            # With B-frames, wait for the next one, since the frames before it may still be presented.
+            if end_time is not None and composition_time + track.durations[i] >= end_time and (track.sync_samples is None or i in track.sync_samples):
+                if track.has_composition_offsets and not found_keyframe_after_edit:
+                    found_keyframe_after_edit = True
+                    continue
+                break
+
+        if not frames:
+            raise ValueError(f"The edit list of the file {filename} doesn't present any frame of the video stream.")
+
+        # The first presented frame starts after the empty edits
+        frames.sort()
+        offset = delay - frames[0][0]
+        pts_list = [composition_time + offset for composition_time, _ in frames]
+        last_pts, last_duration = frames[-1]
+        pts_list.append(last_pts + offset + last_duration)
+
+        time_base = Fraction(1, track.timescale)
+        fps = MP4VideoProvider._get_fps(max(demuxed_times) - min(demuxed_times), len(frames), time_base)
+        return pts_list, time_base, fps
+
+    @staticmethod
+    def _get_fps(pts_span: int, frame_count: int, time_base: Fraction) -> Fraction:
+        # Same as FFMS_VideoSource. The frames discarded by the edit list are in pts_span, but not in frame_count.
+        # The mean fps is rounded to the microsecond, then snapped to the common frame rates.
+        if frame_count >= 2:
+            ms_span = pts_span * float(time_base.numerator * 1000) / time_base.denominator
+            num, den = 1000000, int(ms_span * 1000 / (frame_count - 1))
+        else:
+            num, den = time_base.denominator, time_base.numerator
+        if not num or not den:
+            return Fraction(0)
+
+        fps = Fraction(num, den)
+        for common_fps in (24, 25, 30, 48, 50, 60, 100, 120):
+            delta = (common_fps - common_fps / 1.001) / 2
+            if abs(float(fps) - common_fps) < delta:
+                return Fraction(common_fps)
+            if common_fps % 25 and abs(float(fps) - common_fps / 1.001) < delta:
+                return Fraction(common_fps * 1000, 1001)
+        return fps
+
+    @staticmethod
+    def _iter_file_boxes(f: BinaryIO) -> Iterator[tuple[bytes, int, int]]:
+        # Only the headers of the top-level boxes are read, so the mdat boxes are skipped
+        file_size = fstat(f.fileno()).st_size
+        position = 0
+        while position + BOX_HEADER.size <= file_size:
+            f.seek(position)
+            header = f.read(BOX_HEADER.size + LARGE_BOX_SIZE.size)
+            size, box_type = BOX_HEADER.unpack_from(header)
+            header_size = BOX_HEADER.size
+            if size == 1:
+                size = LARGE_BOX_SIZE.unpack_from(header, BOX_HEADER.size)[0]
+                header_size += LARGE_BOX_SIZE.size
+            elif size == 0:
+                # The box extends to the end of the file
+                size = file_size - position
+
+            if size < header_size:
+                raise ValueError(f"The {box_type!r} box at the position {position} has an invalid size.")
+            yield box_type, position + header_size, min(position + size, file_size)
+            position += size
+
+    @staticmethod
+    def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+        while start + BOX_HEADER.size <= end:
+            size, box_type = BOX_HEADER.unpack_from(data, start)
+            header_size = BOX_HEADER.size
+            if size == 1:
+                size = LARGE_BOX_SIZE.unpack_from(data, start + BOX_HEADER.size)[0]
+                header_size += LARGE_BOX_SIZE.size
+            elif size == 0:
+                size = end - start
+
+            if size < header_size or start + size > end:
+                raise ValueError(f"The {box_type!r} box at the position {start} has an invalid size.")
+            yield box_type, start + header_size, start + size
+            start += size
+
+    @staticmethod
+    def _parse_moov(data: bytes, tracks: list[MP4Track], trex_durations: dict[int, int]) -> int:
+        movie_timescale = 0
+        for box_type, start, end in MP4VideoProvider._iter_boxes(data, 0, len(data)):
+            if box_type == b"mvhd":
+                movie_timescale = unpack_from(">I", data, start + (20 if data[start] == 1 else 12))[0]
+            elif box_type == b"trak":
+                tracks.append(MP4VideoProvider._parse_trak(data, start, end))
+            elif box_type == b"mvex":
+                for child_type, child_start, _ in MP4VideoProvider._iter_boxes(data, start, end):
+                    if child_type == b"trex":
+                        track_id, _, default_sample_duration = unpack_from(">III", data, child_start + 4)
+                        trex_durations[track_id] = default_sample_duration
+
+        for track in tracks:
+            track.default_sample_duration = trex_durations.get(track.track_id, 0)
+        return movie_timescale
+
+    @staticmethod
+    def _parse_trak(data: bytes, start: int, end: int) -> MP4Track:
+        track = MP4Track()
+        durations: list[int] = []
+        composition_offsets: list[int] = []
+
+        # The boxes needed are in trak/tkhd, trak/edts/elst, trak/mdia/mdhd, trak/mdia/hdlr and trak/mdia/minf/stbl/*
+        boxes = list(MP4VideoProvider._iter_boxes(data, start, end))
+        while boxes:
+            box_type, box_start, box_end = boxes.pop(0)
+            version = data[box_start]
+            if box_type in (b"edts", b"mdia", b"minf", b"stbl"):
+                boxes.extend(MP4VideoProvider._iter_boxes(data, box_start, box_end))
+            elif box_type == b"tkhd":
+                track.track_id = unpack_from(">I", data, box_start + (20 if version == 1 else 12))[0]
+            elif box_type == b"mdhd":
+                track.timescale = unpack_from(">I", data, box_start + (20 if version == 1 else 12))[0]
+            elif box_type == b"hdlr":
+                track.media_type = HANDLER_MEDIA_TYPES.get(data[box_start + 8:box_start + 12], "data")
+            elif box_type == b"elst":
+                entry_format = ">Qqhh" if version == 1 else ">Iihh"
+                entry_count = unpack_from(">I", data, box_start + 4)[0]
+                entry_size = Struct(entry_format).size
+                entries_start = box_start + 8
+                track.edits = [
+                    (segment_duration, media_time)
+                    for segment_duration, media_time, _, _ in Struct(entry_format).iter_unpack(data[entries_start:entries_start + entry_count * entry_size])
+                ]
+            elif box_type == b"stts":
+                entry_count = unpack_from(">I", data, box_start + 4)[0]
+                entries = Struct(">II").iter_unpack(data[box_start + 8:box_start + 8 + entry_count * 8])
+                durations = list(chain.from_iterable(repeat(delta, count) for count, delta in entries))
+            elif box_type == b"stss":
+                entry_count = unpack_from(">I", data, box_start + 4)[0]
+                # The sample numbers start at 1
+                track.sync_samples = {sample - 1 for sample in unpack_from(f">{entry_count}I", data, box_start + 8)}
+            elif box_type == b"ctts":
+                # The offsets of the version 0 should be unsigned, but they are read as signed like FFmpeg does
+                entry_count = unpack_from(">I", data, box_start + 4)[0]
+                entries = Struct(">Ii").iter_unpack(data[box_start + 8:box_start + 8 + entry_count * 8])
+                composition_offsets = list(chain.from_iterable(repeat(offset, count) for count, offset in entries))
+
+        track.add_samples(durations, composition_offsets)
+        return track
+
+    @staticmethod
+    def _parse_moof(data: bytes, tracks: list[MP4Track], trex_durations: dict[int, int]) -> None:
+        tracks_by_id = {track.track_id: track for track in tracks}
+        for box_type, start, end in MP4VideoProvider._iter_boxes(data, 0, len(data)):
+            if box_type != b"traf":
+                continue
+
+            track: MP4Track | None = None
+            default_sample_duration = 0
+            base_decode_time: int | None = None
+            for child_type, child_start, _ in MP4VideoProvider._iter_boxes(data, start, end):
+                version = data[child_start]
+                flags = int.from_bytes(data[child_start + 1:child_start + 4], "big")
+                if child_type == b"tfhd":
+                    track_id = unpack_from(">I", data, child_start + 4)[0]
+                    track = tracks_by_id.get(track_id)
+                    default_sample_duration = trex_durations.get(track_id, 0)
+
+                    position = child_start + 8
+                    if flags & TFHD_BASE_DATA_OFFSET_PRESENT:
+                        position += 8
+                    if flags & TFHD_SAMPLE_DESCRIPTION_INDEX_PRESENT:
+                        position += 4
+                    if flags & TFHD_DEFAULT_SAMPLE_DURATION_PRESENT:
+                        default_sample_duration = unpack_from(">I", data, position)[0]
+                elif child_type == b"tfdt":
+                    base_decode_time = unpack_from(">Q" if version == 1 else ">I", data, child_start + 4)[0]
+                elif child_type == b"trun" and track is not None:
+                    sample_count = unpack_from(">I", data, child_start + 4)[0]
+                    position = child_start + 8
+                    if flags & TRUN_DATA_OFFSET_PRESENT:
+                        position += 4
+                    if flags & TRUN_FIRST_SAMPLE_FLAGS_PRESENT:
+                        position += 4
+
+                    # Each sample has the fields present in this order: duration, size, flags, composition offset
+                    fields = [
+                        flag
+                        for flag in (TRUN_SAMPLE_DURATION_PRESENT, TRUN_SAMPLE_SIZE_PRESENT, TRUN_SAMPLE_FLAGS_PRESENT, TRUN_SAMPLE_COMPOSITION_TIME_OFFSET_PRESENT)
+                        if flags & flag
+                    ]
+                    sample_format = ">" + "".join("i" if field == TRUN_SAMPLE_COMPOSITION_TIME_OFFSET_PRESENT else "I" for field in fields)
+                    samples = list(Struct(sample_format).iter_unpack(data[position:position + sample_count * 4 * len(fields)])) if fields else [()] * sample_count
+
+                    durations = [sample[fields.index(TRUN_SAMPLE_DURATION_PRESENT)] for sample in samples] if TRUN_SAMPLE_DURATION_PRESENT in fields else [default_sample_duration] * sample_count
+                    composition_offsets = [sample[fields.index(TRUN_SAMPLE_COMPOSITION_TIME_OFFSET_PRESENT)] for sample in samples] if TRUN_SAMPLE_COMPOSITION_TIME_OFFSET_PRESENT in fields else []
+                    track.add_samples(durations, composition_offsets, base_decode_time)
+                    # The next trun of the traf continues after this one
+                    base_decode_time = None
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from mmap import ACCESS_READ, mmap
+from os import fstat
+from re import compile
+
+from .abc_video_provider import ABCVideoProvider
+from .track_index import resolve_track_index, resolve_track_indices
+
+__all__ = ["MPEGTSVideoProvider"]
+
+SYNC_BYTE = 0x47
+# Size of the packets of a MPEG-TS file (188), of a M2TS file (192, with a 4 bytes timestamp before each packet) and of a MPEG-TS file with Reed-Solomon codes (204)
+PACKET_SIZES = (188, 192, 204)
+# Number of consecutive packets that must start with the sync byte to detect the packet size
+SYNC_PACKET_COUNT = 5
+# The PAT and the PMT are at the start of the file, so only this many bytes are searched for them
+PROGRAM_TABLES_MAX_POSITION = 1 << 24
+PAT_PID = 0x0000
+PTS_WRAP = 1 << 33
+# Media type of the stream_type of the PMT
+VIDEO_STREAM_TYPES = {0x01, 0x02, 0x10, 0x1B, 0x20, 0x24, 0x33, 0x42, 0xD1, 0xEA}
+AUDIO_STREAM_TYPES = {0x03, 0x04, 0x0F, 0x11, 0x1C, 0x2D, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87}
+SUBTITLE_STREAM_TYPES = {0x90}
+# For the PES private data (stream_type 0x06), the media type comes from the descriptors
+PRIVATE_DATA_STREAM_TYPE = 0x06
+AUDIO_DESCRIPTOR_TAGS = {0x6A, 0x7A, 0x7B, 0x7C}
+SUBTITLE_DESCRIPTOR_TAGS = {0x56, 0x59}
+# The PES with these stream_id don't have the optional PES header, so they don't have a PTS
+STREAM_IDS_WITHOUT_PES_HEADER = {0xBC, 0xBE, 0xBF, 0xF0, 0xF1, 0xF2, 0xF8, 0xFF}
+# A PES header with a PTS is 14 bytes
+PES_HEADER_SIZE = 14
+# Minimum number of bytes scanned by each worker process. Below it, starting a process costs more than it saves.
+PARALLEL_MIN_PART_SIZE = 1 << 26
+
+
+class MPEGTSVideoProvider(ABCVideoProvider):
+    """Video provider for MPEG-TS/M2TS files that only reads the PES headers of the video stream.
+
+    The PTS is in the header of the PES packet that starts each frame, so the frames are never demuxed or decoded.
+    The PTS are 33 bits integers that wrap around every ~26.5 hours, so they are unwrapped,
+    then sorted into presentation order. The time_base is always 1/90000.
+
+    Each PES packet of the video stream is considered to be a frame, which is the case of the broadcast streams.
+    Then, each PES packet must have a PTS. Otherwise, a ValueError is raised instead of returning fewer frames.
+    Since the PES packets don't contain the duration of the frame, the duration of the last frame is the one of the previous frame.
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        """
+        Parameters:
+            max_workers: The maximum number of processes used to scan the file.
+                The file is split into byte ranges that are scanned in parallel, then joined.
+        """
+        if max_workers < 1:
+            raise ValueError("Parameter ``max_workers`` must be higher than 0.")
+        self.__max_workers = max_workers
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    def get_pts(self, filename: str, index: int | None, video_stream_index: int | None = None) -> tuple[list[int], Fraction, Fraction]:
+        if (index is None) == (video_stream_index is None):
+            raise ValueError('You must specify exactly one of "index" or "video_stream_index".')
+
+        streams, packet_size, parts = MPEGTSVideoProvider._read_program_tables(filename, self.max_workers)
+        pid = streams[resolve_track_index(filename, index, video_stream_index, [media_type for _, media_type in streams])][0]
+        pts_lists = MPEGTSVideoProvider._scan(filename, parts, packet_size, [pid])
+        return MPEGTSVideoProvider._get_stream_pts(filename, pts_lists[pid])
+
+    def get_all_pts(self, filename: str, indices: list[int] | None = None) -> dict[int, tuple[list[int], Fraction, Fraction]]:
+        # The PES headers of every requested PID are picked out in the same scan of the file
+        streams, packet_size, parts = MPEGTSVideoProvider._read_program_tables(filename, self.max_workers)
+        resolved_indices = resolve_track_indices(filename, indices, [media_type for _, media_type in streams])
+        pts_lists = MPEGTSVideoProvider._scan(filename, parts, packet_size, [streams[index][0] for index in resolved_indices])
+        return {index: MPEGTSVideoProvider._get_stream_pts(filename, pts_lists[streams[index][0]]) for index in resolved_indices}
+
+    @staticmethod
+    def _read_program_tables(filename: str, max_workers: int) -> tuple[list[tuple[int, str]], int, list[tuple[int, int]]]:
+        # Return the (PID, media type) of the elementary streams, the size of the packets and the parts of the file to scan
+        with open(filename, "rb") as f:
+            if not fstat(f.fileno()).st_size:
+                raise ValueError(f"The file {filename} isn't a MPEG-TS file, since it is empty.")
+
+            with mmap(f.fileno(), 0, access=ACCESS_READ) as mapped_file:
+                packet_size, first_packet = MPEGTSVideoProvider._detect_packet_size(mapped_file, filename)
+                streams = MPEGTSVideoProvider._parse_program_tables(mapped_file, packet_size, first_packet)
+                if not streams:
+                    raise ValueError(f"The file {filename} doesn't contain a PAT and a PMT.")
+
+                parts = MPEGTSVideoProvider._split_packets(len(mapped_file), packet_size, first_packet, max_workers)
+        return streams, packet_size, parts
+
+    @staticmethod
+    def _get_stream_pts(filename: str, pts_list: list[int]) -> tuple[list[int], Fraction, Fraction]:
+        if not pts_list:
+            raise ValueError(f"The video stream of the file {filename} doesn't contain any frame.")
+
+        # The PES packets are in decoding order
+        pts_list.sort()
+        pts_list.append(2 * pts_list[-1] - pts_list[-2] if len(pts_list) > 1 else pts_list[-1] + 1)
+
+        time_base = Fraction(1, 90000)
+        # Mean frame rate of the stream
+        fps = Fraction(len(pts_list) - 1) / ((pts_list[-1] - pts_list[0]) * time_base)
+        return pts_list, time_base, fps
+
+    @staticmethod
+    def _detect_packet_size(mapped_file: mmap, filename: str) -> tuple[int, int]:
+        # Return the size of the packets and the position of the sync byte of the first packet
+        for packet_size in PACKET_SIZES:
+            for first_packet in range(min(packet_size, len(mapped_file))):
+                positions = range(first_packet, min(len(mapped_file), first_packet + SYNC_PACKET_COUNT * packet_size), packet_size)
+                if all(mapped_file[position] == SYNC_BYTE for position in positions):
+                    return packet_size, first_packet
+        raise ValueError(f"The file {filename} isn't a MPEG-TS file, since its packets don't start with the sync byte.")
+
+    @staticmethod
+    def _get_payload_start(mapped_file: mmap, position: int) -> int | None:
+        # Return the position of the payload of the packet, or None if it doesn't have a payload
+        adaptation_field_control = mapped_file[position + 3] & 0x30
+        if not adaptation_field_control & 0x10:
+            return None
+        if adaptation_field_control & 0x20:
+            return position + 5 + mapped_file[position + 4]
+        return position + 4
+
+    @staticmethod
+    def _read_section(mapped_file: mmap, packet_size: int, first_packet: int, pid: int) -> bytes | None:
+        # Return the first section (PAT or PMT) of the PID, or None if it isn't in the start of the file.
+        # A section is at most 1024 bytes, so it can be split across several packets.
+        section = b""
+        position = first_packet
+        end = min(len(mapped_file) - 188 + 1, PROGRAM_TABLES_MAX_POSITION)
+        while position < end:
+            packet_pid = (mapped_file[position + 1] & 0x1F) << 8 | mapped_file[position + 2]
+            payload_start = MPEGTSVideoProvider._get_payload_start(mapped_file, position)
+            packet_end = position + 188
+            if packet_pid == pid and payload_start is not None and payload_start < packet_end:
+                if mapped_file[position + 1] & 0x40:
+                    # The payload starts with the pointer_field
+                    section = mapped_file[payload_start + 1 + mapped_file[payload_start]:packet_end]
+                elif section:
+                    section += mapped_file[payload_start:packet_end]
+
+                if len(section) >= 3:
+                    section_length = (section[1] & 0x0F) << 8 | section[2]
+                    if len(section) >= 3 + section_length:
+                        return section[:3 + section_length]
+            position += packet_size
+        return None
+
+    @staticmethod
+    def _parse_program_tables(mapped_file: mmap, packet_size: int, first_packet: int) -> list[tuple[int, str]]:
+        # Return the (PID, media type) of the elementary streams of every program, in the order of the PAT and of the PMT like FFmpeg
+        pat = MPEGTSVideoProvider._read_section(mapped_file, packet_size, first_packet, PAT_PID)
+        if pat is None:
+            return []
+
+        pmt_pids: list[int] = []
+        # The programs are after the 8 bytes header of the section and before the 4 bytes CRC
+        for position in range(8, len(pat) - 4, 4):
+            program_number = pat[position] << 8 | pat[position + 1]
+            if program_number:
+                pmt_pids.append((pat[position + 2] & 0x1F) << 8 | pat[position + 3])
+
+        streams: list[tuple[int, str]] = []
+        for pmt_pid in pmt_pids:
+            pmt = MPEGTSVideoProvider._read_section(mapped_file, packet_size, first_packet, pmt_pid)
+            if pmt is None:
+                continue
+
+            program_info_length = (pmt[10] & 0x0F) << 8 | pmt[11]
+            position = 12 + program_info_length
+            while position + 5 <= len(pmt) - 4:
+                stream_type = pmt[position]
+                pid = (pmt[position + 1] & 0x1F) << 8 | pmt[position + 2]
+                es_info_length = (pmt[position + 3] & 0x0F) << 8 | pmt[position + 4]
+                descriptors = pmt[position + 5:position + 5 + es_info_length]
+                position += 5 + es_info_length
+
+                if all(pid != stream_pid for stream_pid, _ in streams):
+                    streams.append((pid, MPEGTSVideoProvider._get_media_type(stream_type, descriptors)))
+        return streams
+
+    @staticmethod
+    def _get_media_type(stream_type: int, descriptors: bytes) -> str:
+        if stream_type in VIDEO_STREAM_TYPES:
+            return "video"
+        elif stream_type in AUDIO_STREAM_TYPES:
+            return "audio"
+        elif stream_type in SUBTITLE_STREAM_TYPES:
+            return "subtitle"
+        elif stream_type == PRIVATE_DATA_STREAM_TYPE:
+            position = 0
+            while position + 2 <= len(descriptors):
+                tag = descriptors[position]
+                if tag in AUDIO_DESCRIPTOR_TAGS:
+                    return "audio"
+                elif tag in SUBTITLE_DESCRIPTOR_TAGS:
+                    return "subtitle"
+                position += 2 + descriptors[position + 1]
+        return "data"
+
+    @staticmethod
+    def _split_packets(size: int, packet_size: int, first_packet: int, max_workers: int) -> list[tuple[int, int]]:
+        """Split the packets of a file into at most `max_workers` parts of complete packets.
+
+        Returns:
+            The (start, end) of each part. The parts are never smaller than PARALLEL_MIN_PART_SIZE, except the last one.
+        """
+        packet_count = (size - first_packet) // packet_size
+        nbr_parts = max(1, min(max_workers, packet_count * packet_size // PARALLEL_MIN_PART_SIZE))
+        packets_per_part = -(-packet_count // nbr_parts)
+
+        parts: list[tuple[int, int]] = []
+        for first in range(0, packet_count, packets_per_part):
+            last = min(first + packets_per_part, packet_count)
+            parts.append((first_packet + first * packet_size, first_packet + last * packet_size))
+        return parts or [(first_packet, first_packet)]
+
+    @staticmethod
+    def _unwrap(pts: int, previous_pts: int) -> int:
+        # The PTS closest to previous_pts which is equal to pts modulo 2^33
+        return previous_pts + (pts - previous_pts + PTS_WRAP // 2) % PTS_WRAP - PTS_WRAP // 2
+
+    @staticmethod
+    def _scan(filename: str, parts: list[tuple[int, int]], packet_size: int, pids: list[int]) -> dict[int, list[int]]:
+        # Return the unwrapped PTS of the PES packets of each PID, in decoding order
+        if len(parts) > 1:
+            return MPEGTSVideoProvider._scan_parts_in_parallel(filename, parts, packet_size, pids)
+
+        pts_lists = MPEGTSVideoProvider._scan_part(filename, parts[0][0], parts[0][1], packet_size, pids)
+        return {pid: list(pts_list) for pid, pts_list in pts_lists.items()}
+
+    @staticmethod
+    def _scan_parts_in_parallel(filename: str, parts: list[tuple[int, int]], packet_size: int, pids: list[int]) -> dict[int, list[int]]:
+        """Scan each part of the file in a process pool and join them.
+
+        Each worker unwraps the PTS of its own part, so only the first PTS of each part needs to be unwrapped here.
+        Then, the whole part is shifted by the same multiple of 2^33.
+        """
+        pts_lists: dict[int, list[int]] = {pid: [] for pid in pids}
+
+        with ProcessPoolExecutor(len(parts)) as executor:
+            futures = [executor.submit(MPEGTSVideoProvider._scan_part, filename, start, end, packet_size, pids) for start, end in parts]
+
+            for future in futures:
+                for pid, part_pts in future.result().items():
+                    pts_list = pts_lists[pid]
+                    if pts_list and part_pts:
+                        offset = MPEGTSVideoProvider._unwrap(part_pts[0], pts_list[-1]) - part_pts[0]
+                        if offset:
+                            pts_list.extend(pts + offset for pts in part_pts)
+                            continue
+                    pts_list.extend(part_pts)
+
+        return pts_lists
+
+    @staticmethod
+    def _scan_part(filename: str, start: int, end: int, packet_size: int, pids: list[int]) -> dict[int, array[int]]:
+        """Return the unwrapped PTS of the PES packets of each PID that start in the packets between the bytes `start` and `end`.
+
+        It can be run in a worker process. The PTS are in decoding order and the first one of each PID is in [0, 2^33).
+        """
+        pts_lists: dict[int, array[int]] = {pid: array("q") for pid in pids}
+
+        # Only the packets of the PIDs that start a PES packet (payload_unit_start_indicator set) are searched, with or without transport_priority
+        packet_start_regex = compile(rb"\x47(?:%s)" % b"|".join(
+            rb"[\x%02x\x%02x]\x%02x" % (0x40 | pid >> 8, 0x60 | pid >> 8, pid & 0xFF) for pid in pids
+        ))
+
+        with open(filename, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mapped_file:
+            position = start
+            while (match := packet_start_regex.search(mapped_file, position, end)) is not None:
+                position = match.start()
+                if (position - start) % packet_size:
+                    # The match isn't at the start of a packet. A real match can overlap it, so the search restarts from the next byte.
+                    position += 1
+                    continue
+                position += packet_size
+
+                pid = (mapped_file[match.start() + 1] & 0x1F) << 8 | mapped_file[match.start() + 2]
+                header = MPEGTSVideoProvider._read_pes_header(mapped_file, match.start(), packet_size, pid)
+                if header is None or header[:3] != b"\x00\x00\x01" or header[3] in STREAM_IDS_WITHOUT_PES_HEADER:
+                    continue
+                if not header[7] & 0x80:
+                    # Each PES packet is a frame, so a frame without PTS would be silently lost
+                    raise ValueError(
+                        f"The PES packet at the byte {match.start()} of the file {filename} doesn't have a PTS. "
+                        "The PTS of its frame can only be known by decoding the video, so use another video provider."
+                    )
+
+                pts = (header[9] & 0x0E) << 29 | header[10] << 22 | (header[11] & 0xFE) << 14 | header[12] << 7 | header[13] >> 1
+                pts_list = pts_lists[pid]
+                pts_list.append(MPEGTSVideoProvider._unwrap(pts, pts_list[-1]) if pts_list else pts)
+
+        return pts_lists
+
+    @staticmethod
+    def _read_pes_header(mapped_file: mmap, position: int, packet_size: int, pid: int) -> bytes | None:
+        # Return the first bytes of the PES packet that starts in the packet at this position.
+        # The header is almost always in this packet, but a big adaptation field can push it into the next packets of the PID.
+        header = b""
+        while len(header) < PES_HEADER_SIZE and position + 188 <= len(mapped_file):
+            if (mapped_file[position + 1] & 0x1F) << 8 | mapped_file[position + 2] == pid:
+                if header and mapped_file[position + 1] & 0x40:
+                    # A new PES packet starts before the end of the header
+                    return None
+
+                payload_start = MPEGTSVideoProvider._get_payload_start(mapped_file, position)
+                if payload_start is not None:
+                    header += mapped_file[payload_start:position + 188]
+            position += packet_size
+        return header if len(header) >= PES_HEADER_SIZE else None
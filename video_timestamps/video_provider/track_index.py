@@ -0,0 +1,49 @@
+__all__ = ["resolve_track_index", "resolve_track_indices"]
+
+
+def resolve_track_index(filename: str, index: int | None, video_stream_index: int | None, media_types: list[str]) -> int:
+    """Find the absolute index of the requested video track, like the native video providers.
+
+    Parameters:
+        filename: The video path. Only used in the error messages.
+        index: See [`ABCVideoProvider.get_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_pts].
+        video_stream_index: See [`ABCVideoProvider.get_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_pts].
+        media_types: The media type of each track of the file ("video", "audio", "subtitle", "data", "attachment" or "unknown").
+
+    Returns:
+        The absolute index of the track.
+    """
+    if (index is None) == (video_stream_index is None):
+        raise ValueError('You must specify exactly one of "index" or "video_stream_index".')
+
+    if index is not None:
+        if index < 0 or index >= len(media_types):
+            raise ValueError(f"The index {index} is not in the file {filename}.")
+        if media_types[index] != "video":
+            raise ValueError(f'The index {index} is not a video stream. It is an "{media_types[index]}" stream.')
+        return index
+
+    assert video_stream_index is not None # Make mypy happy
+    if video_stream_index < 0:
+        raise ValueError(f"The video_stream_index {video_stream_index} must be a positive integer.")
+
+    video_indices = [i for i, media_type in enumerate(media_types) if media_type == "video"]
+    if video_stream_index >= len(video_indices):
+        raise ValueError(f"The video_stream_index {video_stream_index} is not in the file {filename}. It only contains {len(video_indices)} video stream(s).")
+    return video_indices[video_stream_index]
+
+
+def resolve_track_indices(filename: str, indices: list[int] | None, media_types: list[str]) -> list[int]:
+    """Check the absolute indices of the requested video tracks, like the native video providers.
+
+    Parameters:
+        filename: The video path. Only used in the error messages.
+        indices: See [`ABCVideoProvider.get_all_pts`][video_timestamps.video_provider.abc_video_provider.ABCVideoProvider.get_all_pts].
+        media_types: The media type of each track of the file ("video", "audio", "subtitle", "data", "attachment" or "unknown").
+
+    Returns:
+        The absolute indices of the tracks, without duplicates and in ascending order.
+    """
+    if indices is None:
+        return [i for i, media_type in enumerate(media_types) if media_type == "video"]
+    return sorted({resolve_track_index(filename, index, None, media_types) for index in indices})
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import sys
+from array import array
 from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Mapping, Sequence
 from decimal import Decimal, localcontext
 from fractions import Fraction
+from io import BufferedIOBase, TextIOBase
+from itertools import chain, compress, islice, repeat
+from math import floor
+from multiprocessing.shared_memory import SharedMemory
+from operator import eq, lt, mul
 from pathlib import Path
-from typing import Literal, overload
+from struct import calcsize, pack_into, unpack_from
+from typing import TYPE_CHECKING, Literal, overload
 
 from .abc_timestamps import ABCTimestamps
+from .compressed_file import open_text_for_writing
+from .frame_rate_analysis import FrameRateAnalysis
 from .rounding_method import RoundingCallType, RoundingMethod
 from .time_type import TimeType
+from .timestamps_file_parser import RangeV1, RationalType, TimestampsFileParser
 from .video_provider import ABCVideoProvider, FFMS2VideoProvider
 
+if TYPE_CHECKING:
+    from typing_extensions import Buffer
+
 __all__ = ["VideoTimestamps"]
 
 class VideoTimestamps(ABCTimestamps):
@@ -19,7 +34,7 @@ class VideoTimestamps(ABCTimestamps):
 
     def __init__(
         self,
-        pts_list: list[int],
+        pts_list: Sequence[int],
         time_scale: Fraction,
         normalize: bool = True,
         fps: Fraction | None = None,
@@ -43,22 +58,173 @@ class VideoTimestamps(ABCTimestamps):
         if len(pts_list) <= 1:
             raise ValueError("There must be at least 2 pts.")
 
-        if any(pts_list[i] >= pts_list[i + 1] for i in range(len(pts_list) - 1)):
-            raise ValueError("PTS must be in non-decreasing order.")
+        if normalize and pts_list[0] and isinstance(pts_list, (array, memoryview)):
+            # Stay in the int64 form instead of creating a int object per frame
+            pts_list = VideoTimestamps.__check_and_normalize_pts_buffer(pts_list)
+        else:
+            if not all(map(lt, pts_list, islice(pts_list, 1, None))):
+                raise ValueError("PTS must be in non-decreasing order.")
 
-        self.__pts_list = pts_list
-        self.__time_scale = time_scale
+            if normalize and pts_list[0]:
+                pts_list = VideoTimestamps.normalize(list(pts_list))
 
-        if normalize:
-            self.__pts_list = VideoTimestamps.normalize(self.pts_list)
+        self.__time_scale = time_scale
 
-        self.__timestamps = [pts / self.time_scale for pts in self.pts_list]
+        self.__pts = pts_list
+        self.__pts_list = pts_list if isinstance(pts_list, list) else None
+        # The Fraction of each frame are only created if the timestamps property is used
+        self.__timestamps: list[Fraction] | None = None
+        # Only set when the PTS are a view over a shared memory block. It keeps the block alive as long as the object.
+        self.__shared_memory: SharedMemory | None = None
+        self.__analysis: FrameRateAnalysis | None = None
 
+        # If the fps isn't specified, it is approximated from the PTS, so it needs to be updated if the PTS change
+        self.__approximate_fps = fps is None
         if fps is None:
-            self.__fps = Fraction(len(pts_list) - 1, Fraction((self.pts_list[-1] - self.pts_list[0]), self.time_scale))
+            self.__fps = Fraction(len(pts_list) - 1, Fraction((pts_list[-1] - pts_list[0]), self.time_scale))
         else:
             self.__fps = fps
 
+    @staticmethod
+    def __check_and_normalize_pts_buffer(pts_buffer: array[int] | memoryview) -> array[int]:
+        # Check the order of the PTS and shift them in the same pass over the buffer
+        first_pts = pts_buffer[0]
+        previous_pts = first_pts - 1
+        normalized_pts = array("q")
+        append = normalized_pts.append
+        for pts in pts_buffer:
+            if pts <= previous_pts:
+                raise ValueError("PTS must be in non-decreasing order.")
+            append(pts - first_pts)
+            previous_pts = pts
+        return normalized_pts
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Buffer,
+        time_scale: Fraction,
+        normalize: bool = True,
+        fps: Fraction | None = None,
+    ) -> VideoTimestamps:
+        """Create timestamps from an object supporting the buffer protocol (ex: `array.array`, `memoryview`, `bytes`, numpy arrays).
+
+        The PTS stay in the buffer as signed 64-bit integers, so no int object is kept for each frame.
+        If the PTS don't need to be normalized, the buffer isn't copied, so it must not be modified afterwards.
+
+        Parameters:
+            buffer: The Presentation Time Stamps (PTS) for all frames, as native signed 64-bit integers.
+                A buffer of bytes (ex: `bytes`) is reinterpreted as native signed 64-bit integers.
+
+                The last pts correspond to the pts of the last frame + it's duration.
+            time_scale: Unit of time (in seconds) in terms of which frame timestamps are represented.
+
+                Important: Don't confuse time_scale with the time_base. As a reminder, time_base = 1 / time_scale.
+            normalize: If True, it will shift the PTS to make them start from 0. If false, the option does nothing.
+            fps: The frames per second of the video.
+
+                If not specified, the fps will be approximate from the first and last frame PTS.
+
+        Returns:
+            An VideoTimestamps instance representing the PTS contained in the buffer.
+        """
+        return cls(VideoTimestamps._buffer_to_pts(buffer), time_scale, normalize, fps)
+
+    @staticmethod
+    def _buffer_to_pts(buffer: Buffer) -> memoryview:
+        view = memoryview(buffer)
+
+        if view.ndim != 1:
+            raise ValueError("The buffer must be one-dimensional.")
+
+        if view.format in ("b", "B", "c"):
+            if view.nbytes % 8:
+                raise ValueError(f"The buffer size ({view.nbytes} bytes) isn't a multiple of 8 bytes.")
+        else:
+            native_byte_orders = ("", "@", "=", "<" if sys.byteorder == "little" else ">")
+            if view.itemsize != 8 or view.format[-1] not in ("q", "l") or view.format[:-1] not in native_byte_orders:
+                raise ValueError(f'The buffer must contain native signed 64-bit integers, but its format is "{view.format}".')
+
+        if not view.c_contiguous:
+            view = memoryview(view.tobytes())
+
+        return view.cast("B").cast("q")
+
+    # Layout of the shared memory block: number of PTS, size of the metadata, the metadata, padding to 8 bytes, the PTS.
+    _SHARED_MEMORY_HEADER = "qq"
+
+    def to_shared_memory(self) -> SharedMemory:
+        """Copy the timestamps in a new shared memory block.
+
+        Other processes can then create their VideoTimestamps with
+        [`from_shared_memory`][video_timestamps.video_timestamps.VideoTimestamps.from_shared_memory],
+        so they all use the same copy of the PTS instead of each holding their own.
+
+        The caller owns the shared memory block. Once every process is done with it, call `close()` and `unlink()` on it.
+
+        Returns:
+            The shared memory block containing the timestamps. Pass its `name` to the other processes.
+        """
+        metadata = f"{self.time_scale} {self.fps}".encode()
+        pts_offset = VideoTimestamps._get_shared_memory_pts_offset(len(metadata))
+        pts = memoryview(self.__pts if isinstance(self.__pts, (array, memoryview)) else array("q", self.__pts))
+
+        shared_memory = SharedMemory(create=True, size=pts_offset + pts.nbytes)
+        buffer = shared_memory.buf
+        assert buffer is not None # Make mypy happy
+
+        header_size = calcsize(VideoTimestamps._SHARED_MEMORY_HEADER)
+        pack_into(VideoTimestamps._SHARED_MEMORY_HEADER, buffer, 0, len(pts), len(metadata))
+        buffer[header_size:header_size + len(metadata)] = metadata
+        buffer[pts_offset:pts_offset + pts.nbytes] = pts.cast("B")
+
+        return shared_memory
+
+    @classmethod
+    def from_shared_memory(cls, name: str) -> VideoTimestamps:
+        """Create timestamps from a shared memory block created by
+        [`to_shared_memory`][video_timestamps.video_timestamps.VideoTimestamps.to_shared_memory].
+
+        The PTS aren't copied. The object directly uses the shared memory block, which stays attached as long as the object is alive.
+
+        Before Python 3.13, attaching registers the block with the resource tracker of the process, like `SharedMemory` does.
+        The processes of a `ProcessPoolExecutor` or a `multiprocessing.Pool` share the tracker of the process that created the block, so it is only unlinked by its owner.
+        A process that wasn't started by `multiprocessing` has its own tracker, which unlinks the block when the process exits.
+
+        Parameters:
+            name: The name of the shared memory block.
+
+        Returns:
+            An VideoTimestamps instance representing the timestamps contained in the shared memory block.
+        """
+        if sys.version_info >= (3, 13):
+            shared_memory = SharedMemory(name, track=False)
+        else:
+            shared_memory = SharedMemory(name)
+
+        buffer = shared_memory.buf
+        assert buffer is not None # Make mypy happy
+
+        nbr_pts, metadata_size = unpack_from(VideoTimestamps._SHARED_MEMORY_HEADER, buffer)
+        header_size = calcsize(VideoTimestamps._SHARED_MEMORY_HEADER)
+        time_scale, fps = bytes(buffer[header_size:header_size + metadata_size]).decode().split(" ")
+        pts_offset = VideoTimestamps._get_shared_memory_pts_offset(metadata_size)
+
+        timestamps = cls.from_buffer(
+            buffer[pts_offset:pts_offset + nbr_pts * 8],
+            Fraction(time_scale),
+            False,
+            Fraction(fps),
+        )
+        timestamps.__shared_memory = shared_memory
+        return timestamps
+
+    @staticmethod
+    def _get_shared_memory_pts_offset(metadata_size: int) -> int:
+        offset = calcsize(VideoTimestamps._SHARED_MEMORY_HEADER) + metadata_size
+        # Align the PTS on 8 bytes
+        return (offset + 7) // 8 * 8
+
     @classmethod
     @overload
     def from_video_file(
@@ -112,6 +278,10 @@ class VideoTimestamps(ABCTimestamps):
                 If not specified, the fps will be approximate from the first and last frame PTS.
             video_provider: The video provider to use to get the information about the video timestamps/fps.
                 If not specified, it will default to [`FFMS2VideoProvider`][video_timestamps.video_provider.ffms2_video_provider.FFMS2VideoProvider].
+
+                If it has a `get_pts_buffer` method (like the native providers), it is used instead of `get_pts`.
+                It takes the same parameters as `get_pts`, but it returns the PTS in a buffer of signed 64-bit integers
+                (see [`from_buffer`][video_timestamps.video_timestamps.VideoTimestamps.from_buffer]).
             video_stream_index: Index of the video stream, relative to the other video streams in the file.
 
                 This is equivalent to ffmpeg's `v` stream specifier (ex: `v:0` is the first video stream,
@@ -128,21 +298,118 @@ class VideoTimestamps(ABCTimestamps):
         if not video_path.is_file():
             raise FileNotFoundError(f'Invalid path for the video file: "{video_path}"')
 
-        pts_list, time_base, fps_from_video_provider = video_provider.get_pts(str(video_path.resolve()), index, video_stream_index)
-        time_scale = 1 / time_base
+        pts_list: list[int] | Buffer
+        # A provider that has get_pts_buffer (ex: the native providers) can give its PTS without creating an int object for each frame
+        get_pts_buffer: Callable[[str, int | None, int | None], tuple[Buffer, Fraction, Fraction]] | None = getattr(video_provider, "get_pts_buffer", None)
+        if get_pts_buffer is not None:
+            pts_list, time_base, fps_from_video_provider = get_pts_buffer(str(video_path.resolve()), index, video_stream_index)
+        else:
+            pts_list, time_base, fps_from_video_provider = video_provider.get_pts(str(video_path.resolve()), index, video_stream_index)
 
         if use_video_provider_to_guess_fps:
             fps = fps_from_video_provider
         else:
             fps = None
 
-        timestamps = VideoTimestamps(
-            pts_list,
-            time_scale,
-            normalize,
-            fps
-        )
-        return timestamps
+        return VideoTimestamps._from_video_provider_pts(pts_list, time_base, normalize, fps)
+
+    @classmethod
+    def from_video_file_all_tracks(
+        cls,
+        video_path: Path,
+        indices: list[int] | None = None,
+        normalize: bool = True,
+        use_video_provider_to_guess_fps: bool = True,
+        video_provider: ABCVideoProvider | None = None,
+    ) -> dict[int, VideoTimestamps]:
+        """Create timestamps for several video streams of the ``video_path`` provided.
+
+        The file is read or indexed once for all the streams, instead of once per call to
+        [`from_video_file`][video_timestamps.video_timestamps.VideoTimestamps.from_video_file].
+
+        Parameters:
+            video_path: A video path.
+            indices: Absolute indexes of the video streams in the file. If None, every video stream of the file is used.
+            normalize: If True, it will shift the PTS of each stream to make them start from 0. If false, the option does nothing.
+            use_video_provider_to_guess_fps: If True, use the video_provider to guess the fps of each stream.
+                If not specified, the fps will be approximate from the first and last frame PTS.
+            video_provider: The video provider to use to get the information about the video timestamps/fps.
+                If not specified, it will default to [`FFMS2VideoProvider`][video_timestamps.video_provider.ffms2_video_provider.FFMS2VideoProvider].
+
+                If it has a `get_all_pts_buffer` method (like the native providers), it is used instead of `get_all_pts`.
+                A provider that doesn't override `get_all_pts` extracts each stream with `get_pts`, so `indices` must be specified.
+
+        Returns:
+            The VideoTimestamps of each stream, by absolute index in ascending order.
+        """
+        if video_provider is None:
+            video_provider = FFMS2VideoProvider()
+
+        if not video_path.is_file():
+            raise FileNotFoundError(f'Invalid path for the video file: "{video_path}"')
+
+        all_pts: Mapping[int, tuple[list[int] | Buffer, Fraction, Fraction]]
+        # Like with get_pts_buffer in from_video_file, the PTS of each stream stay in an int64 buffer if the provider can give them
+        get_all_pts_buffer: Callable[[str, list[int] | None], dict[int, tuple[Buffer, Fraction, Fraction]]] | None = getattr(video_provider, "get_all_pts_buffer", None)
+        if get_all_pts_buffer is not None:
+            all_pts = get_all_pts_buffer(str(video_path.resolve()), indices)
+        else:
+            all_pts = video_provider.get_all_pts(str(video_path.resolve()), indices)
+
+        return {
+            index: VideoTimestamps._from_video_provider_pts(pts_list, time_base, normalize, fps if use_video_provider_to_guess_fps else None)
+            for index, (pts_list, time_base, fps) in all_pts.items()
+        }
+
+    @staticmethod
+    def _from_video_provider_pts(pts_list: list[int] | Buffer, time_base: Fraction, normalize: bool, fps: Fraction | None) -> VideoTimestamps:
+        if isinstance(pts_list, list):
+            return VideoTimestamps(pts_list, 1 / time_base, normalize, fps)
+        return VideoTimestamps.from_buffer(pts_list, 1 / time_base, normalize, fps)
+
+    @classmethod
+    def from_ffprobe_dump(
+        cls,
+        path_or_dump_content: Path | TextIOBase | BufferedIOBase,
+        time_scale: Fraction | None = None,
+        index: int | None = None,
+        normalize: bool = True,
+    ) -> VideoTimestamps:
+        """Create timestamps from the packets or the frames dumped by ffprobe, without converting them to a timestamps file.
+
+        The dump can be in JSON (ex: `ffprobe -show_streams -show_packets -of json video.mkv > dump.json`)
+        or in CSV with the keys of the fields (ex: `ffprobe -show_streams -show_packets -of csv=nokey=0 video.mkv > dump.csv`).
+        The packets are sorted in presentation order, so the video can contain B-frames.
+
+        Parameters:
+            path_or_dump_content: If is it a Path, the path to the dump. It can be compressed with gzip, bz2, lzma/xz or zstd (only with Python 3.14 or higher).
+
+                If it is a text stream, the dump content.
+
+                If it is a binary stream, the dump content encoded in UTF-8.
+            time_scale: Unit of time (in seconds) in terms of which frame PTS are represented.
+                If not specified, the time_base of the stream in the dump is used, so the dump needs to contain the streams (`-show_streams`).
+
+                Important: Don't confuse time_scale with the time_base. As a reminder, time_base = 1 / time_scale.
+            index: Absolute index of the stream in the file (the `stream_index` of the packets).
+                If not specified, the first video stream is used.
+            normalize: If True, it will shift the PTS to make them start from 0. If false, the option does nothing.
+
+        Returns:
+            An VideoTimestamps instance representing the stream of the dump.
+        """
+        if isinstance(path_or_dump_content, Path):
+            with open(path_or_dump_content, "rb") as f:
+                pts_list, time_scale_from_dump = TimestampsFileParser.parse_ffprobe_dump(f, index)
+        else:
+            pts_list, time_scale_from_dump = TimestampsFileParser.parse_ffprobe_dump(path_or_dump_content, index)
+
+        if time_scale is None:
+            if time_scale_from_dump is None:
+                raise ValueError("The ffprobe dump doesn't contain the time_base of the stream. Specify the time_scale or use the option -show_streams of ffprobe.")
+            time_scale = time_scale_from_dump
+
+        return cls.from_buffer(pts_list, time_scale, normalize)
 
     @property
     def fps(self) -> Fraction:
@@ -154,7 +421,7 @@ class VideoTimestamps(ABCTimestamps):
 
     @property
     def first_timestamps(self) -> Fraction:
-        return self.timestamps[0]
+        return self.__pts[0] / self.time_scale
 
     @property
     def pts_list(self) -> list[int]:
@@ -163,6 +430,8 @@ class VideoTimestamps(ABCTimestamps):
             A list containing the Presentation Time Stamps (PTS) for all frames.
                 The last pts correspond to the pts of the last frame + it's duration.
         """
+        if self.__pts_list is None:
+            self.__pts_list = list(self.__pts)
         return self.__pts_list
 
     @property
@@ -171,6 +440,8 @@ class VideoTimestamps(ABCTimestamps):
         Returns:
             A list of timestamps (in seconds) corresponding to each frame, stored as `Fraction` for precision.
         """
+        if self.__timestamps is None:
+            self.__timestamps = [pts / self.time_scale for pts in self.__pts]
         return self.__timestamps
 
     @property
@@ -179,7 +450,7 @@ class VideoTimestamps(ABCTimestamps):
         Returns:
             Number of frames in the video.
         """
-        return len(self.__pts_list) - 1
+        return len(self.__pts) - 1
 
     @staticmethod
     def normalize(pts_list: list[int]) -> list[int]:
@@ -196,23 +467,116 @@ class VideoTimestamps(ABCTimestamps):
         return pts_list
 
 
+    def _extend(self, pts_list: Sequence[int], start: int) -> None:
+        """Replace the PTS from the index `start` by `pts_list`.
+
+        It is used to follow a timestamps file that is still being written.
+        The `pts_list` must be normalized like the current PTS.
+
+        Parameters:
+            pts_list: The new PTS.
+            start: The index of the first PTS to replace. It must be higher than 0.
+        """
+        if start + len(pts_list) <= 1:
+            raise ValueError("There must be at least 2 pts.")
+
+        if not all(map(lt, chain((self.__pts[start - 1],), pts_list), pts_list)):
+            raise ValueError("PTS must be in non-decreasing order.")
+
+        if self.__pts is not self.__pts_list:
+            # Only a list can grow, so the PTS of a buffer are copied (unless pts_list already did it)
+            if self.__pts_list is None:
+                self.__pts_list = list(self.__pts)
+            self.__pts = self.__pts_list
+            self.__shared_memory = None
+
+        del self.__pts_list[start:]
+        self.__pts_list.extend(pts_list)
+
+        self.__timestamps = None
+        self.__analysis = None
+        if self.__approximate_fps:
+            self.__fps = Fraction(len(self.__pts) - 1, Fraction((self.__pts[-1] - self.__pts[0]), self.time_scale))
+
+
+    def analyze(self) -> FrameRateAnalysis:
+        """Analyze the frame rate of the video: constant frame rate segments, frame duration statistics and anomalies.
+
+        The analysis is done in one pass over the PTS and it is cached, so calling this method again is free.
+
+        Returns:
+            The frame rate analysis of the video.
+        """
+        if self.__analysis is None:
+            self.__analysis = FrameRateAnalysis._from_pts(self.__pts, self.time_scale)
+        return self.__analysis
+
+
+    _MAX_REPORTED_COLLIDING_FRAMES = 5
+
+    def rescale(self, time_scale: Fraction, rounding_method: RoundingMethod) -> VideoTimestamps:
+        """Convert the PTS to another time_scale, like a muxer does when it writes the video with a different time_scale.
+
+        For example, to get the timestamps mkvmerge will produce from a mp4 file (time_scale of 90000),
+        use `rescale(Fraction(1000), RoundingMethod.ROUND)`.
+
+        If some frames end up with the same PTS as their previous frame, a ValueError with their number and the first of them is raised,
+        since a VideoTimestamps cannot contain duplicated PTS.
+
+        Parameters:
+            time_scale: The new time_scale.
+            rounding_method: The rounding method used to round/floor the converted PTS.
+
+        Returns:
+            A new VideoTimestamps with the converted PTS. The fps stays the same.
+        """
+        if time_scale <= 0:
+            raise ValueError("Parameter ``time_scale`` must be higher than 0.")
+
+        time_scale = Fraction(time_scale)
+        ratio = time_scale / self.time_scale
+        division_method = rounding_method._get_division_method()
+        rescaled_pts = map(division_method, map(mul, self.__pts, repeat(ratio.numerator)), repeat(ratio.denominator))
+
+        pts_list: Sequence[int]
+        if isinstance(self.__pts, (array, memoryview)):
+            pts_list = array("q", rescaled_pts)
+        else:
+            pts_list = list(rescaled_pts)
+
+        colliding_frames = compress(range(1, len(pts_list)), map(eq, pts_list, islice(pts_list, 1, None)))
+        # Only the first colliding frames are listed, so the message doesn't grow with the length of the video
+        first_colliding_frames = list(islice(colliding_frames, VideoTimestamps._MAX_REPORTED_COLLIDING_FRAMES))
+        if first_colliding_frames:
+            nbr_colliding_frames = len(first_colliding_frames) + sum(1 for _ in colliding_frames)
+            raise ValueError(
+                f"{nbr_colliding_frames} frame(s) have the same PTS as their previous frame once converted to the time_scale {time_scale}. "
+                f"The first of them are {first_colliding_frames}."
+            )
+
+        return VideoTimestamps(pts_list, time_scale, False, self.fps)
+
+
     def _time_to_frame(
         self,
         time: Fraction,
         time_type: TimeType,
     ) -> int:
-        if time > self.timestamps[-1]:
+        # Since pts / time_scale < time is equivalent to pts < time * time_scale, we can search directly in the PTS
+        pts = time * self.time_scale
+
+        if pts > self.__pts[-1]:
             if time_type == TimeType.END:
                 return self.nbr_frames
             else:
-                raise ValueError(f"Time {time} is over the video duration. The video duration is {self.timestamps[-1]} seconds.")
+                raise ValueError(f"Time {time} is over the video duration. The video duration is {self.__pts[-1] / self.time_scale} seconds.")
 
         if time_type == TimeType.START:
-            return bisect_left(self.timestamps, time)
+            return bisect_left(self.__pts, pts)
         elif time_type == TimeType.END:
-            return bisect_left(self.timestamps, time) - 1
+            return bisect_left(self.__pts, pts) - 1
         elif time_type == TimeType.EXACT:
-            return bisect_right(self.timestamps, time) - 1
+            return bisect_right(self.__pts, pts) - 1
         else:
             raise ValueError(f'The TimeType "{time_type}" isn\'t supported.')
 
@@ -224,15 +588,32 @@ class VideoTimestamps(ABCTimestamps):
         if frame > self.nbr_frames:
             raise ValueError(f"The frame {frame} is over the video duration. The video contains {self.nbr_frames} frames.")
 
-        return self.timestamps[frame]
+        return self.__pts[frame] / self.time_scale
 
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, VideoTimestamps):
             return False
-        return (self.fps, self.time_scale, self.first_timestamps, self.pts_list, self.timestamps) == (
-            other.fps, other.time_scale, other.first_timestamps, other.pts_list, other.timestamps
-        )
+        # The timestamps are derived from the PTS and the time_scale, so there is no need to compare them
+        return (self.fps, self.time_scale) == (other.fps, other.time_scale) and VideoTimestamps.__pts_equal(self.__pts, other.__pts)
+
+    @staticmethod
+    def __pts_equal(pts: Sequence[int], other_pts: Sequence[int]) -> bool:
+        # Compare the PTS in their own storage, so a buffer-backed object never creates a int object per frame
+        if isinstance(pts, list) and isinstance(other_pts, list):
+            return pts == other_pts
+        if len(pts) != len(other_pts):
+            return False
+
+        try:
+            if isinstance(pts, list):
+                pts = array("q", pts)
+            elif isinstance(other_pts, list):
+                other_pts = array("q", other_pts)
+        except OverflowError:
+            # The PTS of the list don't fit in int64, so they can't be equal to the ones of the buffer
+            return False
+        return memoryview(pts) == memoryview(other_pts) # type: ignore[arg-type]
 
     @overload
     def export_timestamps(
@@ -240,6 +621,7 @@ class VideoTimestamps(ABCTimestamps):
         timestamps_filename: Path,
         *,
         use_fraction: Literal[True],
+        version: Literal[2] = 2,
     ) -> None:
         ...
 
@@ -251,6 +633,17 @@ class VideoTimestamps(ABCTimestamps):
         precision: int,
         precision_rounding: RoundingCallType,
         use_fraction: Literal[False] = False,
+        version: Literal[2] = 2,
+    ) -> None:
+        ...
+
+    @overload
+    def export_timestamps(
+        self,
+        timestamps_filename: Path,
+        *,
+        version: Literal[1],
+        rounding_method: RoundingMethod,
     ) -> None:
         ...
 
@@ -260,13 +653,17 @@ class VideoTimestamps(ABCTimestamps):
         *,
         precision: int | None = 9,
         precision_rounding: RoundingCallType | None = RoundingMethod.ROUND,
-        use_fraction: bool = False
+        use_fraction: bool = False,
+        version: Literal[1, 2] = 2,
+        rounding_method: RoundingMethod | None = None,
     ) -> None:
-        """Export the timestamps to [timestamp format v2 file](https://mkvtoolnix.download/doc/mkvmerge.html#d4e4659).
+        """Export the timestamps to [timestamp format v2 file](https://mkvtoolnix.download/doc/mkvmerge.html#d4e4659)
+        or to [timestamp format v1 file](https://mkvtoolnix.download/doc/mkvmerge.html#d4e4623).
 
         Parameters:
             timestamps_filename: The file path where the timestamps will be saved.
-            precision: Number of decimal places for timestamps (default: 9).
+                If its suffix is ".gz", ".bz2", ".xz" or ".zst" (only with Python 3.14 or higher), the file is compressed with gzip, bz2, xz or zstd.
+            precision: Only used with the version 2. Number of decimal places for timestamps (default: 9).
                 The minimum value is 3. Note that for mkv file, you can always use 9 (the default value).
 
                 Common values:
@@ -274,22 +671,39 @@ class VideoTimestamps(ABCTimestamps):
                 - 3 means milliseconds
                 - 6 means microseconds
                 - 9 means nanoseconds
-            precision_rounding: Rounding method to use for timestamps (default: round).
+            precision_rounding: Only used with the version 2. Rounding method to use for timestamps (default: round).
 
                 Examples:
 
                 - Timestamp: 453.4 ms,  precision=3, precision_rounding=RoundingMethod.ROUND --> 453
                 - Timestamp: 453.4569 ms, precision=6, precision_rounding=RoundingMethod.ROUND --> 453.457
-            use_fraction: The timestamps produced will be represented has a fraction (ex: "30/2") instead of decimal (ex: "3.434").
+            use_fraction: Only used with the version 2. The timestamps produced will be represented has a fraction (ex: "30/2") instead of decimal (ex: "3.434").
                 Note that this is not a conform to the specification.
+            version: The version of the timestamps file (1 or 2).
+
+                The version 2 contains one line per frame.
+
+                The version 1 contains a range of frames for each part of the video that has a constant frame rate,
+                so it is a lot smaller for a video that is mostly CFR. The first PTS must be 0.
+            rounding_method: Required with the version 1. The rounding method that will be used to read the file.
+                If the file is read with the same `time_scale` and `rounding_method` as this object (ex: with
+                [`TextFileTimestamps`][video_timestamps.text_file_timestamps.TextFileTimestamps]), it gives back the same PTS.
         """
+        if version == 1:
+            if rounding_method is None:
+                raise ValueError("The rounding_method needs to be specified with the version 1.")
+            self.__export_timestamps_v1(timestamps_filename, rounding_method)
+            return
+        elif version != 2:
+            raise ValueError("The version needs to be 1 or 2.")
+
         if precision is not None and precision < 3:
             raise ValueError("The precision needs to be at least 3 (milliseconds).")
 
-        with localcontext() as ctx, open(timestamps_filename, "w", encoding="utf-8") as f:
+        with localcontext() as ctx, open_text_for_writing(timestamps_filename) as f:
             f.write("# timestamp format v2\n")
 
-            for pts in self.pts_list:
+            for pts in self.__pts:
                 if use_fraction:
                     time_ms = pts / self.time_scale * 1000
                     f.write(f"{time_ms}\n")
@@ -308,13 +722,131 @@ class VideoTimestamps(ABCTimestamps):
                     f.write(f"{time_ms_d}\n")
 
 
+    def __export_timestamps_v1(self, timestamps_filename: Path, rounding_method: RoundingMethod) -> None:
+        if self.__pts[0]:
+            raise ValueError("The first PTS needs to be 0 to export the timestamps to the version 1, since its first frame always starts at 0 ms.")
+
+        ranges = self.__get_v1_ranges(rounding_method)
+
+        # The frames that aren't in a range use the assumed fps, so use the fps that covers the most frames
+        nbr_frames_by_fps: dict[Fraction, int] = {}
+        for range_v1 in ranges:
+            nbr_frames_by_fps[range_v1.fps] = nbr_frames_by_fps.get(range_v1.fps, 0) + range_v1.end_frame - range_v1.start_frame + 1
+        default_fps = max(nbr_frames_by_fps, key=nbr_frames_by_fps.__getitem__)
+
+        with open_text_for_writing(timestamps_filename) as f:
+            f.write("# timestamp format v1\n")
+            f.write(f"assume {VideoTimestamps.__format_decimal(default_fps)}\n")
+
+            for range_v1 in ranges:
+                # The last range is always written, so the file contains the number of frames
+                if range_v1.fps != default_fps or range_v1 is ranges[-1]:
+                    f.write(f"{range_v1.start_frame},{range_v1.end_frame},{VideoTimestamps.__format_decimal(range_v1.fps)}\n")
+
+
+    def __get_v1_ranges(self, rounding_method: RoundingMethod) -> list[RangeV1]:
+        # A v1 file gives an exact time to each frame and the PTS is this time (in ticks) rounded/floored.
+        # So, the exact time of the frame k must be in [pts[k] + low_offset / 2, pts[k] + high_offset / 2[.
+        if rounding_method == RoundingMethod.ROUND:
+            low_offset, high_offset = -1, 1
+        elif rounding_method == RoundingMethod.FLOOR:
+            low_offset, high_offset = 0, 2
+        else:
+            raise NotImplementedError(f"Rounding method {rounding_method} is not implemented.")
+
+        pts_list = self.__pts
+        ranges: list[RangeV1] = []
+
+        # The exact time (in ticks) of the first frame of the range is start_num / start_den
+        start_frame = 0
+        start_num, start_den = 0, 1
+        # The frame duration (in ticks) of the range must be in [low_num / low_den, high_num / high_den[
+        low_num, low_den = 0, 1
+        high_num, high_den = 0, 1
+
+        frame = 1
+        while frame < len(pts_list):
+            # The frame duration must be in [(pts + low_offset / 2 - start_num / start_den) / nbr_frames, (pts + high_offset / 2 - start_num / start_den) / nbr_frames[
+            nbr_frames = frame - start_frame
+            bound_den = 2 * start_den * nbr_frames
+            bound_low_num = (2 * pts_list[frame] + low_offset) * start_den - 2 * start_num
+            bound_high_num = (2 * pts_list[frame] + high_offset) * start_den - 2 * start_num
+
+            if nbr_frames == 1:
+                # The interval always contains a duration, since its length is 1 tick
+                low_num, low_den = bound_low_num, bound_den
+                high_num, high_den = bound_high_num, bound_den
+                frame += 1
+                continue
+
+            new_low_num, new_low_den = low_num, low_den
+            new_high_num, new_high_den = high_num, high_den
+            if bound_low_num * low_den > low_num * bound_den:
+                new_low_num, new_low_den = bound_low_num, bound_den
+            if bound_high_num * high_den < high_num * bound_den:
+                new_high_num, new_high_den = bound_high_num, bound_den
+
+            if new_low_num * new_high_den >= new_high_num * new_low_den:
+                # The frame "frame" cannot be reached with the same frame rate, so the range ends at the frame "frame - 2"
+                start_num, start_den = self.__add_v1_range(ranges, start_frame, frame - 2, Fraction(start_num, start_den), Fraction(low_num, low_den), Fraction(high_num, high_den))
+                start_frame = frame - 1
+            else:
+                low_num, low_den = new_low_num, new_low_den
+                high_num, high_den = new_high_num, new_high_den
+                frame += 1
+
+        self.__add_v1_range(ranges, start_frame, len(pts_list) - 2, Fraction(start_num, start_den), Fraction(low_num, low_den), Fraction(high_num, high_den))
+        return ranges
+
+
+    def __add_v1_range(self, ranges: list[RangeV1], start_frame: int, end_frame: int, start_time: Fraction, low: Fraction, high: Fraction) -> RationalType:
+        # The frame duration (in ticks) is in [low, high[, so the fps is in ]time_scale / high, time_scale / low].
+        # Use the fps with the fewest decimals, since the v1 format doesn't support fractions.
+        max_fps = self.time_scale / low
+        min_fps = self.time_scale / high
+        digits = 0
+        while (fps := Fraction(floor(max_fps * pow(10, digits)), pow(10, digits))) <= min_fps:
+            digits += 1
+
+        ranges.append(RangeV1(start_frame, end_frame, fps, start_time / self.time_scale * 1000))
+
+        end_time = start_time + (end_frame - start_frame + 1) * self.time_scale / fps
+        return end_time.numerator, end_time.denominator
+
+
+    @staticmethod
+    def __format_decimal(number: Fraction) -> str:
+        # The number must be a positive finite decimal number
+        digits = 0
+        while pow(10, digits) % number.denominator:
+            digits += 1
+
+        scaled_number = number.numerator * pow(10, digits) // number.denominator
+        if not digits:
+            return f"{scaled_number}"
+        return f"{scaled_number // pow(10, digits)}.{scaled_number % pow(10, digits):0{digits}d}"
+
+
+    def __reduce__(self) -> tuple[Callable[..., VideoTimestamps], tuple[object, ...]]:
+        # Only pickle the PTS. Everything else is derived from them.
+        if isinstance(self.__pts, memoryview):
+            pts = array("q")
+            pts.frombytes(self.__pts.cast("B"))
+        else:
+            try:
+                pts = array("q", self.__pts)
+            except OverflowError:
+                # The PTS don't fit in int64, so they cannot use the compact form
+                return (type(self), (self.pts_list, self.time_scale, False, self.fps))
+
+        return (type(self).from_buffer, (pts, self.time_scale, False, self.fps))
+
+
     def __hash__(self) -> int:
         return hash(
             (
                 self.fps,
                 self.time_scale,
-                self.first_timestamps,
-                tuple(self.pts_list),
-                tuple(self.timestamps),
+                tuple(self.__pts),
             )
         )